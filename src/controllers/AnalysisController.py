@@ -0,0 +1,229 @@
+from .BaseController import BaseController
+from models.AssetPageModel import AssetPageModel
+from models.AnalysisResultModel import AnalysisResultModel
+from models.db_schemes import Asset, CVAnalysisResult, AnalysisResult
+from stores.llm import InferenceScheduler
+from pydantic import ValidationError
+from typing import AsyncIterator, List, Tuple
+import unicodedata
+import hashlib
+import logging
+import json
+import re
+
+logger = logging.getLogger('uvicorn.error')
+
+class AnalysisController(BaseController):
+    """Structured analysis of a CV against a job description (the ProfessionalCVAnalyzer of promt.ipynb)
+
+    the prompt carries the extracted text of the CV instead of its image, the generation goes
+    through the shared InferenceScheduler so concurrent analyses are batched on the model.
+    an answer that is not valid JSON for CVAnalysisResult gets one repair round, batched as well.
+    the validated results are cached per (CV content, job description, model, prompt version, language).
+    """
+
+    # bump it with any change of the prompt or of CVAnalysisResult: the cached results of the old prompt are skipped
+    PROMPT_VERSION = "1"
+
+    SUPPORTED_LANGUAGES = ["en", "fr", "es", "de", "ar", "zh", "ja", "ru"]
+
+    LANGUAGE_INSTRUCTIONS = {
+        "en": "Output language: English",
+        "fr": "Langue de sortie: Français",
+        "es": "Idioma de salida: Español",
+        "de": "Ausgabesprache: Deutsch",
+        "ar": "لغة الإخراج: العربية",
+        "zh": "输出语言: 中文",
+        "ja": "出力言語: 日本語",
+        "ru": "Язык вывода: Русский",
+    }
+
+    # generated once per process, the schema is also what the backends get for their json mode
+    JSON_SCHEMA = CVAnalysisResult.model_json_schema()
+    SCHEMA_TEXT = json.dumps(JSON_SCHEMA, indent=2)
+
+    JSON_PATTERNS = [
+        re.compile(r"```json(.*?)```", re.DOTALL),
+        re.compile(r"```(.*?)```", re.DOTALL),
+        re.compile(r"\{.*\}", re.DOTALL),
+    ]
+
+    def __init__(self, inference_scheduler: InferenceScheduler, asset_page_model: AssetPageModel,
+                 analysis_result_model: AnalysisResultModel):
+        super().__init__()
+        self.inference_scheduler = inference_scheduler
+        self.asset_page_model = asset_page_model
+        self.analysis_result_model = analysis_result_model
+
+    def is_language_supported(self, language: str) -> bool:
+        return language in self.SUPPORTED_LANGUAGES
+
+    async def get_cv_text(self, asset: Asset) -> str:
+        max_characters = self.app_settings.ANALYSIS_MAX_CV_CHARACTERS
+        texts, size = [], 0
+        async for page in self.asset_page_model.iterate_pages(blob_hash=asset.asset_hash):
+            texts.append(page.page_text)
+            size += len(page.page_text)
+            if size >= max_characters:
+                break
+        return "\n\n".join(texts)[:max_characters]
+
+    def create_prompt(self, cv_text: str, job_description: str, language: str) -> List[dict]:
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "## EXPERT PROFILE ##\n"
+                    "Senior CV Analyst | Recruitment Expert | Multilingual Specialist\n\n"
+
+                    "## CORE MISSION ##\n"
+                    "Extract CV data and evaluate job fit\n\n"
+
+                    "## OPERATIONAL RULES ##\n"
+                    "1. EXTRACTION: Use only the information present in the CV text\n"
+                    "2. STRUCTURED OUTPUT: Generate VALID JSON matching schema exactly\n"
+                    "3. LANGUAGE CONTROL: All text output must be in specified language\n"
+                    "4. JOB MATCHING: Critical evaluation against requirements\n"
+                    "5. DATA NORMALIZATION:\n"
+                    "   - Dates: MM/YYYY\n"
+                    "   - Skills: Infer proficiency from context\n"
+                    "   - Scores: Objective 0-1 scale\n"
+                    "6. OUTPUT FORMAT: JSON between ```json markers\n\n"
+
+                    f"## LANGUAGE DIRECTIVE ##\n"
+                    f"{self.LANGUAGE_INSTRUCTIONS[language]}\n\n"
+
+                    f"## JOB DESCRIPTION ##\n"
+                    f"{job_description}\n\n"
+
+                    f"## OUTPUT SCHEMA ##\n"
+                    f"{self.SCHEMA_TEXT}"
+                )
+            },
+            {
+                "role": "user",
+                "content": f"## CV ##\n{cv_text}\n\nGenerate professional CV analysis:"
+            },
+        ]
+
+    def extract_json(self, response: str) -> dict:
+        for pattern in self.JSON_PATTERNS:
+            match = pattern.search(response)
+            if not match:
+                continue
+            json_str = (match.group(1) if pattern.groups else match.group(0)).strip()
+            if json_str.startswith("json\n"):
+                json_str = json_str[5:]
+            try:
+                return json.loads(json_str)
+            except json.JSONDecodeError:
+                continue
+
+        raise ValueError("The model answer holds no JSON document")
+
+    def parse_result(self, response: str) -> CVAnalysisResult:
+        return CVAnalysisResult(**self.extract_json(response))
+
+    async def generate(self, prompt: List[dict]) -> str:
+        return await self.inference_scheduler.generate(
+            prompt=prompt,
+            max_output_tokens=self.app_settings.ANALYSIS_MAX_OUTPUT_TOKENS,
+            temperature=self.app_settings.GENERATION_DAFAULT_TEMPERATURE,
+            json_schema=self.JSON_SCHEMA,
+        )
+
+    async def analyze_text(self, cv_text: str, job_description: str, language: str = "en") -> CVAnalysisResult:
+        if not self.is_language_supported(language):
+            raise ValueError(f"Unsupported language '{language}'. Valid options: {', '.join(self.SUPPORTED_LANGUAGES)}")
+
+        response = await self.generate(
+            prompt=self.create_prompt(cv_text=cv_text, job_description=job_description, language=language)
+        )
+
+        return await self.validate_answer(response=response)
+
+    async def validate_answer(self, response: str) -> CVAnalysisResult:
+        try:
+            return self.parse_result(response)
+        except (ValueError, ValidationError) as e:
+            # ValidationError is a ValueError too: both get the same single repair round
+            logger.warning(f"Invalid CV analysis answer, asking the model to repair it: {e}")
+            repaired = await self.generate(prompt=[
+                {"role": "system", "content": (
+                    "Correct this JSON to strictly match the schema. Return ONLY valid JSON.\n\n"
+                    f"## OUTPUT SCHEMA ##\n{self.SCHEMA_TEXT}"
+                )},
+                {"role": "user", "content": f"Invalid JSON:\n{response}\n\nErrors:\n{e}"},
+            ])
+            return self.parse_result(repaired)
+
+    def get_job_hash(self, job_description: str) -> str:
+        # the same offer pasted with another case or other line breaks is the same job description
+        normalized = " ".join(unicodedata.normalize("NFKC", job_description).lower().split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get_analysis_key(self, blob_hash: str, job_hash: str, language: str) -> str:
+        key = "\n".join([blob_hash, job_hash, self.inference_scheduler.model_key, self.PROMPT_VERSION, language])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    async def analyze_asset(self, asset: Asset, job_description: str,
+                            language: str = "en") -> Tuple[CVAnalysisResult, bool]:
+        """Analysis of an extracted CV, returns (result, served from the cache)"""
+        job_hash = self.get_job_hash(job_description=job_description)
+        analysis_key = self.get_analysis_key(blob_hash=asset.asset_hash, job_hash=job_hash, language=language)
+
+        cached = await self.analysis_result_model.get_result(analysis_key=analysis_key)
+        if cached is not None:
+            return CVAnalysisResult(**cached), True
+
+        cv_text = await self.get_cv_text(asset=asset)
+        result = await self.analyze_text(cv_text=cv_text, job_description=job_description, language=language)
+
+        await self.save_result(analysis_key=analysis_key, asset=asset, job_hash=job_hash,
+                               language=language, result=result)
+
+        return result, False
+
+    async def stream_asset_analysis(self, asset: Asset, job_description: str,
+                                    language: str = "en") -> AsyncIterator[Tuple[str, dict]]:
+        """Same as analyze_asset, as ("token", {"text"}) events while the model writes, then one ("result", {...})"""
+        job_hash = self.get_job_hash(job_description=job_description)
+        analysis_key = self.get_analysis_key(blob_hash=asset.asset_hash, job_hash=job_hash, language=language)
+
+        cached = await self.analysis_result_model.get_result(analysis_key=analysis_key)
+        if cached is not None:
+            yield "result", {"cached": True, "analysis": CVAnalysisResult(**cached).dict()}
+            return
+
+        cv_text = await self.get_cv_text(asset=asset)
+        prompt = self.create_prompt(cv_text=cv_text, job_description=job_description, language=language)
+
+        deltas = []
+        async for delta in self.inference_scheduler.stream(
+            prompt=prompt,
+            max_output_tokens=self.app_settings.ANALYSIS_MAX_OUTPUT_TOKENS,
+            temperature=self.app_settings.GENERATION_DAFAULT_TEMPERATURE,
+            json_schema=self.JSON_SCHEMA,
+        ):
+            deltas.append(delta)
+            yield "token", {"text": delta}
+
+        # the streamed text is the raw answer: the result event carries the validated (maybe repaired) one
+        result = await self.validate_answer(response="".join(deltas))
+
+        await self.save_result(analysis_key=analysis_key, asset=asset, job_hash=job_hash,
+                               language=language, result=result)
+
+        yield "result", {"cached": False, "analysis": result.dict()}
+
+    async def save_result(self, analysis_key: str, asset: Asset, job_hash: str, language: str,
+                          result: CVAnalysisResult):
+        await self.analysis_result_model.insert_result(AnalysisResult(
+            id=analysis_key,
+            analysis_blob_hash=asset.asset_hash,
+            analysis_job_hash=job_hash,
+            analysis_model_key=self.inference_scheduler.model_key,
+            analysis_prompt_version=self.PROMPT_VERSION,
+            analysis_language=language,
+            analysis_result=result.dict(),
+        ))
@@ -15,6 +15,12 @@ class BaseController:
             "assets/files"
         )
 
+        # content addressed storage: every unique file is stored once under its sha256
+        self.blobs_dir = os.path.join(
+            self.base_dir,
+            "assets/blobs"
+        )
+
         self.database_dir = os.path.join(
             self.base_dir,
             "assets/database"
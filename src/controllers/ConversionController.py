@@ -0,0 +1,178 @@
+from .BaseController import BaseController
+from xmlrpc.client import ServerProxy
+from pathlib import Path
+import subprocess
+import tempfile
+import asyncio
+import logging
+import shlex
+import shutil
+import socket
+import os
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class ConversionQueueFullError(Exception):
+    pass
+
+
+def get_free_port():
+    # the 4 uvicorn workers each run their own office processes: the ports are picked by the OS
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class OfficeProcess:
+    """One long-lived headless LibreOffice, driven through unoserver's XML-RPC API
+
+    every process has its own user profile: two LibreOffice instances sharing a profile
+    would hand their work to each other instead of running in parallel.
+    """
+
+    def __init__(self, command: list, startup_timeout: float):
+        self.command = command
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.port = None
+        self.profile_dir = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.returncode is None
+
+    async def ensure_started(self):
+        if self.is_alive():
+            return
+
+        await self.stop()
+
+        self.port = get_free_port()
+        self.profile_dir = tempfile.mkdtemp(prefix="office-profile-")
+
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            "--interface", "127.0.0.1",
+            "--port", str(self.port),
+            "--uno-port", str(get_free_port()),
+            "--user-installation", Path(self.profile_dir).as_uri(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        # the office start costs seconds, but only once per process and not once per document
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.startup_timeout
+        while loop.time() < deadline:
+            if not self.is_alive():
+                break
+            try:
+                await asyncio.to_thread(self.ping)
+                return
+            except OSError:
+                await asyncio.sleep(0.5)
+
+        await self.stop()
+        raise RuntimeError("The office process did not start")
+
+    def ping(self):
+        with ServerProxy(f"http://127.0.0.1:{self.port}", allow_none=True) as proxy:
+            proxy.info()
+
+    def convert(self, input_path: str, output_path: str):
+        with ServerProxy(f"http://127.0.0.1:{self.port}", allow_none=True) as proxy:
+            # inpath, indata, outpath, convert_to, filtername, filter_options, update_index, infiltername, password
+            proxy.convert(input_path, None, output_path, "pdf", None, [], False, None, None)
+
+    async def stop(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        self.process = None
+
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+
+class ConversionController(BaseController):
+    """DOC/DOCX to PDF conversion on a pool of long-lived headless office processes
+
+    spawning `libreoffice --headless --convert-to` per document costs seconds of startup each time.
+    here CONVERSION_WORKERS processes are started once (lazily, on the first Word CV) and reused:
+    a conversion only pays the document work. the number of waiting jobs is bounded, every job has
+    a timeout, and a process that crashes or hangs is replaced.
+    created once in the main.py lifespan.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.command = shlex.split(self.app_settings.CONVERSION_COMMAND)
+        self.timeout = self.app_settings.CONVERSION_TIMEOUT
+        self.max_waiting = self.app_settings.CONVERSION_QUEUE_SIZE
+
+        self.processes = [
+            OfficeProcess(command=self.command, startup_timeout=self.app_settings.CONVERSION_STARTUP_TIMEOUT)
+            for _ in range(self.app_settings.CONVERSION_WORKERS)
+        ]
+
+        self.idle = asyncio.Queue()
+        for office_process in self.processes:
+            self.idle.put_nowait(office_process)
+
+        self.waiting = 0
+
+    def is_enabled(self):
+        return len(self.processes) > 0
+
+    async def convert_to_pdf(self, input_path: str, output_path: str):
+        if not self.is_enabled():
+            raise RuntimeError("The conversion of Word documents is disabled (CONVERSION_WORKERS=0)")
+
+        # bounded queue: beyond it the caller gets an error right away instead of waiting forever
+        if self.idle.empty() and self.waiting >= self.max_waiting:
+            raise ConversionQueueFullError("Too many documents waiting for conversion")
+
+        self.waiting += 1
+        try:
+            office_process = await self.idle.get()
+        finally:
+            self.waiting -= 1
+
+        try:
+            await office_process.ensure_started()
+            await asyncio.wait_for(
+                asyncio.to_thread(office_process.convert, input_path, output_path),
+                timeout=self.timeout
+            )
+        except asyncio.CancelledError:
+            # the caller went away mid-conversion: the office may still be busy with the document.
+            # shielded, so a second cancellation cannot hand a busy process to the next job either
+            await asyncio.shield(self.recycle(office_process))
+            raise
+        except Exception as e:
+            # a hung or crashed office is killed, the next job starts a fresh one
+            logger.error(f"Error while converting {input_path} to pdf: {e}")
+            await self.recycle(office_process)
+            raise
+
+        self.idle.put_nowait(office_process)
+
+        if not os.path.exists(output_path):
+            raise RuntimeError("The office process did not produce a pdf")
+
+        return output_path
+
+    async def recycle(self, office_process: OfficeProcess):
+        try:
+            await office_process.stop()
+        finally:
+            self.idle.put_nowait(office_process)
+
+    async def shutdown(self):
+        for office_process in self.processes:
+            await office_process.stop()
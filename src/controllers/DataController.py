@@ -2,8 +2,11 @@ from .BaseController import BaseController
 from .ProjectController import ProjectController
 from fastapi import UploadFile
 from models import ResponseSignal
+from utils.storage import ensure_dir, get_sharded_dir, path_exists
 import re
 import os
+import hashlib
+import asyncio
 
 class DataController(BaseController):
     
@@ -13,37 +16,70 @@ class DataController(BaseController):
 
     def validate_uploaded_file(self, file: UploadFile):
 
-        if file.content_type not in self.app_settings.FILE_ALLOWED_TYPES:
+        if not self.validate_file_type(content_type=file.content_type):
             return False, ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
 
-        if file.size > self.app_settings.FILE_MAX_SIZE * self.size_scale:
+        if not self.validate_file_size(file_size=file.size):
             return False, ResponseSignal.FILE_SIZE_EXCEEDED.value
 
         return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
 
-    def generate_unique_filepath(self, orig_file_name: str, project_id: str):
+    # the two checks are also used separately by the streaming upload, before and during the write
+    def validate_file_type(self, content_type: str):
+        return content_type in self.app_settings.FILE_ALLOWED_TYPES
+
+    def validate_file_size(self, file_size: int):
+        return file_size <= self.app_settings.FILE_MAX_SIZE * self.size_scale
+
+    async def get_unique_file_path(self, project_path: str, random_key: str, cleaned_file_name: str):
+        # the files of a project are spread on the random key prefix (<project>/ab/cd/<file>)
+        file_dir = await ensure_dir(get_sharded_dir(project_path, random_key))
+        return os.path.join(file_dir, random_key + "_" + cleaned_file_name)
+
+    async def generate_unique_filepath(self, orig_file_name: str, project_id: str):
 
         random_key = self.generate_random_string()
-        project_path = ProjectController().get_project_path(project_id=project_id)
+        project_path = await ProjectController().get_project_path(project_id=project_id)
 
         cleaned_file_name = self.get_clean_file_name(
             orig_file_name=orig_file_name
         )
 
-        new_file_path = os.path.join(
-            project_path,
-            random_key + "_" + cleaned_file_name
-        )
+        new_file_path = await self.get_unique_file_path(project_path, random_key, cleaned_file_name)
 
-        while os.path.exists(new_file_path):
+        while await path_exists(new_file_path):
             random_key = self.generate_random_string()
-            new_file_path = os.path.join(
-                project_path,
-                random_key + "_" + cleaned_file_name
-            )
+            new_file_path = await self.get_unique_file_path(project_path, random_key, cleaned_file_name)
 
         return new_file_path, random_key + "_" + cleaned_file_name
 
+    def generate_unique_file_id(self, orig_file_name: str):
+        # the content lives in the blob store, the file id only has to be unique inside the project
+        # (asset_project_id_name_index_1 catches the unlikely collision)
+        return self.generate_random_string() + "_" + self.get_clean_file_name(
+            orig_file_name=orig_file_name
+        )
+
+    async def get_blob_path(self, file_hash: str):
+        # two levels of fan out (ab/cd/abcd...) keep the directories small
+        blob_dir = await ensure_dir(get_sharded_dir(self.blobs_dir, file_hash))
+        return os.path.join(blob_dir, file_hash)
+
+    async def hash_uploaded_file(self, file: UploadFile):
+        """Return the sha256 and the size of the uploaded content, without writing it anywhere"""
+        hasher = hashlib.sha256()
+        file_size = 0
+
+        while chunk := await file.read(self.app_settings.FILE_DEFAULT_CHUNK_SIZE):
+            # hashlib releases the GIL on big buffers, so the hashing runs off the event loop
+            await asyncio.to_thread(hasher.update, chunk)
+            file_size += len(chunk)
+
+        # rewind so the content can still be written if the blob is new
+        await file.seek(0)
+
+        return hasher.hexdigest(), file_size
+
     def get_clean_file_name(self, orig_file_name: str):
 
         # remove any special characters, except underscore and .
@@ -0,0 +1,256 @@
+from .BaseController import BaseController
+from .DataController import DataController
+from models.AssetModel import AssetModel
+from models.BlobModel import BlobModel
+from models.AssetPageModel import AssetPageModel
+from models.OcrPageModel import OcrPageModel
+from models.JobModel import JobModel
+from models.db_schemes import Asset
+from models.enums.ExtractionStatusEnum import ExtractionStatusEnum
+from models.enums.JobTypeEnum import JobTypeEnum
+from models.enums.JobPriorityEnum import JobPriorityEnum
+from .ConversionController import ConversionController
+from .KeywordIndexController import KeywordIndexController
+from .SkillController import SkillController
+from utils.text_extraction import extract_text_pages, is_word_document, ocr_pdf_page
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import defaultdict
+from typing import List
+import multiprocessing
+import tempfile
+import shutil
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger('uvicorn.error')
+
+class ExtractionController(BaseController):
+    """Post-upload stage: extract the text of the stored CVs, page by page
+
+    PyMuPDF is CPU bound: it runs in a process pool sized to the cores of the host,
+    the event loop of the API worker only awaits the result. the text is extracted once
+    per content (blob hash) and shared by every asset pointing to it.
+    Word CVs are first converted to PDF by the office pool of the ConversionController.
+    only the pages without a text layer are OCRed, one page per pool task, cached by page hash.
+    created once in the main.py lifespan, and in worker.py.
+
+    with a `job_model` (JOB_QUEUE_ENABLED) the API only enqueues the extraction jobs,
+    the worker processes run them: the uploads never share the CPU with the parsing.
+    """
+
+    def __init__(self, asset_model: AssetModel, blob_model: BlobModel, asset_page_model: AssetPageModel,
+                 ocr_page_model: OcrPageModel, conversion_controller: ConversionController = None,
+                 keyword_index_controller: KeywordIndexController = None,
+                 skill_controller: SkillController = None, job_model: JobModel = None):
+        super().__init__()
+        self.asset_model = asset_model
+        self.blob_model = blob_model
+        self.asset_page_model = asset_page_model
+        self.ocr_page_model = ocr_page_model
+        self.conversion_controller = conversion_controller
+        self.keyword_index_controller = keyword_index_controller
+        self.skill_controller = skill_controller
+        self.job_model = job_model
+
+        # every uvicorn worker has its own pool: by default they share the cores instead of each taking all of them
+        self.max_workers = self.app_settings.EXTRACTION_MAX_WORKERS or max(
+            1, (os.cpu_count() or 1) // max(1, self.app_settings.WEB_CONCURRENCY)
+        )
+
+        self.pool = self.create_pool()
+
+        # bounded queue in front of the pool: the files waiting for a process are not all opened at once
+        self.semaphore = asyncio.Semaphore(self.max_workers * 2)
+        self.tasks = set()
+
+    def create_pool(self):
+        # spawn: the children do not inherit the threads of motor and of the event loop
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def submit(self, assets: List[Asset], priority: int = JobPriorityEnum.NORMAL.value):
+        """Schedule the extraction of freshly inserted assets, returns without waiting for it"""
+        asset_ids_by_hash = defaultdict(list)
+        for asset in assets:
+            if asset.asset_hash:
+                asset_ids_by_hash[asset.asset_hash].append(asset.id)
+
+        if self.job_model is not None:
+            # one durable job per content, in a single insert
+            await self.job_model.enqueue_jobs(
+                job_type=JobTypeEnum.EXTRACTION.value,
+                payloads=[
+                    {"blob_hash": blob_hash, "asset_ids": asset_ids}
+                    for blob_hash, asset_ids in asset_ids_by_hash.items()
+                ],
+                priority=priority,
+            )
+            return
+
+        for blob_hash, asset_ids in asset_ids_by_hash.items():
+            task = asyncio.create_task(self.extract_blob(blob_hash=blob_hash, asset_ids=asset_ids))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run_job(self, payload: dict, final_attempt: bool):
+        """Extraction job of the queue (worker.py): an error is always raised back to the JobWorkerController,
+        which retries the job or dead-letters it and calls `fail_job`"""
+        await self.extract_blob(blob_hash=payload["blob_hash"], asset_ids=payload["asset_ids"], raise_errors=True)
+
+    async def fail_job(self, payload: dict, error: str):
+        """The job is dead (out of attempts, or its worker died on the last one): the assets are failed"""
+        await self.asset_model.update_extraction_status(
+            asset_ids=payload["asset_ids"],
+            status=ExtractionStatusEnum.FAILED.value,
+            error=error
+        )
+
+    async def extract_blob(self, blob_hash: str, asset_ids: list, raise_errors: bool = False):
+        async with self.semaphore:
+            await self.asset_model.update_extraction_status(
+                asset_ids=asset_ids,
+                status=ExtractionStatusEnum.PROCESSING.value
+            )
+
+            try:
+                page_count = await self.get_or_extract_pages(blob_hash=blob_hash)
+
+            except Exception as e:
+                logger.error(f"Error while extracting the text of blob {blob_hash}: {e}")
+                if raise_errors:
+                    # the job queue decides: retried later, or dead-lettered and failed by `fail_job`
+                    await self.asset_model.update_extraction_status(
+                        asset_ids=asset_ids,
+                        status=ExtractionStatusEnum.PENDING.value,
+                        error=str(e)
+                    )
+                    raise
+                await self.asset_model.update_extraction_status(
+                    asset_ids=asset_ids,
+                    status=ExtractionStatusEnum.FAILED.value,
+                    error=str(e)
+                )
+                return
+
+            await self.asset_model.update_extraction_status(
+                asset_ids=asset_ids,
+                status=ExtractionStatusEnum.DONE.value,
+                page_count=page_count
+            )
+
+            # the text is extracted: a tagging or indexing failure below does not fail the asset
+            if self.keyword_index_controller is None and self.skill_controller is None:
+                return
+
+            try:
+                page_texts = [
+                    page.page_text async for page in self.asset_page_model.iterate_pages(blob_hash=blob_hash)
+                ]
+            except Exception as e:
+                logger.error(f"Error while reading the pages of blob {blob_hash}: {e}")
+                return
+
+            if self.skill_controller is not None and self.app_settings.SKILL_EXTRACTION_ENABLED:
+                try:
+                    skills = self.skill_controller.extract_skills(page_texts)
+                    await self.asset_model.update_asset_skills(asset_ids=asset_ids, skills=skills)
+                except Exception as e:
+                    logger.error(f"Error while extracting the skills of blob {blob_hash}: {e}")
+
+            if self.keyword_index_controller is not None:
+                try:
+                    assets = await self.asset_model.get_assets_documents_by_ids(asset_ids=asset_ids)
+                    await self.keyword_index_controller.index_blob_assets(page_texts=page_texts, assets=assets)
+                except Exception as e:
+                    logger.error(f"Error while indexing the keywords of blob {blob_hash}: {e}")
+
+    async def get_or_extract_pages(self, blob_hash: str):
+
+        # a content already extracted for another asset (or another project) is not parsed again
+        blob = await self.blob_model.get_blob_document(blob_hash=blob_hash)
+        if blob and blob.blob_page_count is not None:
+            return blob.blob_page_count
+
+        file_path = await DataController().get_blob_path(file_hash=blob_hash)
+
+        if await asyncio.to_thread(is_word_document, file_path):
+            pages = await self.extract_word_pages(file_path=file_path)
+        else:
+            pages = await self.extract_pages(file_path=file_path)
+
+        await self.asset_page_model.insert_pages(blob_hash=blob_hash, pages=pages)
+        await self.blob_model.set_blob_page_count(blob_hash=blob_hash, page_count=len(pages))
+
+        return len(pages)
+
+    async def run_in_pool(self, func, *args):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            # a child died (a malformed PDF can crash the parser): replace the pool once for everybody
+            if self.pool is pool:
+                logger.error("Extraction process pool is broken, restarting it")
+                self.pool = self.create_pool()
+                # the surviving children and the management thread of the broken pool are released
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def extract_pages(self, file_path: str):
+        min_text_chars = self.app_settings.OCR_MIN_TEXT_CHARS if self.app_settings.OCR_ENABLED else 0
+        pages = await self.run_in_pool(extract_text_pages, file_path, min_text_chars)
+
+        ocr_page_indexes = [index for index, page in enumerate(pages) if page["needs_ocr"]]
+        if ocr_page_indexes:
+            await self.ocr_pages(file_path=file_path, pages=pages, page_indexes=ocr_page_indexes)
+
+        return [page["text"] for page in pages]
+
+    async def ocr_pages(self, file_path: str, pages: list, page_indexes: list):
+        """OCR the pages without a text layer, in parallel, skipping the pages already OCRed once"""
+        dpi = self.app_settings.OCR_DPI
+        lang = self.app_settings.OCR_LANG
+
+        ocr_keys = {index: f"{pages[index]['page_hash']}:{dpi}:{lang}" for index in page_indexes}
+        ocr_texts = await self.ocr_page_model.get_ocr_texts(ocr_keys=list(set(ocr_keys.values())))
+
+        # one task per distinct missing page: the pool spreads the pages of a scanned CV over the cores
+        missing = {}
+        for index, ocr_key in ocr_keys.items():
+            if ocr_key not in ocr_texts:
+                missing.setdefault(ocr_key, index)
+
+        if missing:
+            results = await asyncio.gather(*[
+                self.run_in_pool(ocr_pdf_page, file_path, index, dpi, lang)
+                for index in missing.values()
+            ])
+            new_texts = dict(zip(missing.keys(), results))
+            await self.ocr_page_model.insert_ocr_texts(ocr_texts=new_texts)
+            ocr_texts.update(new_texts)
+
+        for index, ocr_key in ocr_keys.items():
+            pages[index]["text"] = ocr_texts[ocr_key]
+
+    async def extract_word_pages(self, file_path: str):
+        if self.conversion_controller is None or not self.conversion_controller.is_enabled():
+            raise RuntimeError("Word documents can not be extracted: the conversion is disabled (CONVERSION_WORKERS=0)")
+
+        # the pdf is only an intermediate: the pages are stored, the converted file is not kept
+        pdf_dir = tempfile.mkdtemp(prefix="conversion-")
+        pdf_path = os.path.join(pdf_dir, "converted.pdf")
+        try:
+            await self.conversion_controller.convert_to_pdf(input_path=file_path, output_path=pdf_path)
+            return await self.extract_pages(file_path=pdf_path)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, pdf_dir, True)
+
+    async def shutdown(self):
+        for task in list(self.tasks):
+            task.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
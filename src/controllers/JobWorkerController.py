@@ -0,0 +1,153 @@
+from .BaseController import BaseController
+from models.JobModel import JobModel
+from models.db_schemes import Job
+import asyncio
+import logging
+import random
+import socket
+import os
+import uuid
+
+logger = logging.getLogger('uvicorn.error')
+
+class JobWorkerController(BaseController):
+    """Consumer loop of the job queue, run by worker.py
+
+    up to JOB_WORKER_CONCURRENCY jobs run at once in this process. a free slot claims the next job,
+    an empty queue is polled every JOB_POLL_INTERVAL_MS. every running job renews its lease each
+    JOB_HEARTBEAT_SECONDS and is cancelled as soon as its lease is lost to another worker.
+    a failed job goes back to the queue after an exponential backoff with jitter, and to the dead
+    letters after JOB_MAX_ATTEMPTS attempts. `handlers` maps a job type to an object with
+    `run_job(payload, final_attempt)` and `fail_job(payload, error)`.
+    """
+
+    def __init__(self, job_model: JobModel, handlers: dict):
+        super().__init__()
+        self.job_model = job_model
+        self.handlers = handlers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.slots = asyncio.Semaphore(self.app_settings.JOB_WORKER_CONCURRENCY)
+        self.tasks = {}                     # job id -> task running the job
+        self.stopping = asyncio.Event()
+
+    def get_retry_delay(self, attempts: int) -> float:
+        delay = min(self.app_settings.JOB_RETRY_MAX_DELAY_SECONDS,
+                    self.app_settings.JOB_RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
+
+    async def run(self):
+        logger.info(f"Job worker {self.worker_id} started ({self.app_settings.JOB_WORKER_CONCURRENCY} slots)")
+        job_types = list(self.handlers.keys())
+
+        while not self.stopping.is_set():
+            await self.slots.acquire()
+            if self.stopping.is_set():
+                self.slots.release()
+                break
+
+            try:
+                await self.dead_letter_expired_jobs()
+                job = await self.job_model.claim_job(
+                    worker_id=self.worker_id,
+                    job_types=job_types,
+                    lease_seconds=self.app_settings.JOB_LEASE_SECONDS,
+                    max_attempts=self.app_settings.JOB_MAX_ATTEMPTS,
+                )
+            except Exception as e:
+                logger.error(f"Error while claiming a job: {e}")
+                job = None
+
+            if job is None:
+                self.slots.release()
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), timeout=self.app_settings.JOB_POLL_INTERVAL_MS / 1000)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self.run_job(job=job))
+            self.tasks[job.id] = task
+            task.add_done_callback(lambda _, job_id=job.id: self.tasks.pop(job_id, None))
+            task.add_done_callback(lambda _: self.slots.release())
+
+    async def run_job(self, job: Job):
+        handler = self.handlers[job.job_type]
+        final_attempt = job.job_attempts >= self.app_settings.JOB_MAX_ATTEMPTS
+
+        work = asyncio.create_task(handler.run_job(payload=job.job_payload, final_attempt=final_attempt))
+        heartbeat = asyncio.create_task(self.heartbeat(job=job, work=work))
+        try:
+            await work
+
+        except asyncio.CancelledError:
+            if self.stopping.is_set():
+                # shutdown: the job goes back to the queue without losing an attempt
+                await self.job_model.release_job(job_id=job.id, worker_id=self.worker_id)
+            else:
+                logger.error(f"Job {job.id} was cancelled: its lease was lost")
+            return
+
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+            if final_attempt:
+                logger.error(f"Job {job.id} ({job.job_type}) failed for good after {job.job_attempts} attempts: {error}")
+                await self.job_model.dead_letter_job(job_id=job.id, error=error, worker_id=self.worker_id)
+                await handler.fail_job(payload=job.job_payload, error=error)
+            else:
+                delay = self.get_retry_delay(attempts=job.job_attempts)
+                logger.warning(f"Job {job.id} ({job.job_type}) failed, attempt {job.job_attempts}, retry in {delay:.0f}s: {error}")
+                await self.job_model.retry_job(job_id=job.id, worker_id=self.worker_id, error=error, retry_delay=delay)
+            return
+
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        await self.job_model.complete_job(
+            job_id=job.id,
+            worker_id=self.worker_id,
+            retention_seconds=self.app_settings.JOB_RETENTION_DAYS * 24 * 3600,
+        )
+
+    async def heartbeat(self, job: Job, work: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.app_settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                owned = await self.job_model.extend_lease(
+                    job_id=job.id,
+                    worker_id=self.worker_id,
+                    lease_seconds=self.app_settings.JOB_LEASE_SECONDS,
+                )
+            except Exception as e:
+                # a mongo hiccup: the lease is longer than a few heartbeats, the next one may pass
+                logger.error(f"Error while renewing the lease of job {job.id}: {e}")
+                continue
+
+            if not owned:
+                # another worker claimed the job after our lease expired: stop working on it
+                work.cancel()
+                return
+
+    async def dead_letter_expired_jobs(self):
+        """The jobs whose worker died on their last attempt are not claimable anymore: dead-letter them"""
+        for job in await self.job_model.get_expired_jobs(max_attempts=self.app_settings.JOB_MAX_ATTEMPTS):
+            error = f"The worker {job.job_worker_id} stopped renewing its lease"
+            if await self.job_model.dead_letter_job(job_id=job.id, error=error) is None:
+                continue        # renewed or dead-lettered in between
+            logger.error(f"Job {job.id} ({job.job_type}) is dead: {error}")
+            handler = self.handlers.get(job.job_type)
+            if handler is not None:
+                await handler.fail_job(payload=job.job_payload, error=error)
+
+    async def shutdown(self, timeout: float):
+        """Stop claiming, let the running jobs finish for `timeout` seconds, give back the others"""
+        self.stopping.set()
+        tasks = list(self.tasks.values())
+        if not tasks:
+            return
+
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,127 @@
+from .BaseController import BaseController
+from models.KeywordTermModel import KeywordTermModel
+from models.KeywordDocumentModel import KeywordDocumentModel
+from models.db_schemes import Asset, Project
+from utils.keyword_index import tokenize, count_terms, pack_posting, score_bm25
+from typing import List
+import numpy as np
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+class KeywordIndexController(BaseController):
+    """Per-project inverted index over the extracted CV text, scored with BM25
+
+    a CV is indexed as soon as its text is extracted: one posting per distinct term is appended
+    to the term documents of its project (incremental, no rebuild). a keyword query reads the
+    postings of its few terms only and scores them with numpy.
+    created once in the main.py lifespan.
+    """
+
+    def __init__(self, keyword_term_model: KeywordTermModel, keyword_document_model: KeywordDocumentModel):
+        super().__init__()
+        self.keyword_term_model = keyword_term_model
+        self.keyword_document_model = keyword_document_model
+
+    async def index_blob_assets(self, page_texts: List[str], assets: List[Asset]):
+        """Index the assets sharing an extracted content (the text is tokenized once)"""
+        if not self.app_settings.KEYWORD_INDEX_ENABLED or not assets:
+            return 0
+
+        term_counts = count_terms(page_texts)
+        length = sum(term_counts.values())
+
+        indexed = 0
+        for asset in assets:
+            doc_no = await self.keyword_document_model.register_document(
+                project_id=asset.asset_project_id,
+                asset_id=asset.id,
+                asset_name=asset.asset_name,
+                length=length,
+            )
+            if doc_no is None:
+                continue    # already indexed
+
+            await self.keyword_term_model.append_postings(
+                project_id=asset.asset_project_id,
+                postings={term: pack_posting(doc_no, tf, length) for term, tf in term_counts.items()},
+            )
+            # only now the asset counts as indexed: a failure above leaves it to the next attempt
+            await self.keyword_document_model.mark_document_indexed(
+                project_id=asset.asset_project_id,
+                asset_id=asset.id,
+            )
+            indexed += 1
+
+        return indexed
+
+    async def search(self, project: Project, query: str, top_k: int = 10):
+        """BM25 ranking of the project's CVs for a keyword query, best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        doc_count, average_length = await self.keyword_document_model.get_stats(project_id=project.id)
+        if doc_count == 0:
+            return []
+
+        term_postings = await self.keyword_term_model.get_terms_postings(project_id=project.id, terms=terms)
+
+        docs, scores = score_bm25(
+            term_postings=term_postings,
+            doc_count=doc_count,
+            average_length=average_length,
+            k1=self.app_settings.KEYWORD_BM25_K1,
+            b=self.app_settings.KEYWORD_BM25_B,
+        )
+        if len(docs) == 0:
+            return []
+
+        k = min(top_k, len(docs))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top_docs = [int(doc) for doc in docs[top]]
+
+        documents = await self.keyword_document_model.get_documents_by_numbers(project_id=project.id, doc_nos=top_docs)
+
+        results = []
+        for doc_no, score in zip(top_docs, scores[top]):
+            document = documents.get(doc_no)
+            if document is None:
+                continue
+            results.append({
+                "asset_id": str(document.doc_asset_id),
+                "asset_name": document.doc_asset_name,
+                "score": float(score),
+                "matched_terms": [
+                    term for term, postings in term_postings.items()
+                    if np.any(postings["doc"] == doc_no)
+                ],
+            })
+
+        return results
+
+    def fuse_rankings(self, keyword_results: list, vector_results: list, top_k: int = 10):
+        """Hybrid ranking: reciprocal rank fusion of the BM25 and the vector rankings
+
+        the two scores live on different scales: only the ranks are combined, 1 / (k + rank) per list.
+        """
+        rrf_k = self.app_settings.SEARCH_HYBRID_RRF_K
+
+        fused = {}
+        for source, results in (("keyword_score", keyword_results), ("vector_score", vector_results)):
+            for rank, result in enumerate(results, start=1):
+                entry = fused.setdefault(result["asset_id"], {
+                    "asset_id": result["asset_id"],
+                    "asset_name": result["asset_name"],
+                    "score": 0.0,
+                    "keyword_score": None,
+                    "vector_score": None,
+                    "matched_terms": [],
+                })
+                entry["score"] += 1 / (rrf_k + rank)
+                entry[source] = result["score"]
+                if "matched_terms" in result:
+                    entry["matched_terms"] = result["matched_terms"]
+
+        return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:top_k]
@@ -0,0 +1,229 @@
+from .BaseController import BaseController
+from .ProcessController import ProcessController
+from models.AssetModel import AssetModel
+from models.AssetPageModel import AssetPageModel
+from models.db_schemes import Project, VectorRecord, RetrievedDocument
+from models.enums.ExtractionStatusEnum import ExtractionStatusEnum
+from stores.llm import EmbeddingClient, DocumentTypeEnum, InferenceScheduler
+from stores.vectordb import VectorDBInterface
+from collections import defaultdict
+from typing import AsyncIterator, List, Tuple
+import numpy as np
+
+class NLPController(BaseController):
+    """Chunks of the extracted CVs -> embeddings -> vector DB collection of the project
+
+    the chunks are streamed from mongo and sent in batches of VECTOR_DB_BATCH_SIZE: one embedding
+    pass (cached, micro-batched) and one bulk upsert per batch, whatever the size of the project.
+    """
+
+    def __init__(self, vectordb_client: VectorDBInterface, embedding_client: EmbeddingClient,
+                 inference_scheduler: InferenceScheduler = None):
+        super().__init__()
+        self.vectordb_client = vectordb_client
+        self.embedding_client = embedding_client
+        self.inference_scheduler = inference_scheduler
+
+    def create_collection_name(self, project_id: str):
+        return f"collection_{self.embedding_client.embedding_size}_{project_id}".strip()
+
+    async def reset_vector_db_collection(self, project: Project):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.delete_collection(collection_name=collection_name)
+
+    async def index_into_vector_db(self, project: Project, asset_model: AssetModel,
+                                   asset_page_model: AssetPageModel, do_reset: bool = False):
+        """Index every extracted asset of the project, returns (indexed assets, inserted chunks)"""
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        await self.vectordb_client.create_collection(
+            collection_name=collection_name,
+            embedding_size=self.embedding_client.embedding_size,
+            do_reset=do_reset,
+        )
+
+        process_controller = ProcessController()
+        batch_size = self.app_settings.VECTOR_DB_BATCH_SIZE
+
+        indexed_assets = 0
+        inserted_chunks = 0
+        batch = []
+        cleared_assets = set()
+
+        async for asset in asset_model.iterate_assets_documents(asset_project_id=project.id):
+            if asset.asset_extraction_status != ExtractionStatusEnum.DONE.value:
+                continue
+
+            indexed_assets += 1
+            async for chunk in process_controller.iterate_blob_chunks(
+                asset_page_model=asset_page_model,
+                blob_hash=asset.asset_hash,
+            ):
+                batch.append((asset, chunk))
+                if len(batch) >= batch_size:
+                    inserted_chunks += await self.insert_batch(collection_name=collection_name, batch=batch,
+                                                               cleared_assets=cleared_assets)
+                    batch = []
+
+        if batch:
+            inserted_chunks += await self.insert_batch(collection_name=collection_name, batch=batch,
+                                                       cleared_assets=cleared_assets)
+
+        return indexed_assets, inserted_chunks
+
+    async def insert_batch(self, collection_name: str, batch: list, cleared_assets: set):
+        # the previous records of an asset go before its first chunk: a CV re-chunked into fewer chunks
+        # would otherwise keep its old `asset_id:chunk_order` records past the new last one
+        new_asset_ids = list(dict.fromkeys(str(asset.id) for asset, _ in batch if str(asset.id) not in cleared_assets))
+        if new_asset_ids:
+            await self.vectordb_client.delete_by_metadata(
+                collection_name=collection_name,
+                field="asset_id",
+                values=new_asset_ids,
+            )
+            cleared_assets.update(new_asset_ids)
+
+        vectors = await self.embedding_client.embed_texts(
+            texts=[chunk.chunk_text for _, chunk in batch],
+            document_type=DocumentTypeEnum.DOCUMENT.value,
+        )
+
+        records = [
+            VectorRecord(
+                id=f"{asset.id}:{chunk.chunk_order}",
+                text=chunk.chunk_text,
+                vector=vector,
+                metadata={
+                    "asset_id": str(asset.id),
+                    "asset_name": asset.asset_name,
+                    **chunk.model_dump(exclude={"chunk_text"}),
+                },
+            )
+            for (asset, chunk), vector in zip(batch, vectors)
+        ]
+
+        return await self.vectordb_client.insert_many(collection_name=collection_name, records=records)
+
+    async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10) -> List[RetrievedDocument]:
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        if not await self.vectordb_client.is_collection_existed(collection_name):
+            return []
+
+        vector = await self.embedding_client.embed_text(text=text, document_type=DocumentTypeEnum.QUERY.value)
+
+        return await self.vectordb_client.search_by_vector(
+            collection_name=collection_name,
+            vector=vector,
+            limit=limit,
+        )
+
+    async def embed_job_description(self, job_description: str) -> List[float]:
+        """One query vector for a job description of any length: the mean of its chunk embeddings"""
+        chunker = ProcessController().get_chunker()
+        texts = [chunk.chunk_text for chunk in chunker.feed(job_description, 1)]
+        texts += [chunk.chunk_text for chunk in chunker.flush()]
+        if not texts:
+            return None
+
+        vectors = np.asarray(await self.embedding_client.embed_texts(
+            texts=texts,
+            document_type=DocumentTypeEnum.QUERY.value,
+        ), dtype=np.float32)
+
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        vector = vectors.mean(axis=0)
+        return (vector / max(np.linalg.norm(vector), 1e-12)).tolist()
+
+    async def match_job_description(self, project: Project, job_description: str, top_k: int = 10):
+        """Rank the CVs of the project against a job description, best first
+
+        the job description is embedded once and scored against every chunk of the project: each CV is
+        ranked on its own best chunks, however many chunks the other CVs have.
+        the score of a CV is the weighted mean of its best chunks (weights 1, 1/2, 1/4...):
+        a CV matching the offer in several places beats a CV with a single lucky sentence.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        if not await self.vectordb_client.is_collection_existed(collection_name):
+            return []
+
+        vector = await self.embed_job_description(job_description=job_description)
+        if vector is None:
+            return []
+
+        supporting_chunks = self.app_settings.MATCH_SUPPORTING_CHUNKS
+        documents = await self.vectordb_client.search_by_vector_per_group(
+            collection_name=collection_name,
+            vector=vector,
+            group_field="asset_id",
+            group_size=supporting_chunks,
+        )
+
+        weights = [0.5 ** rank for rank in range(supporting_chunks)]
+
+        # the documents come best first: the first chunks of a CV are its best ones
+        chunks_by_asset = defaultdict(list)
+        for document in documents:
+            chunks_by_asset[document.metadata.get("asset_id")].append(document)
+
+        matches = []
+        for asset_id, chunks in chunks_by_asset.items():
+            score = sum(weight * chunk.score for weight, chunk in zip(weights, chunks)) / sum(weights)
+            matches.append({
+                "asset_id": asset_id,
+                "asset_name": chunks[0].metadata.get("asset_name"),
+                "score": score,
+                "chunks": [
+                    {
+                        "text": chunk.text,
+                        "score": chunk.score,
+                        "section": chunk.metadata.get("chunk_section"),
+                        "page": chunk.metadata.get("chunk_page_start"),
+                    }
+                    for chunk in chunks
+                ],
+            })
+
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:top_k]
+
+    def create_answer_prompt(self, query: str, documents: List[RetrievedDocument]) -> List[dict]:
+        context = "\n\n".join(
+            f"## Document {index} ({document.metadata.get('asset_name')}) ##\n{document.text}"
+            for index, document in enumerate(documents, start=1)
+        )
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are an assistant helping a recruiter with the CVs of a project.\n"
+                    "Answer the question using only the CV extracts below, cite the documents you use.\n"
+                    "If the extracts do not hold the answer, say so.\n\n"
+                    f"{context}"
+                )
+            },
+            {
+                "role": "user",
+                "content": query
+            },
+        ]
+
+    async def stream_rag_answer(self, project: Project, query: str,
+                                limit: int = 5) -> AsyncIterator[Tuple[str, dict]]:
+        """Answer a question over the indexed CVs: ("token", {"text"}) events, then one ("result", {...})"""
+        documents = await self.search_vector_db_collection(project=project, text=query, limit=limit)
+        prompt = self.create_answer_prompt(query=query, documents=documents)
+
+        deltas = []
+        async for delta in self.inference_scheduler.stream(
+            prompt=prompt,
+            max_output_tokens=self.app_settings.GENERATION_DAFAULT_MAX_TOKENS,
+            temperature=self.app_settings.GENERATION_DAFAULT_TEMPERATURE,
+        ):
+            deltas.append(delta)
+            yield "token", {"text": delta}
+
+        yield "result", {
+            "answer": "".join(deltas),
+            "documents": [document.dict() for document in documents],
+        }
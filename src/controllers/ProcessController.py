@@ -0,0 +1,31 @@
+from .BaseController import BaseController
+from models.AssetPageModel import AssetPageModel
+from utils.text_chunking import TextChunker, TextChunk
+from typing import AsyncIterator
+
+class ProcessController(BaseController):
+    """Extracted text -> chunks ready for the embedding backend
+
+    the pages are read from the mongo cursor one by one and every chunk is yielded as soon as it is full,
+    so a large batch of CVs is chunked with the memory of a single page.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    def get_chunker(self) -> TextChunker:
+        return TextChunker(
+            max_characters=self.app_settings.INPUT_DAFAULT_MAX_CHARACTERS or 1024,
+            max_tokens=self.app_settings.CHUNK_MAX_TOKENS,
+            overlap_characters=self.app_settings.CHUNK_OVERLAP_CHARACTERS,
+        )
+
+    async def iterate_blob_chunks(self, asset_page_model: AssetPageModel, blob_hash: str) -> AsyncIterator[TextChunk]:
+        chunker = self.get_chunker()
+
+        async for page in asset_page_model.iterate_pages(blob_hash=blob_hash):
+            for chunk in chunker.feed(page.page_text, page.page_number):
+                yield chunk
+
+        for chunk in chunker.flush():
+            yield chunk
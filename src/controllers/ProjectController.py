@@ -1,6 +1,7 @@
 from .BaseController import BaseController
 from fastapi import UploadFile
 from models import ResponseSignal
+from utils.storage import ensure_dir
 import os
 
 class ProjectController(BaseController):
@@ -8,15 +9,12 @@ class ProjectController(BaseController):
     def __init__(self):
         super().__init__()
 
-    def get_project_path(self, project_id: str):
+    async def get_project_path(self, project_id: str):
         project_dir = os.path.join(
             self.files_dir,
             str(project_id)
         )
 
-        if not os.path.exists(project_dir):
-            os.makedirs(project_dir)
-
-        return project_dir
+        return await ensure_dir(project_dir)
 
     
@@ -0,0 +1,76 @@
+from .BaseController import BaseController
+from utils.aho_corasick import AhoCorasick
+from utils.keyword_index import fold_text
+from typing import Dict, List
+import logging
+import json
+import os
+import re
+
+logger = logging.getLogger('uvicorn.error')
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+class SkillController(BaseController):
+    """Deterministic skill tagging: the skill taxonomy matched against the CV text in one pass
+
+    every skill name and alias of SKILL_TAXONOMY_PATH goes into one Aho-Corasick automaton,
+    built once per worker. a match counts only on word boundaries ("java" does not match in "javascript"),
+    and the names marked "ambiguous" in the taxonomy ("C", "Go", "Word"...) are only found through their aliases.
+    created once in the main.py lifespan.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.automaton = AhoCorasick()
+        self.skills = {}            # canonical name -> taxonomy entry
+        self.aliases = {}           # folded name or alias -> canonical name
+
+        taxonomy_path = self.app_settings.SKILL_TAXONOMY_PATH
+        if not os.path.isabs(taxonomy_path):
+            taxonomy_path = os.path.join(self.base_dir, taxonomy_path)
+
+        with open(taxonomy_path, "r", encoding="utf-8") as f:
+            taxonomy = json.load(f)
+
+        for entry in taxonomy:
+            name = entry["name"]
+            self.skills[name] = entry
+
+            patterns = [alias for alias in entry.get("aliases", [])]
+            if not entry.get("ambiguous"):
+                patterns.append(name)
+
+            self.aliases[self.normalize(name)] = name
+            for pattern in patterns:
+                normalized = self.normalize(pattern)
+                self.aliases[normalized] = name
+                self.automaton.add(normalized, name)
+
+        self.automaton.build()
+        logger.info(f"Skill taxonomy loaded: {len(self.skills)} skills, {len(self.automaton)} automaton states")
+
+    def normalize(self, text: str) -> str:
+        # the line breaks of the pdf text must not hide "power\\nbi"
+        return WHITESPACE_PATTERN.sub(" ", fold_text(text)).strip()
+
+    def count_skills(self, texts: List[str]) -> Dict[str, int]:
+        counts = {}
+        for text in texts:
+            text = self.normalize(text)
+            for start, end, name in self.automaton.iter_matches(text):
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def extract_skills(self, texts: List[str]) -> List[str]:
+        """Canonical names of the skills found in the texts, most mentioned first"""
+        counts = self.count_skills(texts)
+        return sorted(counts, key=lambda name: (-counts[name], name))
+
+    def normalize_skill_names(self, names: List[str]) -> List[str]:
+        """Map the skills of a filter to their canonical names ("powerbi", "power bi" -> "Power BI")"""
+        return [self.aliases.get(self.normalize(name), name) for name in names if name and name.strip()]
@@ -0,0 +1,166 @@
+from .DataController import DataController
+from fastapi import Request
+from models import ResponseSignal
+from multipart.multipart import MultipartParser, parse_options_header
+from utils.storage import ensure_dir, remove_file
+import aiofiles
+import hashlib
+import os
+
+class UploadTooLargeError(Exception):
+    """A file part crossed the size limit: the upload is aborted without reading the rest of the body"""
+
+    def __init__(self, filename: str):
+        super().__init__(f"The file {filename} exceeds the size limit")
+        self.filename = filename
+
+class StreamUploadController(DataController):
+    """Parse a multipart/form-data body while it arrives and write each file part once
+
+    the parts are written to a temp file inside the blob store (same filesystem), so storing
+    a new content afterwards is a rename and never a second copy.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tmp_dir = os.path.join(self.blobs_dir, "tmp")
+
+    async def get_tmp_path(self):
+        tmp_dir = await ensure_dir(self.tmp_dir)
+        return os.path.join(tmp_dir, self.generate_random_string(length=24) + ".part")
+
+    async def receive_parts(self, request: Request):
+        """Return one dict per file part, in the order of the body
+
+        part keys: filename, content_type, tmp_path, file_hash, file_size, error
+        raises ValueError when the body is not a valid multipart body,
+        UploadTooLargeError as soon as a file part crosses the size limit
+        """
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise ValueError("Expected a multipart/form-data body with a boundary")
+
+        # the parser callbacks are synchronous: they only queue the events,
+        # the events are handled (and the files written) asynchronously after each chunk
+        events = []
+        callbacks = {
+            "on_part_begin": lambda: events.append(("part_begin", b"")),
+            "on_part_data": lambda data, start, end: events.append(("part_data", data[start:end])),
+            "on_part_end": lambda: events.append(("part_end", b"")),
+            "on_header_field": lambda data, start, end: events.append(("header_field", data[start:end])),
+            "on_header_value": lambda data, start, end: events.append(("header_value", data[start:end])),
+            "on_header_end": lambda: events.append(("header_end", b"")),
+            "on_headers_finished": lambda: events.append(("headers_finished", b"")),
+        }
+        parser = MultipartParser(params[b"boundary"], callbacks)
+
+        parts = []
+        state = {"part": None, "file": None, "hasher": None, "headers": {}, "field": b"", "value": b""}
+
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                for event, data in events:
+                    await self.handle_event(event=event, data=data, state=state, parts=parts)
+                events.clear()
+
+            parser.finalize()
+
+            # a part cut by the end of the body never reached part_end
+            for part in parts:
+                if not part["error"] and part["file_hash"] is None:
+                    part["error"] = ResponseSignal.FILE_UPLOAD_FAILED.value
+                    await self.discard_part(part=part, state=state)
+
+        except Exception as e:
+            # client disconnected or malformed body: nothing of this request is kept on disk
+            if state["file"]:
+                await state["file"].close()
+            await self.remove_tmp_files(parts=parts)
+            if isinstance(e, (ValueError, UploadTooLargeError)):
+                raise
+            raise ValueError(str(e)) from e
+
+        return parts
+
+    async def handle_event(self, event: str, data: bytes, state: dict, parts: list):
+
+        if event == "part_begin":
+            state.update({"part": None, "file": None, "hasher": None, "headers": {}, "field": b"", "value": b""})
+
+        elif event == "header_field":
+            state["field"] += data
+
+        elif event == "header_value":
+            state["value"] += data
+
+        elif event == "header_end":
+            state["headers"][state["field"].lower()] = state["value"]
+            state["field"], state["value"] = b"", b""
+
+        elif event == "headers_finished":
+            _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+
+            # plain form fields (no filename) are ignored
+            if b"filename" not in options:
+                return
+
+            part = {
+                "filename": options[b"filename"].decode("utf-8", errors="replace"),
+                "content_type": state["headers"].get(b"content-type", b"").decode("latin-1"),
+                "tmp_path": None,
+                "file_hash": None,
+                "file_size": 0,
+                "error": None,
+            }
+            parts.append(part)
+            state["part"] = part
+
+            # the type is known before the first byte of the content: a rejected part is never written
+            if not self.validate_file_type(content_type=part["content_type"]):
+                part["error"] = ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
+                return
+
+            part["tmp_path"] = await self.get_tmp_path()
+            state["file"] = await aiofiles.open(part["tmp_path"], "wb")
+            state["hasher"] = hashlib.sha256()
+
+        elif event == "part_data":
+            part = state["part"]
+            if part is None or part["error"]:
+                return
+
+            part["file_size"] += len(data)
+
+            # stop as soon as the limit is crossed: the rest of the body is not even read
+            if not self.validate_file_size(file_size=part["file_size"]):
+                part["error"] = ResponseSignal.FILE_SIZE_EXCEEDED.value
+                await self.discard_part(part=part, state=state)
+                raise UploadTooLargeError(filename=part["filename"])
+
+            # the stream chunks are small (~64KB), hashing them inline is cheaper than a thread hop
+            state["hasher"].update(data)
+            await state["file"].write(data)
+
+        elif event == "part_end":
+            part = state["part"]
+            if part is None or part["error"]:
+                return
+
+            await state["file"].close()
+            state["file"] = None
+            part["file_hash"] = state["hasher"].hexdigest()
+
+    async def discard_part(self, part: dict, state: dict):
+        if state["file"]:
+            await state["file"].close()
+            state["file"] = None
+
+        if part["tmp_path"]:
+            await remove_file(part["tmp_path"])
+        part["tmp_path"] = None
+
+    async def remove_tmp_files(self, parts: list):
+        for part in parts:
+            if part["tmp_path"]:
+                await remove_file(part["tmp_path"])
@@ -0,0 +1,89 @@
+from .DataController import DataController
+from starlette.requests import ClientDisconnect
+from utils.storage import ensure_dir
+import aiofiles
+import aiofiles.os
+import asyncio
+import hashlib
+import shutil
+import uuid
+import os
+
+class UploadSessionController(DataController):
+    """Files of the resumable uploads: one growing file per session until it is finalized
+
+    the session files live inside the blob store (same filesystem), so the finalization
+    of a new content is a rename and never a copy.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.sessions_dir = os.path.join(self.blobs_dir, "uploads")
+
+    async def get_session_path(self, upload_id: str):
+        sessions_dir = await ensure_dir(self.sessions_dir)
+        return os.path.join(sessions_dir, str(upload_id) + ".part")
+
+    async def create_session_file(self, upload_id: str):
+        # an empty file from the start: the PATCHes always write in place and an empty upload can be finalized
+        async with aiofiles.open(await self.get_session_path(upload_id=upload_id), "wb"):
+            pass
+
+    async def get_chunk_path(self, upload_id: str):
+        # one private file per PATCH: concurrent PATCHes never write into the same file while receiving
+        sessions_dir = await ensure_dir(self.sessions_dir)
+        return os.path.join(sessions_dir, f"{upload_id}.{uuid.uuid4().hex}.chunk")
+
+    async def receive_chunk(self, chunk_path: str, stream, max_bytes: int):
+        """Write the request stream into its own chunk file
+
+        returns (bytes_written, too_large). a client that disconnects keeps what was received
+        before the disconnect, so the next PATCH resumes from there instead of from the chunk start.
+        """
+        written = 0
+        too_large = False
+
+        async with aiofiles.open(chunk_path, "wb") as f:
+            try:
+                async for chunk in stream:
+                    if written + len(chunk) > max_bytes:
+                        # keep what fits, the announced size is never exceeded
+                        chunk = chunk[:max_bytes - written]
+                        too_large = True
+
+                    await f.write(chunk)
+                    written += len(chunk)
+
+                    if too_large:
+                        break
+            except ClientDisconnect:
+                pass
+
+            await f.flush()
+
+        return written, too_large
+
+    async def apply_chunk(self, chunk_path: str, session_path: str, offset: int):
+        """Copy a received chunk into the session file at `offset`, once the PATCH holds the session writer claim"""
+        await asyncio.to_thread(self._copy_chunk, chunk_path, session_path, offset)
+
+    def _copy_chunk(self, chunk_path: str, session_path: str, offset: int):
+        with open(chunk_path, "rb") as source, open(session_path, "r+b") as target:
+            target.seek(offset)
+            shutil.copyfileobj(source, target, self.app_settings.FILE_DEFAULT_CHUNK_SIZE)
+
+    async def remove_chunk(self, chunk_path: str):
+        try:
+            await aiofiles.os.remove(chunk_path)
+        except FileNotFoundError:
+            pass
+
+    async def get_file_hash(self, file_path: str):
+        return await asyncio.to_thread(self._hash_file, file_path)
+
+    def _hash_file(self, file_path: str):
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(self.app_settings.FILE_DEFAULT_CHUNK_SIZE):
+                hasher.update(chunk)
+        return hasher.hexdigest()
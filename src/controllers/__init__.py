@@ -1,2 +1,12 @@
 from .DataController import DataController
-from .ProjectController import ProjectController
\ No newline at end of file
+from .ProjectController import ProjectController
+from .StreamUploadController import StreamUploadController, UploadTooLargeError
+from .UploadSessionController import UploadSessionController
+from .ConversionController import ConversionController
+from .ExtractionController import ExtractionController
+from .ProcessController import ProcessController
+from .NLPController import NLPController
+from .KeywordIndexController import KeywordIndexController
+from .SkillController import SkillController
+from .AnalysisController import AnalysisController
+from .JobWorkerController import JobWorkerController
\ No newline at end of file
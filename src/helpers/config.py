@@ -1,5 +1,11 @@
+from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
+import threading
+import logging
+import os
+
+logger = logging.getLogger('uvicorn.error')
 
 class Settings(BaseSettings):
 
@@ -10,12 +16,45 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: List[str]
     FILE_MAX_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
+    FILE_MAX_CONCURRENT_UPLOADS: int = 8
+    # resumable uploads: lease of the PATCH writing its chunk, age of a finalization taken over after a crash
+    UPLOAD_WRITER_LEASE_SECONDS: int = 60
+    UPLOAD_FINALIZE_TIMEOUT_SECONDS: int = 600
 
     MONGODB_URL: str
     MONGODB_DB: str
 
+    PROJECT_CACHE_SIZE: int = 10000
+    PROJECT_CACHE_TTL: int = 300
+
+    LISTING_MAX_PAGE_SIZE: int = 100
+    LISTING_BATCH_SIZE: int = 500
+
+    # uvicorn workers of the host: uvicorn reads the same variable when --workers is not given
+    WEB_CONCURRENCY: int = 1
+    # 0 = the cores shared between the uvicorn workers (cpu_count // WEB_CONCURRENCY processes each)
+    EXTRACTION_MAX_WORKERS: int = 0
+
+    # long-lived office processes converting DOC/DOCX to PDF (0 = Word CVs are not converted)
+    CONVERSION_WORKERS: int = 0
+    CONVERSION_COMMAND: str = "unoserver"
+    CONVERSION_TIMEOUT: int = 60
+    CONVERSION_STARTUP_TIMEOUT: int = 60
+    CONVERSION_QUEUE_SIZE: int = 100
+
+    # pages with less text than OCR_MIN_TEXT_CHARS are rasterized at OCR_DPI and OCRed
+    OCR_ENABLED: bool = True
+    OCR_DPI: int = 200
+    OCR_LANG: str = "eng"
+    OCR_MIN_TEXT_CHARS: int = 20
+
+    # chunks sent to the embedding backend: INPUT_DAFAULT_MAX_CHARACTERS is the character budget
+    CHUNK_MAX_TOKENS: int = 256
+    CHUNK_OVERLAP_CHARACTERS: int = 150
+
     POSTGRES_USERNAME: str
-    POSTGRES_PASSWORD: str
+    # the secrets are SecretStr: model_dump() and the logs show ********** (get_secret_value() to use them)
+    POSTGRES_PASSWORD: SecretStr
     POSTGRES_HOST: str
     POSTGRES_PORT: int
     POSTGRES_MAIN_DATABASE: str
@@ -23,14 +62,38 @@ class Settings(BaseSettings):
     GENERATION_BACKEND: str
     EMBEDDING_BACKEND: str
 
-    OPENAI_API_KEY: str = None
+    OPENAI_API_KEY: Optional[SecretStr] = None
     OPENAI_API_URL: str = None
-    COHERE_API_KEY: str = None
+    COHERE_API_KEY: Optional[SecretStr] = None
+    # limits of each backend account shared by the calls of a worker (0 = no limit), pooled http clients
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 200000
+    OPENAI_MAX_CONCURRENT_REQUESTS: int = 32
+    COHERE_REQUESTS_PER_MINUTE: int = 1000
+    COHERE_TOKENS_PER_MINUTE: int = 0
+    COHERE_MAX_CONCURRENT_REQUESTS: int = 32
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_REQUEST_TIMEOUT: int = 60
+    LLM_MAX_RETRIES: int = 5
+    LLM_RETRY_BASE_DELAY_MS: int = 500
+    LLM_RETRY_MAX_DELAY_MS: int = 30000
 
     GENERATION_MODEL_ID_LITERAL: List[str] = None
     GENERATION_MODEL_ID: str = None
     EMBEDDING_MODEL_ID: str = None
     EMBEDDING_MODEL_SIZE: int = None
+
+    # micro-batching of the embedding requests and the caches in front of the backend ("" = no disk cache)
+    EMBEDDING_BATCH_SIZE: int = 96
+    EMBEDDING_BATCH_MAX_WAIT_MS: int = 20
+    EMBEDDING_MAX_CONCURRENT_REQUESTS: int = 4
+    EMBEDDING_MEMORY_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PATH: str = "assets/cache/embeddings.sqlite3"
+    # micro-batching of the generation requests (GENERATION_BACKEND="LOCAL" is a fake CPU model)
+    GENERATION_BATCH_SIZE: int = 8
+    GENERATION_BATCH_MAX_WAIT_MS: int = 50
+    GENERATION_MAX_CONCURRENT_BATCHES: int = 1
+    GENERATION_QUEUE_SIZE: int = 256
     INPUT_DAFAULT_MAX_CHARACTERS: int = None
     GENERATION_DAFAULT_MAX_TOKENS: int = None
     GENERATION_DAFAULT_TEMPERATURE: float = None
@@ -40,12 +103,99 @@ class Settings(BaseSettings):
     VECTOR_DB_PATH : str
     VECTOR_DB_DISTANCE_METHOD: str = None
     VECTOR_DB_PGVEC_INDEX_THRESHOLD: int = 100
+    # records per upsert (COPY batch for pgvector), qdrant server url (local folder VECTOR_DB_PATH when empty)
+    VECTOR_DB_BATCH_SIZE: int = 500
+    VECTOR_DB_POOL_SIZE: int = 10
+    VECTOR_DB_URL: str = None
+    # storage of the NUMPY backend: "float32" or "int8" (4x smaller, approximate scores)
+    VECTOR_DB_NUMPY_DTYPE: str = "float32"
+
+    # job description matching: best chunks kept per CV, biggest top_k
+    MATCH_SUPPORTING_CHUNKS: int = 3
+    MATCH_MAX_TOP_K: int = 50
+
+    # keyword index: BM25 parameters, tail length that triggers the compaction of a term's postings
+    KEYWORD_INDEX_ENABLED: bool = True
+    KEYWORD_BM25_K1: float = 1.2
+    KEYWORD_BM25_B: float = 0.75
+    KEYWORD_TAIL_COMPACT_SIZE: int = 256
+
+    # hybrid search: candidates taken from each ranking, constant of the reciprocal rank fusion
+    SEARCH_HYBRID_CANDIDATES: int = 100
+    SEARCH_HYBRID_RRF_K: int = 60
+
+    # skill extraction: taxonomy of skills and aliases, relative to src/
+    SKILL_EXTRACTION_ENABLED: bool = True
+    SKILL_TAXONOMY_PATH: str = "helpers/skills_taxonomy.json"
+
+    # structured CV analysis: characters of CV text put in the prompt, answer budget
+    ANALYSIS_MAX_CV_CHARACTERS: int = 12000
+    ANALYSIS_MAX_OUTPUT_TOKENS: int = 1800
+
+    # analysis results cached per (CV, job description, model, prompt version, language), 0 days = no expiry
+    ANALYSIS_CACHE_SIZE: int = 1000
+    ANALYSIS_CACHE_TTL_DAYS: int = 30
+
+    # streamed (SSE) generations: comment line sent after this many seconds without a token
+    SSE_HEARTBEAT_SECONDS: int = 15
+    # RAG answers: most retrieved chunks put in the prompt, whatever the `limit` of the request
+    RAG_MAX_LIMIT: int = 20
+
+    # durable job queue in mongo: the API enqueues the extractions, `python worker.py` processes run them
+    JOB_QUEUE_ENABLED: bool = False
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_MS: int = 1000
+    JOB_LEASE_SECONDS: int = 120
+    JOB_HEARTBEAT_SECONDS: int = 30
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_DELAY_SECONDS: int = 10
+    JOB_RETRY_MAX_DELAY_SECONDS: int = 600
+    JOB_RETENTION_DAYS: int = 7
+    JOB_SHUTDOWN_TIMEOUT_SECONDS: int = 30
 
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
 
+    # 0 disables the .env watcher, the settings can still be reloaded with SIGHUP or the admin endpoint
+    SETTINGS_RELOAD_INTERVAL: int = 0
+    ADMIN_API_KEY: Optional[SecretStr] = None
+
     # Pydantic Settings
     model_config = SettingsConfigDict(env_file=".env")
 
-def get_settings():
-    return Settings()
+# one settings snapshot per process: parsing and validating .env happens once, not on every call.
+# a reload builds a complete new Settings object first and then swaps the reference,
+# so readers always see either the old or the new snapshot, never a half updated one.
+_settings: Settings = None
+_settings_lock = threading.Lock()
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+def reload_settings() -> Settings:
+    """Re-read .env and replace the cached snapshot (keeps the old one if the new config is invalid)"""
+    global _settings
+    with _settings_lock:
+        try:
+            _settings = Settings()
+            logger.info("Settings reloaded")
+        except Exception as e:
+            logger.error(f"Settings reload failed, keeping the previous settings: {e}")
+            if _settings is None:
+                raise
+    return _settings
+
+def get_secret(value: Optional[SecretStr]) -> Optional[str]:
+    return value.get_secret_value() if value is not None else None
+
+def get_settings_file_mtime():
+    env_file = Settings.model_config.get("env_file")
+    try:
+        return os.path.getmtime(env_file)
+    except (OSError, TypeError):
+        return None
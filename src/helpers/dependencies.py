@@ -0,0 +1,64 @@
+from fastapi import Request
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.BlobModel import BlobModel
+from models.UploadSessionModel import UploadSessionModel
+from models.AssetPageModel import AssetPageModel
+from models.AnalysisResultModel import AnalysisResultModel
+from models.JobModel import JobModel
+from controllers import ExtractionController, NLPController, KeywordIndexController, SkillController, AnalysisController
+from stores.llm import EmbeddingClient, InferenceScheduler
+
+# the models are created once in the main.py lifespan (indexes included) and kept on the app,
+# so the routes get them through Depends without any per-request mongo round trip
+
+def get_project_model(request: Request) -> ProjectModel:
+    return request.app.project_model
+
+def get_asset_model(request: Request) -> AssetModel:
+    return request.app.asset_model
+
+def get_blob_model(request: Request) -> BlobModel:
+    return request.app.blob_model
+
+def get_upload_session_model(request: Request) -> UploadSessionModel:
+    return request.app.upload_session_model
+
+def get_asset_page_model(request: Request) -> AssetPageModel:
+    return request.app.asset_page_model
+
+def get_extraction_controller(request: Request) -> ExtractionController:
+    return request.app.extraction_controller
+
+
+def get_embedding_client(request: Request) -> EmbeddingClient:
+    return request.app.embedding_client
+
+def get_keyword_index_controller(request: Request) -> KeywordIndexController:
+    return request.app.keyword_index_controller
+
+def get_skill_controller(request: Request) -> SkillController:
+    return request.app.skill_controller
+
+def get_nlp_controller(request: Request) -> NLPController:
+    return NLPController(
+        vectordb_client=request.app.vectordb_client,
+        embedding_client=request.app.embedding_client,
+        inference_scheduler=request.app.inference_scheduler,
+    )
+
+def get_analysis_result_model(request: Request) -> AnalysisResultModel:
+    return request.app.analysis_result_model
+
+def get_inference_scheduler(request: Request) -> InferenceScheduler:
+    return request.app.inference_scheduler
+
+def get_analysis_controller(request: Request) -> AnalysisController:
+    return AnalysisController(
+        inference_scheduler=request.app.inference_scheduler,
+        asset_page_model=request.app.asset_page_model,
+        analysis_result_model=request.app.analysis_result_model,
+    )
+
+def get_job_model(request: Request) -> JobModel:
+    return request.app.job_model
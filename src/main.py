@@ -1,10 +1,36 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from helpers.config import get_settings
-from routes import data, data_multiple
+from helpers.config import get_settings, reload_settings, get_settings_file_mtime
+from routes import data, data_multiple, admin, uploads, projects, nlp, match, search, analysis
 from motor.motor_asyncio import AsyncIOMotorClient
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.BlobModel import BlobModel
+from models.UploadSessionModel import UploadSessionModel
+from models.AssetPageModel import AssetPageModel
+from models.OcrPageModel import OcrPageModel
+from models.KeywordTermModel import KeywordTermModel
+from models.KeywordDocumentModel import KeywordDocumentModel
+from models.AnalysisResultModel import AnalysisResultModel
+from models.JobModel import JobModel
+from controllers import ExtractionController, ConversionController, KeywordIndexController, SkillController
+from stores.llm import LLMProviderFactory
+from stores.vectordb import VectorDBProviderFactory
 
 from utils.metrics import setup_metrics
+import asyncio
+import signal
+
+
+async def watch_settings_file(interval: int):
+    """Reload the settings when .env changes, so every uvicorn worker follows a config edit without restart"""
+    last_mtime = get_settings_file_mtime()
+    while True:
+        await asyncio.sleep(interval)
+        mtime = get_settings_file_mtime()
+        if mtime != last_mtime:
+            last_mtime = mtime
+            reload_settings()
 
 
 @asynccontextmanager
@@ -17,6 +43,89 @@ async def lifespan(app: FastAPI):
     app.db_client = app.mongo_conn[settings.MONGODB_DB]
 
     print("✅ Connected to MongoDB")
+
+    # ensure the indexes once at startup and share the model instances with the routes
+    app.project_model = ProjectModel(db_client=app.db_client)
+    await app.project_model.ensure_indexes()
+
+    app.asset_model = AssetModel(db_client=app.db_client)
+    await app.asset_model.ensure_indexes()
+
+    app.blob_model = BlobModel(db_client=app.db_client)
+    await app.blob_model.ensure_indexes()
+
+    app.upload_session_model = UploadSessionModel(db_client=app.db_client)
+    await app.upload_session_model.ensure_indexes()
+
+    app.asset_page_model = AssetPageModel(db_client=app.db_client)
+    await app.asset_page_model.ensure_indexes()
+
+    app.ocr_page_model = OcrPageModel(db_client=app.db_client)
+    await app.ocr_page_model.ensure_indexes()
+
+    app.keyword_term_model = KeywordTermModel(db_client=app.db_client)
+    await app.keyword_term_model.ensure_indexes()
+
+    app.keyword_document_model = KeywordDocumentModel(db_client=app.db_client)
+    await app.keyword_document_model.ensure_indexes()
+
+    app.analysis_result_model = AnalysisResultModel(db_client=app.db_client)
+    await app.analysis_result_model.ensure_indexes()
+
+    app.job_model = JobModel(db_client=app.db_client)
+    await app.job_model.ensure_indexes()
+
+    print("✅ MongoDB indexes ensured")
+
+    # DOC/DOCX to PDF: the office processes of this worker start on the first Word CV, then stay up
+    app.conversion_controller = ConversionController()
+
+    # BM25 index of the extracted CVs, fed by the extraction
+    app.keyword_index_controller = KeywordIndexController(
+        keyword_term_model=app.keyword_term_model,
+        keyword_document_model=app.keyword_document_model,
+    )
+
+    # skill taxonomy automaton, built once and shared by the extraction and the asset filters
+    app.skill_controller = SkillController()
+
+    # post-upload text extraction, in a process pool owned by this worker,
+    # or only enqueued for the worker.py processes when the job queue is enabled
+    app.extraction_controller = ExtractionController(
+        asset_model=app.asset_model,
+        blob_model=app.blob_model,
+        asset_page_model=app.asset_page_model,
+        ocr_page_model=app.ocr_page_model,
+        conversion_controller=app.conversion_controller,
+        keyword_index_controller=app.keyword_index_controller,
+        skill_controller=app.skill_controller,
+        job_model=app.job_model if settings.JOB_QUEUE_ENABLED else None,
+    )
+
+    # one pooled, rate-limited client per backend and worker, shared by the embedding client and the scheduler
+    app.llm_provider_factory = LLMProviderFactory(settings)
+
+    # one embedding client per worker: its batches and caches are shared by all the requests
+    app.embedding_client = app.llm_provider_factory.create_embedding_client()
+
+    # one inference scheduler per worker: the concurrent analyses are batched on the generation backend
+    app.inference_scheduler = app.llm_provider_factory.create_inference_scheduler()
+
+    vectordb_provider_factory = VectorDBProviderFactory(settings)
+    app.vectordb_client = vectordb_provider_factory.create(provider=settings.VECTOR_DB_BACKEND)
+    await app.vectordb_client.connect()
+
+    # hot reload of the settings: `kill -HUP <worker pid>` or the .env watcher
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, reload_settings)
+    except (NotImplementedError, AttributeError, RuntimeError, ValueError):
+        pass  # no SIGHUP on windows, nor when the loop does not run in the main thread (ValueError with uvloop)
+
+    settings_watcher = None
+    if settings.SETTINGS_RELOAD_INTERVAL > 0:
+        settings_watcher = asyncio.create_task(watch_settings_file(settings.SETTINGS_RELOAD_INTERVAL))
+
     print("✅ Application started successfully")
 
     # Yield control to the application
@@ -25,6 +134,14 @@ async def lifespan(app: FastAPI):
 
     # Shutdown  
     print("👋 Shutting down...")
+    if settings_watcher:
+        settings_watcher.cancel()
+    await app.extraction_controller.shutdown()
+    await app.conversion_controller.shutdown()
+    await app.embedding_client.close()
+    await app.inference_scheduler.close()
+    await app.llm_provider_factory.close()
+    await app.vectordb_client.disconnect()
     app.mongo_conn.close()
     print("❌ MongoDB connection closed")
 
@@ -37,3 +154,10 @@ setup_metrics(app)
 # Include routes
 app.include_router(data.data_router)
 app.include_router(data_multiple.data_router)
+app.include_router(uploads.uploads_router)
+app.include_router(projects.projects_router)
+app.include_router(nlp.nlp_router)
+app.include_router(match.match_router)
+app.include_router(search.search_router)
+app.include_router(analysis.analysis_router)
+app.include_router(admin.admin_router)
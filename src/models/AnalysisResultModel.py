@@ -0,0 +1,76 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import AnalysisResult
+from .enums.DataBaseEnum import DataBaseEnum
+from utils.lru_cache import TTLLRUCache
+from typing import Optional
+
+class AnalysisResultModel(BaseDataModel):
+    """Cache of the CV analyses: an in-process LRU in front of a mongo collection shared by all the workers"""
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_ANALYSIS_RESULT_NAME.value]
+
+        self.ttl_seconds = self.app_settings.ANALYSIS_CACHE_TTL_DAYS * 24 * 3600
+        # analysis key -> result dict, a repeated analysis on the same worker makes no mongo call
+        self.result_cache = TTLLRUCache(
+            max_size=self.app_settings.ANALYSIS_CACHE_SIZE,
+            ttl=self.ttl_seconds or float("inf")
+        )
+
+    async def ensure_indexes(self):
+        """Create indexes defined in AnalysisResult model (idempotent operation)
+
+        the TTL follows ANALYSIS_CACHE_TTL_DAYS: changed in place with collMod (create_index would
+        raise IndexOptionsConflict), dropped when the setting is 0.
+        """
+        existing = await self.collection.index_information()
+
+        for index in AnalysisResult.get_indexes(ttl_seconds=self.ttl_seconds):
+            options = {}
+            if "expire_after_seconds" in index:
+                options["expireAfterSeconds"] = index["expire_after_seconds"]
+
+                current = existing.get(index["name"])
+                if current is not None:
+                    if current.get("expireAfterSeconds") != index["expire_after_seconds"]:
+                        await self.db_client.command(
+                            "collMod",
+                            self.collection.name,
+                            index={"name": index["name"], "expireAfterSeconds": index["expire_after_seconds"]},
+                        )
+                    continue
+
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"],
+                **options
+            )
+
+        # 0 = the results are kept: the TTL index left by a previous setting would keep expiring them
+        if not self.ttl_seconds and AnalysisResult.TTL_INDEX_NAME in existing:
+            await self.collection.drop_index(AnalysisResult.TTL_INDEX_NAME)
+
+    async def get_result(self, analysis_key: str) -> Optional[dict]:
+        result = self.result_cache.get(analysis_key)
+        if result is not None:
+            return result
+
+        record = await self.collection.find_one({"_id": analysis_key}, {"analysis_result": 1})
+        if record is None:
+            return None
+
+        self.result_cache.set(analysis_key, record["analysis_result"])
+        return record["analysis_result"]
+
+    async def insert_result(self, analysis_result: AnalysisResult):
+        # two workers analyzing the same CV at once write the same key: the last one wins
+        await self.collection.replace_one(
+            {"_id": analysis_result.id},
+            analysis_result.dict(by_alias=True, exclude_none=True),
+            upsert=True
+        )
+        self.result_cache.set(analysis_result.id, analysis_result.analysis_result)
+
+        return analysis_result
@@ -9,7 +9,11 @@
 from .BaseDataModel import BaseDataModel
 from .db_schemes import Asset
 from .enums.DataBaseEnum import DataBaseEnum
+from .enums.ResponseEnums import ResponseSignal
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError, PyMongoError
+from typing import List
 
 class AssetModel(BaseDataModel):
 
@@ -18,17 +22,20 @@ class AssetModel(BaseDataModel):
         self.collection = self.db_client[DataBaseEnum.COLLECTION_ASSET_NAME.value]
 
 
+    async def ensure_indexes(self):
+        """Create indexes defined in Asset model (idempotent operation)"""
+        for index in Asset.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
     async def init_collection(self):
         all_collections = await self.db_client.list_collection_names()
         if DataBaseEnum.COLLECTION_ASSET_NAME.value not in all_collections:
             self.collection = self.db_client[DataBaseEnum.COLLECTION_ASSET_NAME.value]
-            indexes = Asset.get_indexes()
-            for index in indexes:
-                await self.collection.create_index(
-                    index["key"],
-                    name=index["name"],
-                    unique=index["unique"]
-                )
+            await self.ensure_indexes()
 
     @classmethod
     async def create_instance(cls, db_client: object):
@@ -44,6 +51,156 @@ class AssetModel(BaseDataModel):
 
         return asset
 
+    # --------------insert many asset documents in one unordered bulk write ---------------------------------:
+    async def insert_many_asset_documents(self, assets: List[Asset]):
+        """Insert many assets at once and report the outcome of each one (same order as `assets`)
+
+        ordered=False lets mongo keep inserting after a failed document, so one duplicate
+        on `asset_project_id_name_index_1` does not drop the rest of the batch.
+        the driver splits the batch by maxWriteBatchSize / 48MB, so a big upload costs a handful of round trips.
+        """
+        if not assets:
+            return []
+
+        documents = [asset.dict(by_alias=True, exclude_unset=True) for asset in assets]
+        write_errors = {}
+
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # every document that is not listed in writeErrors has been inserted
+            for error in e.details.get("writeErrors", []):
+                write_errors[error["index"]] = error
+        except PyMongoError as e:
+            # network error, timeout, failover: which documents made it is unknown. they are deleted so that
+            # every asset of the batch is reported failed, and the caller releases all their blob references
+            sent_ids = [document["_id"] for document in documents if "_id" in document]
+            try:
+                await self.collection.delete_many({"_id": {"$in": sent_ids}})
+            except PyMongoError:
+                raise e     # nothing can be reported reliably: the caller keeps the blob references
+            write_errors = {index: {"errmsg": str(e)} for index in range(len(documents))}
+
+        results = []
+        for index, (asset, document) in enumerate(zip(assets, documents)):
+            if index in write_errors:
+                error_signal = (
+                    ResponseSignal.ASSET_ALREADY_EXISTS.value
+                    if write_errors[index].get("code") == 11000         # 11000 = duplicate key error
+                    else ResponseSignal.ASSET_INSERT_FAILED.value
+                )
+                results.append({"asset": asset, "success": False, "error": error_signal})
+                continue
+
+            asset.id = document["_id"]                                   # pymongo sets _id on the document in place before sending it
+            results.append({"asset": asset, "success": True, "error": None})
+
+        return results
+
+    def get_assets_query(self, asset_project_id, asset_type: str = None, after_id: ObjectId = None,
+                         skills: List[str] = None):
+        query = {
+            "asset_project_id": ObjectId(asset_project_id) if isinstance(asset_project_id, str) else asset_project_id,
+        }
+        if asset_type:
+            query["asset_type"] = asset_type
+        if skills:
+            query["asset_skills"] = {"$all": skills}
+        if after_id:
+            query["_id"] = {"$gt": after_id}
+        return query
+
+    # --------------get the assets of a project with keyset (cursor) pagination-----------------------------------:
+    async def get_assets_documents_page(self, asset_project_id, asset_type: str = None, page_size: int = 10,
+                                        after_id: ObjectId = None, with_count: bool = False,
+                                        skills: List[str] = None):
+        """Cursor paginated assets of a project, served by asset_project_id_id_index_1
+
+        returns (assets, next_cursor, total), next_cursor is None on the last page
+        and total is only counted when asked
+        """
+        query = self.get_assets_query(asset_project_id=asset_project_id, asset_type=asset_type,
+                                      after_id=after_id, skills=skills)
+
+        # one extra document tells if there is a next page without counting
+        cursor = self.collection.find(query).sort("_id", 1).limit(page_size + 1)
+        assets = [Asset(**record) async for record in cursor]
+
+        next_cursor = None
+        if len(assets) > page_size:
+            assets = assets[:page_size]
+            next_cursor = assets[-1].id
+
+        total = None
+        if with_count:
+            count_query = self.get_assets_query(asset_project_id=asset_project_id, asset_type=asset_type, skills=skills)
+            total = await self.collection.count_documents(count_query)
+
+        return assets, next_cursor, total
+
+    # --------------stream the assets of a project without loading them in memory-----------------------------------:
+    async def iterate_assets_documents(self, asset_project_id, asset_type: str = None, after_id: ObjectId = None,
+                                       skills: List[str] = None):
+        query = self.get_assets_query(asset_project_id=asset_project_id, asset_type=asset_type,
+                                      after_id=after_id, skills=skills)
+        cursor = self.collection.find(query).sort("_id", 1).batch_size(self.app_settings.LISTING_BATCH_SIZE)
+        async for record in cursor:
+            yield Asset(**record)
+
+    async def get_asset_document_by_id(self, asset_project_id: ObjectId, asset_id: str):
+
+        try:
+            asset_object_id = ObjectId(asset_id)
+        except (InvalidId, TypeError):
+            return None
+
+        record = await self.collection.find_one({
+            "_id": asset_object_id,
+            "asset_project_id": asset_project_id,
+        })
+
+        if record:
+            return Asset(**record)
+
+        return None
+
+    # --------------extraction status of many assets in one write ---------------------------------:
+    async def update_extraction_status(self, asset_ids: List[ObjectId], status: str,
+                                       page_count: int = None, error: str = None):
+
+        await self.collection.update_many(
+            {"_id": {"$in": asset_ids}},
+            {"$set": {
+                "asset_extraction_status": status,
+                "asset_page_count": page_count,
+                "asset_extraction_error": error,
+            }}
+        )
+
+    async def update_asset_skills(self, asset_ids: List[ObjectId], skills: List[str]):
+        await self.collection.update_many(
+            {"_id": {"$in": asset_ids}},
+            {"$set": {"asset_skills": skills}}
+        )
+
+    # --------------skill facets of a project: number of assets per skill ---------------------------------:
+    async def get_skill_counts(self, asset_project_id, limit: int = None):
+        pipeline = [
+            {"$match": {"asset_project_id": ObjectId(asset_project_id) if isinstance(asset_project_id, str) else asset_project_id}},
+            {"$unwind": "$asset_skills"},
+            {"$group": {"_id": "$asset_skills", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+        if limit:
+            pipeline.append({"$limit": limit})
+
+        cursor = self.collection.aggregate(pipeline)
+        return [{"skill": record["_id"], "count": record["count"]} async for record in cursor]
+
+    async def get_assets_documents_by_ids(self, asset_ids: List[ObjectId]):
+        cursor = self.collection.find({"_id": {"$in": asset_ids}})
+        return [Asset(**record) async for record in cursor]
+
     async def get_all_assets_documents(self, asset_project_id: str, asset_type: str):
 
         records = await self.collection.find({
@@ -0,0 +1,45 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import AssetPage
+from .enums.DataBaseEnum import DataBaseEnum
+from pymongo import UpdateOne
+from typing import List
+
+class AssetPageModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_ASSET_PAGE_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in AssetPage model (idempotent operation)"""
+        for index in AssetPage.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
+    # --------------store the pages of a content in one bulk write ---------------------------------:
+    async def insert_pages(self, blob_hash: str, pages: List[str]):
+        """Upsert the text of every page (idempotent: a retried extraction overwrites the same documents)"""
+        if not pages:
+            return 0
+
+        operations = [
+            UpdateOne(
+                {"page_blob_hash": blob_hash, "page_number": page_number},
+                {"$set": {"page_text": page_text}},
+                upsert=True
+            )
+            for page_number, page_text in enumerate(pages, start=1)
+        ]
+
+        await self.collection.bulk_write(operations, ordered=False)
+
+        return len(pages)
+
+    # --------------stream the pages of a content in page order ---------------------------------:
+    async def iterate_pages(self, blob_hash: str):
+        cursor = self.collection.find({"page_blob_hash": blob_hash}).sort("page_number", 1)
+        async for record in cursor:
+            yield AssetPage(**record)
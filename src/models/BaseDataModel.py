@@ -4,4 +4,8 @@ class BaseDataModel:
 
     def __init__(self, db_client: object):
         self.db_client = db_client
-        self.app_settings = get_settings()
+
+    # the models live for the whole app lifetime (see main.py), so always read the current settings snapshot
+    @property
+    def app_settings(self) -> Settings:
+        return get_settings()
@@ -0,0 +1,133 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import Blob
+from .enums.DataBaseEnum import DataBaseEnum
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Tuple
+import asyncio
+
+class BlobModel(BaseDataModel):
+    """Reference counts of the contents of the blob store
+
+    the last release does not delete the document: it leaves a tombstone (blob_deleting_at) while the
+    caller removes the file, then `delete_blobs` drops it. an upload of the same content meanwhile can not
+    take a reference on the tombstone (its upsert hits the _id), it waits for the deletion and writes the
+    file again, so a file is never removed from under a live reference.
+    """
+
+    # a tombstone older than this was left by a worker that died before removing the file
+    TOMBSTONE_TIMEOUT_SECONDS = 10
+    TOMBSTONE_POLL_SECONDS = 0.05
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_BLOB_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in Blob model (idempotent operation)"""
+        for index in Blob.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
+    # --------------take references on many blobs in one bulk write ---------------------------------:
+    async def acquire_blobs(self, blobs: Dict[str, Tuple[int, int]]):
+        """Increment the reference count of each blob, creating the missing ones
+
+        blobs: {sha256: (number_of_new_references, blob_size)}
+        returns the set of hashes that did not exist before, i.e. the contents that must be written to disk
+        """
+        new_hashes = set()
+        deadline = datetime.utcnow() + timedelta(seconds=self.TOMBSTONE_TIMEOUT_SECONDS * 2)
+
+        while blobs:
+            hashes = list(blobs.keys())
+            operations = [
+                UpdateOne(
+                    {"_id": blob_hash, "blob_deleting_at": None},
+                    {
+                        "$inc": {"blob_ref_count": count},
+                        "$setOnInsert": {"blob_size": size, "blob_created_at": datetime.utcnow()},
+                    },
+                    upsert=True
+                )
+                for blob_hash, (count, size) in blobs.items()
+            ]
+
+            try:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                # upserted_ids is {operation index: _id} for the documents created by this write
+                new_hashes.update(hashes[index] for index in result.upserted_ids)
+                return new_hashes
+
+            except BulkWriteError as e:
+                new_hashes.update(hashes[upserted["index"]] for upserted in e.details.get("upserted", []))
+                # a duplicate _id: the blob is a tombstone, its file is being removed
+                if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                    raise
+                blobs = {hashes[error["index"]]: blobs[hashes[error["index"]]] for error in e.details["writeErrors"]}
+
+            if datetime.utcnow() > deadline:
+                raise RuntimeError(f"The blobs {list(blobs)} are still being deleted")
+
+            await self.clear_stale_tombstones(blob_hashes=blobs.keys())
+            await asyncio.sleep(self.TOMBSTONE_POLL_SECONDS)
+
+        return new_hashes
+
+    async def clear_stale_tombstones(self, blob_hashes: Iterable[str]):
+        await self.collection.delete_many({
+            "_id": {"$in": list(blob_hashes)},
+            "blob_deleting_at": {"$lt": datetime.utcnow() - timedelta(seconds=self.TOMBSTONE_TIMEOUT_SECONDS)},
+        })
+
+    # --------------drop references, tombstone the blobs nobody references anymore ---------------------------------:
+    async def release_blobs(self, blobs: Dict[str, int]):
+        """Decrement the reference count of each blob and return the hashes turned into tombstones
+
+        the caller deletes the files of the returned hashes, then calls `delete_blobs`
+        """
+        removed = set()
+        for blob_hash, count in blobs.items():
+            record = await self.collection.find_one_and_update(
+                {"_id": blob_hash},
+                {"$inc": {"blob_ref_count": -count}},
+                return_document=ReturnDocument.AFTER
+            )
+
+            # the filter on blob_ref_count protects a blob that got a new reference in between
+            if record and record["blob_ref_count"] <= 0:
+                tombstoned = await self.collection.update_one(
+                    {"_id": blob_hash, "blob_ref_count": {"$lte": 0}, "blob_deleting_at": None},
+                    {"$set": {"blob_deleting_at": datetime.utcnow()}}
+                )
+                if tombstoned.modified_count:
+                    removed.add(blob_hash)
+
+        return removed
+
+    async def delete_blobs(self, blob_hashes: Iterable[str]):
+        """Drop the tombstones once their files are removed, the waiting uploads can store the contents again"""
+        await self.collection.delete_many({
+            "_id": {"$in": list(blob_hashes)},
+            "blob_deleting_at": {"$ne": None},
+        })
+
+    async def set_blob_page_count(self, blob_hash: str, page_count: int):
+
+        await self.collection.update_one(
+            {"_id": blob_hash},
+            {"$set": {"blob_page_count": page_count}}
+        )
+
+    async def get_blob_document(self, blob_hash: str):
+
+        record = await self.collection.find_one({"_id": blob_hash})
+
+        if record:
+            return Blob(**record)
+
+        return None
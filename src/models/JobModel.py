@@ -0,0 +1,222 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import Job
+from .enums.DataBaseEnum import DataBaseEnum
+from .enums.JobStatusEnum import JobStatusEnum
+from pymongo import ReturnDocument
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+class JobModel(BaseDataModel):
+    """Durable job queue shared by the API workers (producers) and the worker processes (consumers)
+
+    a job is claimed with one atomic find_one_and_update: pending -> running, with the worker id and
+    a lease the worker extends with heartbeats. a worker that dies stops renewing its lease, the job is
+    claimed again once the lease expired. every update made by a worker is conditioned on its id:
+    a worker that lost its lease can not overwrite the job of the next one.
+    """
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_JOB_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in Job model (idempotent operation)"""
+        for index in Job.get_indexes():
+            options = {}
+            if "expire_after_seconds" in index:
+                options["expireAfterSeconds"] = index["expire_after_seconds"]
+
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"],
+                **options
+            )
+
+    async def enqueue_jobs(self, job_type: str, payloads: List[dict], priority: int = 0):
+        if not payloads:
+            return []
+
+        now = datetime.utcnow()
+        jobs = [
+            Job(job_type=job_type, job_payload=payload, job_status=JobStatusEnum.PENDING.value,
+                job_priority=priority, job_available_at=now, job_created_at=now, job_updated_at=now)
+            for payload in payloads
+        ]
+        result = await self.collection.insert_many([job.dict(by_alias=True, exclude_none=True) for job in jobs])
+        for job, job_id in zip(jobs, result.inserted_ids):
+            job.id = job_id
+
+        return jobs
+
+    # --------------one worker gets the job, whatever the number of workers polling ---------------------------------:
+    async def claim_job(self, worker_id: str, job_types: List[str], lease_seconds: int,
+                        max_attempts: int) -> Optional[Job]:
+        now = datetime.utcnow()
+        claim = {
+            "$set": {
+                "job_status": JobStatusEnum.RUNNING.value,
+                "job_worker_id": worker_id,
+                "job_lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "job_updated_at": now,
+            },
+            "$inc": {"job_attempts": 1},
+        }
+
+        # the jobs of dead workers first: they were claimed before anything still pending
+        record = await self.collection.find_one_and_update(
+            {
+                "job_status": JobStatusEnum.RUNNING.value,
+                "job_lease_expires_at": {"$lt": now},
+                "job_attempts": {"$lt": max_attempts},
+                "job_type": {"$in": job_types},
+            },
+            claim,
+            sort=[("job_lease_expires_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record is None:
+            record = await self.collection.find_one_and_update(
+                {
+                    "job_status": JobStatusEnum.PENDING.value,
+                    "job_available_at": {"$lte": now},
+                    "job_type": {"$in": job_types},
+                },
+                claim,
+                sort=[("job_priority", -1), ("job_available_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+
+        if record:
+            return Job(**record)
+
+        return None
+
+    async def extend_lease(self, job_id: ObjectId, worker_id: str, lease_seconds: int) -> bool:
+        """Heartbeat of a running job, False when the worker does not own the job anymore"""
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": job_id, "job_worker_id": worker_id, "job_status": JobStatusEnum.RUNNING.value},
+            {"$set": {"job_lease_expires_at": now + timedelta(seconds=lease_seconds), "job_updated_at": now}}
+        )
+        return result.modified_count == 1
+
+    async def complete_job(self, job_id: ObjectId, worker_id: str, retention_seconds: int):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id, "job_worker_id": worker_id, "job_status": JobStatusEnum.RUNNING.value},
+            {"$set": {
+                "job_status": JobStatusEnum.DONE.value,
+                "job_lease_expires_at": None,
+                "job_error": None,
+                "job_expire_at": now + timedelta(seconds=retention_seconds),
+                "job_updated_at": now,
+            }}
+        )
+
+    async def retry_job(self, job_id: ObjectId, worker_id: str, error: str, retry_delay: float):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id, "job_worker_id": worker_id, "job_status": JobStatusEnum.RUNNING.value},
+            {"$set": {
+                "job_status": JobStatusEnum.PENDING.value,
+                "job_available_at": now + timedelta(seconds=retry_delay),
+                "job_lease_expires_at": None,
+                "job_error": error,
+                "job_updated_at": now,
+            }}
+        )
+
+    async def release_job(self, job_id: ObjectId, worker_id: str):
+        """Give back a job interrupted by the shutdown of its worker, the attempt is not counted"""
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id, "job_worker_id": worker_id, "job_status": JobStatusEnum.RUNNING.value},
+            {
+                "$set": {
+                    "job_status": JobStatusEnum.PENDING.value,
+                    "job_available_at": now,
+                    "job_lease_expires_at": None,
+                    "job_updated_at": now,
+                },
+                "$inc": {"job_attempts": -1},
+            }
+        )
+
+    async def dead_letter_job(self, job_id: ObjectId, error: str, worker_id: Optional[str] = None) -> Optional[Job]:
+        """Move a job out of the queue; without worker id, only if its lease expired (its worker died)"""
+        now = datetime.utcnow()
+        query = {"_id": job_id, "job_status": JobStatusEnum.RUNNING.value}
+        if worker_id is not None:
+            query["job_worker_id"] = worker_id
+        else:
+            query["job_lease_expires_at"] = {"$lt": now}
+
+        record = await self.collection.find_one_and_update(
+            query,
+            {"$set": {
+                "job_status": JobStatusEnum.DEAD.value,
+                "job_lease_expires_at": None,
+                "job_error": error,
+                "job_updated_at": now,
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record:
+            return Job(**record)
+
+        return None
+
+    async def get_expired_jobs(self, max_attempts: int, limit: int = 100) -> List[Job]:
+        """Running jobs whose worker died on their last attempt: nobody will claim them again"""
+        cursor = self.collection.find({
+            "job_status": JobStatusEnum.RUNNING.value,
+            "job_lease_expires_at": {"$lt": datetime.utcnow()},
+            "job_attempts": {"$gte": max_attempts},
+        }).limit(limit)
+
+        return [Job(**record) async for record in cursor]
+
+    async def get_job_counts(self) -> dict:
+        counts = {job_status.value: 0 for job_status in JobStatusEnum}
+        async for record in self.collection.aggregate([
+            {"$group": {"_id": "$job_status", "count": {"$sum": 1}}},
+        ]):
+            counts[record["_id"]] = record["count"]
+
+        return counts
+
+    async def get_dead_jobs(self, limit: int = 50) -> List[Job]:
+        cursor = self.collection.find(
+            {"job_status": JobStatusEnum.DEAD.value}
+        ).sort("job_updated_at", -1).limit(limit)
+
+        return [Job(**record) async for record in cursor]
+
+    async def requeue_dead_job(self, job_id: str) -> Optional[Job]:
+        try:
+            job_object_id = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+
+        now = datetime.utcnow()
+        record = await self.collection.find_one_and_update(
+            {"_id": job_object_id, "job_status": JobStatusEnum.DEAD.value},
+            {"$set": {
+                "job_status": JobStatusEnum.PENDING.value,
+                "job_attempts": 0,
+                "job_available_at": now,
+                "job_worker_id": None,
+                "job_updated_at": now,
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record:
+            return Job(**record)
+
+        return None
@@ -0,0 +1,89 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import KeywordDocument
+from .enums.DataBaseEnum import DataBaseEnum
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
+from typing import Dict, List
+
+class KeywordDocumentModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_KEYWORD_DOCUMENT_NAME.value]
+        # one document per project: number of indexed documents, sum of their lengths, next doc number
+        self.stats_collection = self.db_client[DataBaseEnum.COLLECTION_KEYWORD_STATS_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in KeywordDocument model (idempotent operation)"""
+        for index in KeywordDocument.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
+    # --------------register a document and allocate its number ---------------------------------:
+    async def register_document(self, project_id: ObjectId, asset_id: ObjectId, asset_name: str, length: int):
+        """Returns the doc number to write the postings of the asset with, or None when it is already indexed
+
+        a document registered by a writer that failed before `mark_document_indexed` keeps its number:
+        the next attempt writes its postings again (a posting written twice keeps only the last one).
+        """
+        query = {"doc_project_id": project_id, "doc_asset_id": asset_id}
+
+        record = await self.collection.find_one(query)
+        if record is not None:
+            # the documents indexed before the flag existed have no doc_indexed field: they are complete
+            if record.get("doc_indexed", True) or record.get("doc_no", -1) < 0:
+                return None
+            return record["doc_no"]
+
+        # the number and the stats first: the document is inserted with its number in one write
+        stats = await self.stats_collection.find_one_and_update(
+            {"_id": project_id},
+            {"$inc": {"doc_count": 1, "total_length": length, "next_doc_no": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        doc_no = stats["next_doc_no"] - 1
+
+        # the unique index makes the first writer the owner of the asset: no document is registered twice
+        try:
+            await self.collection.insert_one(
+                KeywordDocument(
+                    doc_project_id=project_id,
+                    doc_asset_id=asset_id,
+                    doc_asset_name=asset_name,
+                    doc_no=doc_no,
+                    doc_length=length,
+                ).dict(by_alias=True, exclude_none=True)
+            )
+        except Exception as e:
+            # the counts go back, the number stays unused
+            await self.stats_collection.update_one(
+                {"_id": project_id},
+                {"$inc": {"doc_count": -1, "total_length": -length}}
+            )
+            if isinstance(e, DuplicateKeyError):
+                return None     # registered by a concurrent writer
+            raise
+
+        return doc_no
+
+    async def mark_document_indexed(self, project_id: ObjectId, asset_id: ObjectId):
+        await self.collection.update_one(
+            {"doc_project_id": project_id, "doc_asset_id": asset_id},
+            {"$set": {"doc_indexed": True}}
+        )
+
+    async def get_stats(self, project_id: ObjectId):
+        """(number of documents, average length) of the project"""
+        stats = await self.stats_collection.find_one({"_id": project_id})
+        if not stats or not stats.get("doc_count"):
+            return 0, 0.0
+        return stats["doc_count"], stats["total_length"] / stats["doc_count"]
+
+    async def get_documents_by_numbers(self, project_id: ObjectId, doc_nos: List[int]) -> Dict[int, KeywordDocument]:
+        cursor = self.collection.find({"doc_project_id": project_id, "doc_no": {"$in": doc_nos}})
+        return {record["doc_no"]: KeywordDocument(**record) async for record in cursor}
@@ -0,0 +1,76 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import KeywordTerm
+from .enums.DataBaseEnum import DataBaseEnum
+from utils.keyword_index import decode_postings, encode_postings
+from pymongo import UpdateOne
+from bson import ObjectId
+from typing import Dict, List
+import numpy as np
+
+class KeywordTermModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_KEYWORD_TERM_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in KeywordTerm model (idempotent operation)"""
+        for index in KeywordTerm.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
+    # --------------append the postings of one document, one bulk write ---------------------------------:
+    async def append_postings(self, project_id: ObjectId, postings: Dict[str, int]):
+        """postings: {term: packed posting}, every term gets its posting $pushed at the end of its tail"""
+        if not postings:
+            return
+
+        operations = [
+            UpdateOne(
+                {"term_project_id": project_id, "term": term},
+                {
+                    "$push": {"term_tail": posting},
+                    "$setOnInsert": {"term_postings": b"", "term_version": 0},
+                },
+                upsert=True
+            )
+            for term, posting in postings.items()
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+
+        await self.compact_terms(project_id=project_id, terms=list(postings.keys()))
+
+    # --------------fold the long tails into the compact bytes ---------------------------------:
+    async def compact_terms(self, project_id: ObjectId, terms: List[str]):
+        tail_size = self.app_settings.KEYWORD_TAIL_COMPACT_SIZE
+
+        cursor = self.collection.find({
+            "term_project_id": project_id,
+            "term": {"$in": terms},
+            f"term_tail.{tail_size}": {"$exists": True},
+        })
+        async for record in cursor:
+            term = KeywordTerm(**record)
+            merged = encode_postings(decode_postings(term.term_postings, term.term_tail))
+
+            # optimistic: a concurrent compaction bumps the version first and this one is dropped,
+            # the postings pushed meanwhile are not in `term_tail` above and stay in the tail
+            await self.collection.update_one(
+                {"_id": term.id, "term_version": term.term_version},
+                {
+                    "$set": {"term_postings": merged},
+                    "$inc": {"term_version": 1},
+                    "$pullAll": {"term_tail": term.term_tail},
+                }
+            )
+
+    # --------------postings of the query terms, one query ---------------------------------:
+    async def get_terms_postings(self, project_id: ObjectId, terms: List[str]) -> Dict[str, np.ndarray]:
+        cursor = self.collection.find({"term_project_id": project_id, "term": {"$in": terms}})
+        return {
+            record["term"]: decode_postings(record.get("term_postings"), record.get("term_tail"))
+            async for record in cursor
+        }
@@ -0,0 +1,47 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import OcrPage
+from .enums.DataBaseEnum import DataBaseEnum
+from pymongo import UpdateOne
+from datetime import datetime
+from typing import Dict, List
+
+class OcrPageModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_OCR_PAGE_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in OcrPage model (idempotent operation)"""
+        for index in OcrPage.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
+    # --------------look up many cached pages in one query ---------------------------------:
+    async def get_ocr_texts(self, ocr_keys: List[str]) -> Dict[str, str]:
+        if not ocr_keys:
+            return {}
+
+        cursor = self.collection.find({"_id": {"$in": ocr_keys}}, {"ocr_text": 1})
+        return {record["_id"]: record["ocr_text"] async for record in cursor}
+
+    # --------------cache many OCRed pages in one bulk write ---------------------------------:
+    async def insert_ocr_texts(self, ocr_texts: Dict[str, str]):
+        if not ocr_texts:
+            return 0
+
+        operations = [
+            UpdateOne(
+                {"_id": ocr_key},
+                {"$set": {"ocr_text": ocr_text}, "$setOnInsert": {"ocr_created_at": datetime.utcnow()}},
+                upsert=True
+            )
+            for ocr_key, ocr_text in ocr_texts.items()
+        ]
+
+        await self.collection.bulk_write(operations, ordered=False)
+
+        return len(ocr_texts)
@@ -1,6 +1,9 @@
 from .BaseDataModel import BaseDataModel
 from .db_schemes import Project
 from .enums.DataBaseEnum import DataBaseEnum
+from utils.lru_cache import TTLLRUCache
+from pymongo import ReturnDocument
+from bson import ObjectId
 
 class ProjectModel(BaseDataModel):
 
@@ -8,6 +11,12 @@ class ProjectModel(BaseDataModel):
         super().__init__(db_client=db_client)
         self.collection = self.db_client[DataBaseEnum.COLLECTION_PROJECT_NAME.value]
 
+        # project_id -> ObjectId of the known projects, so the hot path of the uploads makes no mongo call
+        self.project_cache = TTLLRUCache(
+            max_size=self.app_settings.PROJECT_CACHE_SIZE,
+            ttl=self.app_settings.PROJECT_CACHE_TTL
+        )
+
     async def ensure_indexes(self):
         """Create indexes defined in Project model (idempotent operation)"""
         for index in Project.get_indexes():
@@ -38,21 +47,70 @@ class ProjectModel(BaseDataModel):
     # --------------------retun existing project document or insert a new one if it does not exist ------------:
     async def get_or_insert_one_project_document(self, project_id: str):
         """Get existing project or create new one"""
-        if record := await self.collection.find_one({"project_id": project_id}):
-            return Project(**record)
-        
-        return await self.insert_one_project_document(Project(project_id=project_id))
+        if project_object_id := self.project_cache.get(project_id):
+            return Project(id=project_object_id, project_id=project_id)
 
-    # --------------get all project documents with pagination-----------------------------------:
-    async def get_all_project_documents(self, page: int = 1, page_size: int = 10):     # Danger: Loads ALL documents into memory! 1M docs? RIP.
-        """Paginated project retrieval"""
-        total_documents = await self.collection.count_documents({})
-        total_pages = (total_documents + page_size - 1) // page_size       # (51-1+10)//10 = 6   and   (50-1+10)//10 = 5
+        # validate the project_id (alphanumeric) before touching the database
+        project = Project(project_id=project_id)
+
+        # one atomic upsert instead of find_one + insert_one: one round trip, and two concurrent
+        # uploads to a new project both get the same document instead of a duplicate key error
+        record = await self.collection.find_one_and_update(
+            {"project_id": project.project_id},
+            {"$setOnInsert": project.dict(by_alias=True, exclude_unset=True)},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        project = Project(**record)
+        self.project_cache.set(project_id, project.id)
+
+        return project
+
+    # --------------return an existing project document, without creating it ------------:
+    async def get_project_document(self, project_id: str):
+        if project_object_id := self.project_cache.get(project_id):
+            return Project(id=project_object_id, project_id=project_id)
+
+        record = await self.collection.find_one({"project_id": project_id})
+        if record is None:
+            return None
 
-        cursor = self.collection.find().skip((page - 1) * page_size).limit(page_size)       # (e.g., page 2 skips the first page_size docs) & limit(page_size) Restricts results to the current page’s chunk (e.g., 10 docs per page).
+        project = Project(**record)
+        self.project_cache.set(project_id, project.id)
+
+        return project
+
+    # --------------get project documents with keyset (cursor) pagination-----------------------------------:
+    async def get_all_project_documents(self, page_size: int = 10, after_id: ObjectId = None, with_count: bool = False):
+        """Cursor paginated project retrieval
+
+        skip() walks over every skipped document and count_documents({}) scans the whole collection,
+        both grow with the collection. here the page starts right after the last _id of the previous
+        page (an index seek on _id) and the total is the estimated count from the collection metadata.
+        returns (projects, next_cursor, estimated_total), next_cursor is None on the last page
+        """
+        query = {"_id": {"$gt": after_id}} if after_id else {}
+
+        # one extra document tells if there is a next page without counting
+        cursor = self.collection.find(query).sort("_id", 1).limit(page_size + 1)
         projects = [Project(**doc) async for doc in cursor]                                 # async for allows us to iterate over the cursor asynchronously, yielding Project instances for each document.
 
-        return projects, total_pages
+        next_cursor = None
+        if len(projects) > page_size:
+            projects = projects[:page_size]
+            next_cursor = projects[-1].id
+
+        estimated_total = await self.collection.estimated_document_count() if with_count else None
+
+        return projects, next_cursor, estimated_total
+
+    # --------------stream all project documents without loading them in memory-----------------------------------:
+    async def iterate_project_documents(self, after_id: ObjectId = None):
+        query = {"_id": {"$gt": after_id}} if after_id else {}
+        cursor = self.collection.find(query).sort("_id", 1).batch_size(self.app_settings.LISTING_BATCH_SIZE)
+        async for doc in cursor:
+            yield Project(**doc)
     
     
 """
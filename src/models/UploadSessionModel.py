@@ -0,0 +1,160 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import UploadSession
+from .enums.DataBaseEnum import DataBaseEnum
+from .enums.UploadStatusEnum import UploadStatusEnum
+from pymongo import ReturnDocument
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime, timedelta
+
+class UploadSessionModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_UPLOAD_SESSION_NAME.value]
+
+    async def ensure_indexes(self):
+        """Create indexes defined in UploadSession model (idempotent operation)"""
+        for index in UploadSession.get_indexes():
+            await self.collection.create_index(
+                index["key"],
+                name=index["name"],
+                unique=index["unique"]
+            )
+
+    async def insert_upload_session(self, upload_session: UploadSession):
+
+        result = await self.collection.insert_one(upload_session.dict(by_alias=True, exclude_none=True))
+        upload_session.id = result.inserted_id
+
+        return upload_session
+
+    async def get_upload_session(self, asset_project_id: ObjectId, upload_id: str):
+
+        try:
+            upload_object_id = ObjectId(upload_id)
+        except (InvalidId, TypeError):
+            return None
+
+        record = await self.collection.find_one({
+            "_id": upload_object_id,
+            "upload_project_id": asset_project_id,
+        })
+
+        if record:
+            return UploadSession(**record)
+
+        return None
+
+    # --------------one PATCH at a time writes into the session file ---------------------------------:
+    async def claim_upload_writer(self, upload_id: ObjectId, expected_offset: int, writer_id: str,
+                                  lease_seconds: int):
+        """Reserve the session file for one chunk at `expected_offset`, returns None if the offset moved or
+        another PATCH holds the file (the lease only frees the file of a worker that died while writing)"""
+        now = datetime.utcnow()
+        record = await self.collection.find_one_and_update(
+            {
+                "_id": upload_id,
+                "upload_offset": expected_offset,
+                "upload_status": UploadStatusEnum.UPLOADING.value,
+                "$or": [
+                    {"upload_writer_id": None},
+                    {"upload_writer_expires_at": {"$lt": now}},
+                ],
+            },
+            {"$set": {
+                "upload_writer_id": writer_id,
+                "upload_writer_expires_at": now + timedelta(seconds=lease_seconds),
+                "upload_updated_at": now,
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record:
+            return UploadSession(**record)
+
+        return None
+
+    async def release_upload_writer(self, upload_id: ObjectId, writer_id: str):
+        await self.collection.update_one(
+            {"_id": upload_id, "upload_writer_id": writer_id},
+            {"$set": {"upload_writer_id": None, "upload_writer_expires_at": None}}
+        )
+
+    # --------------move the offset forward only if nobody else did it in between ---------------------------------:
+    async def advance_upload_offset(self, upload_id: ObjectId, expected_offset: int, new_offset: int, writer_id: str):
+        """Atomic compare-and-set of the committed offset by the writer holding the file,
+        returns the updated session or None on conflict"""
+        record = await self.collection.find_one_and_update(
+            {
+                "_id": upload_id,
+                "upload_offset": expected_offset,
+                "upload_status": UploadStatusEnum.UPLOADING.value,
+                "upload_writer_id": writer_id,
+            },
+            {"$set": {
+                "upload_offset": new_offset,
+                "upload_writer_id": None,
+                "upload_writer_expires_at": None,
+                "upload_updated_at": datetime.utcnow(),
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record:
+            return UploadSession(**record)
+
+        return None
+
+    # --------------only one request can finalize a session ---------------------------------:
+    async def claim_upload_session(self, upload_id: ObjectId, upload_size: int, stale_seconds: int):
+        """Move a fully received session to finalizing, returns None if it is not (or no longer) finalizable
+
+        a session left in finalizing for `stale_seconds` (its worker died in the middle) can be claimed again
+        """
+        now = datetime.utcnow()
+        record = await self.collection.find_one_and_update(
+            {
+                "_id": upload_id,
+                "upload_offset": upload_size,
+                "$or": [
+                    {"upload_status": UploadStatusEnum.UPLOADING.value},
+                    {
+                        "upload_status": UploadStatusEnum.FINALIZING.value,
+                        "upload_updated_at": {"$lt": now - timedelta(seconds=stale_seconds)},
+                    },
+                ],
+            },
+            {"$set": {"upload_status": UploadStatusEnum.FINALIZING.value, "upload_updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record:
+            return UploadSession(**record)
+
+        return None
+
+    async def release_upload_session(self, upload_id: ObjectId):
+        """Back to uploading after a finalization error, the client can finalize again"""
+        await self.collection.update_one(
+            {"_id": upload_id, "upload_status": UploadStatusEnum.FINALIZING.value},
+            {"$set": {"upload_status": UploadStatusEnum.UPLOADING.value, "upload_updated_at": datetime.utcnow()}}
+        )
+
+    async def fail_upload_session(self, upload_id: ObjectId):
+
+        await self.collection.update_one(
+            {"_id": upload_id},
+            {"$set": {"upload_status": UploadStatusEnum.FAILED.value, "upload_updated_at": datetime.utcnow()}}
+        )
+
+    async def complete_upload_session(self, upload_id: ObjectId, asset_id: ObjectId):
+
+        await self.collection.update_one(
+            {"_id": upload_id},
+            {"$set": {
+                "upload_status": UploadStatusEnum.COMPLETED.value,
+                "upload_asset_id": asset_id,
+                "upload_updated_at": datetime.utcnow(),
+            }}
+        )
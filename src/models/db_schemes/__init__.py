@@ -1,2 +1,12 @@
 from .asset import Asset
-from .project import Project
\ No newline at end of file
+from .project import Project
+from .blob import Blob
+from .upload_session import UploadSession
+from .asset_page import AssetPage
+from .ocr_page import OcrPage
+from .vector_record import VectorRecord, RetrievedDocument
+from .keyword_term import KeywordTerm
+from .keyword_document import KeywordDocument
+from .analysis_result import AnalysisResult
+from .cv_analysis import PersonalInfo, EducationEntry, WorkExperienceEntry, SkillEntry, CVAnalysisResult
+from .job import Job
\ No newline at end of file
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import ClassVar, Optional
+from datetime import datetime
+
+class AnalysisResult(BaseModel):
+    # _id = sha256 of (blob hash, job description hash, model, prompt version, language):
+    # a new model or prompt version gives new keys, the old results are never read again and expire
+    id: str = Field(..., alias="_id")
+    analysis_blob_hash: str = Field(..., min_length=64, max_length=64)
+    analysis_job_hash: str = Field(..., min_length=64, max_length=64)
+    analysis_model_key: str
+    analysis_prompt_version: str
+    analysis_language: str
+    analysis_result: dict
+    analysis_created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    TTL_INDEX_NAME: ClassVar[str] = "analysis_created_at_ttl_index_1"
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls, ttl_seconds: Optional[int] = None):
+        indexes = [
+            {
+                "key": [("analysis_blob_hash", 1)],     # results of a CV, whatever the job description
+                "name": "analysis_blob_hash_index_1",
+                "unique": False,
+            },
+        ]
+        if ttl_seconds:
+            indexes.append({
+                "key": [("analysis_created_at", 1)],
+                "name": cls.TTL_INDEX_NAME,
+                "unique": False,
+                "expire_after_seconds": ttl_seconds,
+            })
+        return indexes
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Optional, List
 from bson import ObjectId
 from datetime import datetime
 
@@ -9,7 +9,12 @@ class Asset(BaseModel):
     asset_type: str = Field(..., min_length=1)
     asset_name: str = Field(..., min_length=1)
     asset_size: Optional[int] = Field(default=None, ge=0)
+    asset_hash: Optional[str] = Field(default=None, min_length=64, max_length=64)     # sha256 of the content, key of the blob in assets/blobs
     asset_config: Optional[dict] = Field(default=None)
+    asset_extraction_status: Optional[str] = Field(default=None)      # see ExtractionStatusEnum
+    asset_page_count: Optional[int] = Field(default=None, ge=0)
+    asset_extraction_error: Optional[str] = Field(default=None)
+    asset_skills: Optional[List[str]] = Field(default=None)          # canonical names of the skill taxonomy, most mentioned first
     asset_pushed_at: datetime = Field(default_factory=datetime.utcnow)
 
     @field_validator("asset_type", "asset_name")
@@ -32,4 +37,19 @@ class Asset(BaseModel):
                 "name": "asset_project_id_name_index_1",
                 "unique": True,
             },
+            {
+                "key": [("asset_project_id", 1), ("_id", 1)],       # keyset pagination of the assets of a project
+                "name": "asset_project_id_id_index_1",
+                "unique": False,
+            },
+            {
+                "key": [("asset_project_id", 1), ("asset_skills", 1)],   # multikey: skill filters and facets of a project
+                "name": "asset_project_id_skills_index_1",
+                "unique": False,
+            },
+            {
+                "key": [("asset_hash", 1)],
+                "name": "asset_hash_index_1",
+                "unique": False,
+            },
         ]
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from bson import ObjectId
+
+class AssetPage(BaseModel):
+    # the text is stored once per content (blob hash), every asset pointing to the same blob shares it
+    id: Optional[ObjectId] = Field(default=None, alias="_id")
+    page_blob_hash: str = Field(..., min_length=64, max_length=64)
+    page_number: int = Field(..., ge=1)
+    page_text: str = Field(default="")
+
+    model_config = {
+        "arbitrary_types_allowed": True,
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("page_blob_hash", 1), ("page_number", 1)],
+                "name": "page_blob_hash_number_index_1",
+                "unique": True,
+            },
+        ]
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from datetime import datetime
+import re
+
+class Blob(BaseModel):
+    # the sha256 of the content is the document _id: one document (and one file on disk) per unique content
+    id: str = Field(..., alias="_id")
+    blob_size: int = Field(..., ge=0)
+    blob_ref_count: int = Field(default=0, ge=0)
+    blob_page_count: Optional[int] = Field(default=None, ge=0)        # set once the text of the content is extracted
+    blob_created_at: datetime = Field(default_factory=datetime.utcnow)
+    blob_deleting_at: Optional[datetime] = Field(default=None)       # tombstone: the file is being removed
+
+    @field_validator("id")
+    @classmethod
+    def validate_sha256(cls, value):
+        if not re.fullmatch(r"[0-9a-f]{64}", value):
+            raise ValueError("Blob id must be a sha256 hex digest")
+        return value
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        # _id is already indexed by mongo
+        return []
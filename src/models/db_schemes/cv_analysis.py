@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+
+# structured output of the CV analysis (the schema is given to the model in the prompt)
+
+class PersonalInfo(BaseModel):
+    full_name: str = Field(..., description="Candidate's full name")
+    email: Optional[str] = Field(None, description="Contact email")
+    phone: Optional[str] = Field(None, description="Phone number")
+    location: Optional[str] = Field(None, description="Current location")
+    linkedin: Optional[str] = Field(None, description="LinkedIn URL")
+    github: Optional[str] = Field(None, description="GitHub URL")
+
+class EducationEntry(BaseModel):
+    institution: str = Field(..., description="School/university name")
+    degree: Literal["bachelor", "master", "phd", "diploma", "certificate", "associate", "other"] = Field(..., description="Degree level")
+    field_of_study: str = Field(..., description="Major/specialization")
+    start_year: int = Field(..., description="Start year")
+    end_year: Optional[int] = Field(None, description="Graduation year")
+
+class WorkExperienceEntry(BaseModel):
+    company: str = Field(..., description="Employer name")
+    position: str = Field(..., description="Job title")
+    start_date: str = Field(..., description="Start date (MM/YYYY)")
+    end_date: Optional[str] = Field(None, description="End date (MM/YYYY or 'Present')")
+    responsibilities: List[str] = Field(..., description="Key achievements")
+
+class SkillEntry(BaseModel):
+    name: str = Field(..., description="Skill name")
+    category: str = Field(..., description="Skill category")
+    proficiency: Literal["beginner", "intermediate", "advanced", "expert", "native"] = Field(..., description="Proficiency level")
+
+class CVAnalysisResult(BaseModel):
+    personal_info: PersonalInfo = Field(..., description="Personal details")
+    education: List[EducationEntry] = Field(..., description="Education history")
+    work_experience: List[WorkExperienceEntry] = Field(..., description="Work experience")
+    technical_skills: List[SkillEntry] = Field(..., description="Technical skills")
+    soft_skills: List[str] = Field(..., description="Soft skills")
+    summary: str = Field(..., description="Professional summary")
+    match_score: float = Field(..., ge=0, le=1, description="Job match score (0-1)")
+    strengths: List[str] = Field(..., description="Candidate strengths for this role")
+    improvement_areas: List[str] = Field(..., description="Areas needing improvement")
@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from bson import ObjectId
+from datetime import datetime
+
+class Job(BaseModel):
+    id: Optional[ObjectId] = Field(default=None, alias="_id")
+    job_type: str = Field(..., min_length=1)
+    job_payload: dict = Field(default_factory=dict)
+    job_status: str = Field(..., min_length=1)
+    job_priority: int = Field(default=0)
+    job_attempts: int = Field(default=0, ge=0)                  # claims so far, the running one included
+    job_available_at: datetime = Field(default_factory=datetime.utcnow)     # not claimed before (retry backoff)
+    job_worker_id: Optional[str] = Field(default=None)
+    job_lease_expires_at: Optional[datetime] = Field(default=None)          # pushed forward by the heartbeats
+    job_error: Optional[str] = Field(default=None)              # error of the last attempt
+    job_expire_at: Optional[datetime] = Field(default=None)     # set when done, the TTL index deletes the job
+    job_created_at: datetime = Field(default_factory=datetime.utcnow)
+    job_updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = {
+        "arbitrary_types_allowed": True,
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                # the claim: pending jobs, highest priority then oldest first
+                "key": [("job_status", 1), ("job_priority", -1), ("job_available_at", 1)],
+                "name": "job_status_priority_available_at_index_1",
+                "unique": False,
+            },
+            {
+                # the jobs of dead workers: running with an expired lease
+                "key": [("job_status", 1), ("job_lease_expires_at", 1)],
+                "name": "job_status_lease_expires_at_index_1",
+                "unique": False,
+            },
+            {
+                "key": [("job_expire_at", 1)],
+                "name": "job_expire_at_ttl_index_1",
+                "unique": False,
+                "expire_after_seconds": 0,
+            },
+        ]
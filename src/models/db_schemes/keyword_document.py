@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from bson import ObjectId
+
+class KeywordDocument(BaseModel):
+    # one indexed asset: the postings reference it by its small per-project number
+    id: Optional[ObjectId] = Field(default=None, alias="_id")
+    doc_project_id: ObjectId
+    doc_asset_id: ObjectId
+    doc_asset_name: str = Field(default="")
+    doc_no: int = Field(default=-1)         # allocated with the project stats, before the insert
+    doc_length: int = Field(default=0, ge=0)
+    doc_indexed: bool = Field(default=False)    # set once all the postings are written
+
+    model_config = {
+        "arbitrary_types_allowed": True,
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("doc_project_id", 1), ("doc_asset_id", 1)],
+                "name": "doc_project_id_asset_id_index_1",
+                "unique": True,
+            },
+            {
+                "key": [("doc_project_id", 1), ("doc_no", 1)],
+                "name": "doc_project_id_no_index_1",
+                "unique": False,
+            },
+        ]
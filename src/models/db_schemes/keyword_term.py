@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from bson import ObjectId
+
+class KeywordTerm(BaseModel):
+    # postings of one term in one project: the compacted bytes (see utils/keyword_index.py)
+    # plus the packed postings appended since the last compaction
+    id: Optional[ObjectId] = Field(default=None, alias="_id")
+    term_project_id: ObjectId
+    term: str = Field(..., min_length=1)
+    term_postings: bytes = Field(default=b"")
+    term_tail: List[int] = Field(default_factory=list)
+    term_version: int = Field(default=0, ge=0)
+
+    model_config = {
+        "arbitrary_types_allowed": True,
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("term_project_id", 1), ("term", 1)],
+                "name": "term_project_id_term_index_1",
+                "unique": True,
+            },
+        ]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+class OcrPage(BaseModel):
+    # _id = "<page hash>:<dpi>:<lang>", the same page drawn in any file is OCRed once per setting
+    id: str = Field(..., alias="_id")
+    ocr_text: str = Field(default="")
+    ocr_created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        # _id is the only lookup key
+        return []
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from bson import ObjectId
+from datetime import datetime
+
+class UploadSession(BaseModel):
+    id: Optional[ObjectId] = Field(default=None, alias="_id")
+    upload_project_id: ObjectId
+    upload_file_name: str = Field(..., min_length=1)
+    upload_content_type: str = Field(..., min_length=1)
+    upload_size: int = Field(..., ge=0)                         # total size announced by the client
+    upload_offset: int = Field(default=0, ge=0)                 # number of bytes received and committed
+    upload_status: str = Field(..., min_length=1)
+    upload_asset_id: Optional[ObjectId] = Field(default=None)   # set by the finalization
+    upload_writer_id: Optional[str] = Field(default=None)       # the PATCH applying its chunk to the file
+    upload_writer_expires_at: Optional[datetime] = Field(default=None)
+    upload_created_at: datetime = Field(default_factory=datetime.utcnow)
+    upload_updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @field_validator("upload_file_name", "upload_content_type")
+    @classmethod
+    def validate_non_empty(cls, value):
+        if not value or not value.strip():
+            raise ValueError("Field must not be empty")
+        return value
+
+    model_config = {
+        "arbitrary_types_allowed": True,
+        "populate_by_name": True,
+    }
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("upload_project_id", 1), ("upload_status", 1)],
+                "name": "upload_project_id_status_index_1",
+                "unique": False,
+            },
+        ]
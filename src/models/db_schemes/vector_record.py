@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class VectorRecord(BaseModel):
+    # id = "<asset id>:<chunk order>": re-indexing an asset overwrites its records instead of duplicating them
+    id: str = Field(..., min_length=1)
+    text: str
+    vector: List[float]
+    metadata: dict = Field(default_factory=dict)
+
+class RetrievedDocument(BaseModel):
+    id: str
+    text: str
+    score: float
+    metadata: dict = Field(default_factory=dict)
@@ -0,0 +1,12 @@
+from enum import Enum
+
+class CvSectionEnum(Enum):
+
+    SUMMARY = "summary"
+    EXPERIENCE = "experience"
+    EDUCATION = "education"
+    SKILLS = "skills"
+    LANGUAGES = "languages"
+    PROJECTS = "projects"
+    CERTIFICATIONS = "certifications"
+    OTHER = "other"
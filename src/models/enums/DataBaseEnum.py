@@ -4,4 +4,13 @@ class DataBaseEnum(Enum):
 
     COLLECTION_PROJECT_NAME = "projects"
     COLLECTION_ASSET_NAME = "assets"
+    COLLECTION_BLOB_NAME = "blobs"
+    COLLECTION_UPLOAD_SESSION_NAME = "upload_sessions"
+    COLLECTION_ASSET_PAGE_NAME = "asset_pages"
+    COLLECTION_OCR_PAGE_NAME = "ocr_pages"
+    COLLECTION_KEYWORD_TERM_NAME = "keyword_terms"
+    COLLECTION_KEYWORD_DOCUMENT_NAME = "keyword_documents"
+    COLLECTION_KEYWORD_STATS_NAME = "keyword_stats"
+    COLLECTION_ANALYSIS_RESULT_NAME = "analysis_results"
+    COLLECTION_JOB_NAME = "jobs"
 
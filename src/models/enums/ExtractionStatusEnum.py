@@ -0,0 +1,8 @@
+from enum import Enum
+
+class ExtractionStatusEnum(Enum):
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
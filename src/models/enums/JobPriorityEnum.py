@@ -0,0 +1,8 @@
+from enum import Enum
+
+class JobPriorityEnum(Enum):
+
+    # the higher first: an asset retried by hand passes before a bulk upload of a thousand CVs
+    LOW = 0
+    NORMAL = 5
+    HIGH = 10
@@ -0,0 +1,8 @@
+from enum import Enum
+
+class JobStatusEnum(Enum):
+
+    PENDING = "pending"     # waiting for a worker (new, or retried after its backoff)
+    RUNNING = "running"     # claimed by a worker holding an unexpired lease
+    DONE = "done"
+    DEAD = "dead"           # out of attempts: kept for inspection, requeued by hand
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class JobTypeEnum(Enum):
+
+    EXTRACTION = "extraction"
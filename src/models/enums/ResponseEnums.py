@@ -23,5 +23,29 @@ class ResponseSignal(Enum):
 
     # me adding new signals
     PARTIAL_UPLOAD_SUCCESS = "partial_upload_success"
+    ASSET_ALREADY_EXISTS = "asset_already_exists"
+    ASSET_INSERT_FAILED = "asset_insert_failed"
+    SETTINGS_RELOAD_SUCCESS = "settings_reload_success"
+    ADMIN_ACCESS_DENIED = "admin_access_denied"
+    UPLOAD_SESSION_CREATED = "upload_session_created"
+    UPLOAD_SESSION_NOT_FOUND = "upload_session_not_found"
+    UPLOAD_SESSION_COMPLETED = "upload_session_completed"
+    UPLOAD_OFFSET_MISMATCH = "upload_offset_mismatch"
+    UPLOAD_CHUNK_SUCCESS = "upload_chunk_success"
+    UPLOAD_INCOMPLETE = "upload_incomplete"
+    INVALID_CURSOR_ERROR = "invalid_cursor"
+    EXTRACTION_NOT_DONE = "extraction_not_done"
+    MATCH_SUCCESS = "match_success"
+    MATCH_ERROR = "match_error"
+    SEARCH_SUCCESS = "search_success"
+    SEARCH_ERROR = "search_error"
+    SEARCH_MODE_NOT_SUPPORTED = "search_mode_not_supported"
+    ANALYSIS_SUCCESS = "analysis_success"
+    ANALYSIS_ERROR = "analysis_error"
+    ANALYSIS_LANGUAGE_NOT_SUPPORTED = "analysis_language_not_supported"
+    GENERATION_QUEUE_FULL = "generation_queue_full"
+    JOB_STATS_SUCCESS = "job_stats_success"
+    JOB_REQUEUE_SUCCESS = "job_requeue_success"
+    JOB_NOT_FOUND = "job_not_found"
 
     
\ No newline at end of file
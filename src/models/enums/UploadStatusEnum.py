@@ -0,0 +1,8 @@
+from enum import Enum
+
+class UploadStatusEnum(Enum):
+
+    UPLOADING = "uploading"
+    FINALIZING = "finalizing"
+    COMPLETED = "completed"
+    FAILED = "failed"
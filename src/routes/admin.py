@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import JSONResponse
+from helpers.config import get_settings, reload_settings, get_secret, Settings
+from helpers.dependencies import get_job_model
+from models import ResponseSignal
+from models.JobModel import JobModel
+from typing import Optional
+import logging
+import hmac
+
+logger = logging.getLogger('uvicorn.error')
+
+admin_router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["api_v1", "admin"],
+)
+
+def is_admin(x_admin_key: Optional[str], app_settings: Settings) -> bool:
+    # the admin endpoints are disabled until an ADMIN_API_KEY is configured
+    admin_api_key = get_secret(app_settings.ADMIN_API_KEY)
+    if not admin_api_key or x_admin_key is None:
+        return False
+    # constant time: the response time does not tell how many leading characters of the key were right
+    return hmac.compare_digest(x_admin_key.encode("utf-8"), admin_api_key.encode("utf-8"))
+
+def admin_access_denied():
+    return JSONResponse(
+        status_code=status.HTTP_403_FORBIDDEN,
+        content={
+            "signal": ResponseSignal.ADMIN_ACCESS_DENIED.value
+        }
+    )
+
+@admin_router.post("/settings/reload")
+async def reload_app_settings(x_admin_key: Optional[str] = Header(default=None),
+                              app_settings: Settings = Depends(get_settings)):
+
+    if not is_admin(x_admin_key=x_admin_key, app_settings=app_settings):
+        return admin_access_denied()
+
+    # only this worker is reloaded right away, the other uvicorn workers
+    # pick up the change with their .env watcher (SETTINGS_RELOAD_INTERVAL) or with SIGHUP
+    new_settings = reload_settings()
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.SETTINGS_RELOAD_SUCCESS.value,
+            "app_version": new_settings.APP_VERSION,
+        }
+    )
+
+@admin_router.get("/jobs")
+async def get_job_stats(limit: int = 50,
+                        x_admin_key: Optional[str] = Header(default=None),
+                        app_settings: Settings = Depends(get_settings),
+                        job_model: JobModel = Depends(get_job_model)):
+    """Jobs per status and the last dead letters"""
+    if not is_admin(x_admin_key=x_admin_key, app_settings=app_settings):
+        return admin_access_denied()
+
+    counts = await job_model.get_job_counts()
+    dead_jobs = await job_model.get_dead_jobs(limit=min(max(limit, 1), 500))
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.JOB_STATS_SUCCESS.value,
+            "counts": counts,
+            "dead_jobs": [
+                {
+                    "id": str(job.id),
+                    "type": job.job_type,
+                    "attempts": job.job_attempts,
+                    "error": job.job_error,
+                    "updated_at": job.job_updated_at.isoformat(),
+                }
+                for job in dead_jobs
+            ],
+        }
+    )
+
+@admin_router.post("/jobs/{job_id}/requeue")
+async def requeue_dead_job(job_id: str,
+                           x_admin_key: Optional[str] = Header(default=None),
+                           app_settings: Settings = Depends(get_settings),
+                           job_model: JobModel = Depends(get_job_model)):
+    """Give a dead job a new set of attempts, once its cause is fixed"""
+    if not is_admin(x_admin_key=x_admin_key, app_settings=app_settings):
+        return admin_access_denied()
+
+    job = await job_model.requeue_dead_job(job_id=job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.JOB_NOT_FOUND.value
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.JOB_REQUEUE_SUCCESS.value,
+            "id": str(job.id),
+        }
+    )
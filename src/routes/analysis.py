@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from helpers.config import get_settings, Settings
+from helpers.dependencies import get_project_model, get_asset_model, get_analysis_controller
+from controllers import AnalysisController
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.enums.ExtractionStatusEnum import ExtractionStatusEnum
+from models import ResponseSignal
+from routes.schemes import AnalysisRequest
+from stores.llm import InferenceQueueFullError
+from utils.sse import sse_response
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+# structured analysis of one extracted CV against a job description, through the batched generation backend
+analysis_router = APIRouter(
+    prefix="/api/v1/analysis",
+    tags=["api_v1", "analysis"],
+)
+
+
+async def get_analysis_asset(project_id: str, asset_id: str, analysis_request: AnalysisRequest,
+                             project_model: ProjectModel, asset_model: AssetModel,
+                             analysis_controller: AnalysisController):
+    """The extracted asset to analyze, or the error response"""
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return None, JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    asset = await asset_model.get_asset_document_by_id(asset_project_id=project.id, asset_id=asset_id)
+    if asset is None:
+        return None, JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.FILE_ID_ERROR.value
+            }
+        )
+
+    if asset.asset_extraction_status != ExtractionStatusEnum.DONE.value:
+        return None, JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "signal": ResponseSignal.EXTRACTION_NOT_DONE.value
+            }
+        )
+
+    if not analysis_controller.is_language_supported(analysis_request.language):
+        return None, JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.ANALYSIS_LANGUAGE_NOT_SUPPORTED.value,
+                "supported_languages": analysis_controller.SUPPORTED_LANGUAGES,
+            }
+        )
+
+    return asset, None
+
+
+@analysis_router.post("/{project_id}/{asset_id}")
+async def analyze_asset(project_id: str, asset_id: str, analysis_request: AnalysisRequest,
+                        project_model: ProjectModel = Depends(get_project_model),
+                        asset_model: AssetModel = Depends(get_asset_model),
+                        analysis_controller: AnalysisController = Depends(get_analysis_controller)):
+
+    asset, error_response = await get_analysis_asset(
+        project_id=project_id, asset_id=asset_id, analysis_request=analysis_request,
+        project_model=project_model, asset_model=asset_model, analysis_controller=analysis_controller,
+    )
+    if error_response is not None:
+        return error_response
+
+    try:
+        result, cached = await analysis_controller.analyze_asset(
+            asset=asset,
+            job_description=analysis_request.job_description,
+            language=analysis_request.language,
+        )
+    except InferenceQueueFullError:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "signal": ResponseSignal.GENERATION_QUEUE_FULL.value
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error while analyzing asset {asset_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.ANALYSIS_ERROR.value
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.ANALYSIS_SUCCESS.value,
+            "asset_id": str(asset.id),
+            "cached": cached,
+            "analysis": result.dict(),
+        }
+    )
+
+
+# same analysis as Server-Sent Events: "token" events while the model writes, then one "result" or "error" event
+@analysis_router.post("/{project_id}/{asset_id}/stream")
+async def stream_asset_analysis(project_id: str, asset_id: str, analysis_request: AnalysisRequest,
+                                app_settings: Settings = Depends(get_settings),
+                                project_model: ProjectModel = Depends(get_project_model),
+                                asset_model: AssetModel = Depends(get_asset_model),
+                                analysis_controller: AnalysisController = Depends(get_analysis_controller)):
+
+    asset, error_response = await get_analysis_asset(
+        project_id=project_id, asset_id=asset_id, analysis_request=analysis_request,
+        project_model=project_model, asset_model=asset_model, analysis_controller=analysis_controller,
+    )
+    if error_response is not None:
+        return error_response
+
+    async def events():
+        try:
+            async for event, data in analysis_controller.stream_asset_analysis(
+                asset=asset,
+                job_description=analysis_request.job_description,
+                language=analysis_request.language,
+            ):
+                if event == "result":
+                    data = {"signal": ResponseSignal.ANALYSIS_SUCCESS.value, "asset_id": str(asset.id), **data}
+                yield event, data
+        except InferenceQueueFullError:
+            yield "error", {"signal": ResponseSignal.GENERATION_QUEUE_FULL.value}
+        except Exception as e:
+            logger.error(f"Error while streaming the analysis of asset {asset_id}: {e}")
+            yield "error", {"signal": ResponseSignal.ANALYSIS_ERROR.value}
+
+    return sse_response(events(), heartbeat_interval=app_settings.SSE_HEARTBEAT_SECONDS)
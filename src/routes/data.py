@@ -32,8 +32,8 @@ async def upload_data(project_id: int, file: UploadFile,
             }
         )
 
-    project_dir_path = ProjectController().get_project_path(project_id=project_id)
-    file_path, file_id = data_controller.generate_unique_filepath(
+    project_dir_path = await ProjectController().get_project_path(project_id=project_id)
+    file_path, file_id = await data_controller.generate_unique_filepath(
         orig_file_name=file.filename,
         project_id=project_id
     )
@@ -5,15 +5,21 @@ from fastapi import FastAPI, APIRouter, Depends, UploadFile, status, Request
 from fastapi.responses import JSONResponse
 import os
 from helpers.config import get_settings, Settings
-from controllers import DataController, ProjectController
+from helpers.dependencies import get_project_model, get_asset_model, get_blob_model, get_extraction_controller
+from controllers import DataController, ProjectController, StreamUploadController, ExtractionController, UploadTooLargeError
 from models.AssetModel import AssetModel
+from models.BlobModel import BlobModel
 from models.db_schemes import Asset
 from models.enums.AssetTypeEnum import AssetTypeEnum
+from models.enums.ExtractionStatusEnum import ExtractionStatusEnum
+from models.enums.JobPriorityEnum import JobPriorityEnum
 from models.ProjectModel import ProjectModel
 from models.db_schemes import Project
 from models.enums.DataBaseEnum import DataBaseEnum
 
+from utils.storage import path_exists, replace_file, remove_file
 import aiofiles
+import asyncio
 from models import ResponseSignal
 import logging
 from typing import List
@@ -25,88 +31,117 @@ data_router = APIRouter(
     tags=["api_v1", "data"],
 )
 
-@data_router.post("/upload_all/{project_id}")
-async def upload_data(request: Request, project_id: str, files: List[UploadFile],
-                      app_settings: Settings = Depends(get_settings)):
-    
-    # instatiate the ProjectModel(db_client, project_colection, app_settings)
-    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+async def store_uploaded_files(project: Project, accepted: list, data_controller: DataController,
+                               asset_model: AssetModel, blob_model: BlobModel, semaphore: asyncio.Semaphore):
+    """Store the accepted files of a batch in the blob store and insert their assets
 
-    # here pydantic verfiy the project_id is alphanumeric
-    project = await project_model.get_or_insert_one_project_document(project_id=project_id)
+    accepted: list of (source, result, blob_hash, blob_size), the source is either the UploadFile to copy
+    or the path of a temp file already written in the blob store by the streaming upload.
+    returns the inserted assets, the results are updated in place.
+    """
 
-    # instantiate the AssetModel(db_client, asset_colection, app_settings)
-    asset_model = await AssetModel.create_instance(db_client=request.app.db_client)
+    async def write_blob(file_hash: str, source):
+        async with semaphore:
+            blob_path = await data_controller.get_blob_path(file_hash=file_hash)
 
+            # a streamed file is already on disk next to the blob store: a rename, no copy
+            if isinstance(source, str):
+                try:
+                    await replace_file(source, blob_path)
+                    return True
+                except Exception as e:
+                    logger.error(f"Error while storing blob {file_hash}: {e}")
+                    return False
 
+            # write next to the final path then rename: readers never see a partial blob
+            # and two requests storing the same content at the same time cannot corrupt it
+            tmp_path = f"{blob_path}.{data_controller.generate_random_string()}.part"
 
-    # validate the file properties
-    data_controller = DataController()
+            try:
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    while chunk := await source.read(data_controller.app_settings.FILE_DEFAULT_CHUNK_SIZE):
+                        await f.write(chunk)
+                await replace_file(tmp_path, blob_path)
+                return True
 
-    # get the project directory path
-    project_controller = ProjectController()
-    project_dir_path = project_controller.get_project_path(project_id=project_id)
+            except Exception as e:
+                logger.error(f"Error while uploading file {source.filename}: {e}")
+                await remove_file(tmp_path)
+                return False
 
-    
-    results = []
-    inserted_assets = []
-    non_inserted_assets = []
-    
-    for file in files:
-        # validate the file properties
-        is_valid, result_signal = data_controller.validate_uploaded_file(file=file)
+    # one reference per uploaded file, a content uploaded twice in the same batch gets 2 references
+    blob_references = {}
+    for _, _, blob_hash, blob_size in accepted:
+        count, _ = blob_references.get(blob_hash, (0, blob_size))
+        blob_references[blob_hash] = (count + 1, blob_size)
 
-        if not is_valid:
-            results.append({
-                "filename": file.filename,
-                "success": False,
-                "error": result_signal,
-                "file_id": None
-            })
+    new_hashes = await blob_model.acquire_blobs(blobs=blob_references)
+
+    # only the first file of each content is written, and only if the blob is not stored yet
+    # (a known blob can be missing on disk if a previous upload crashed between mongo and the disk)
+    blobs_to_write = {}
+    for source, _, blob_hash, _ in accepted:
+        if blob_hash in blobs_to_write:
             continue
+        if blob_hash in new_hashes or not await path_exists(await data_controller.get_blob_path(file_hash=blob_hash)):
+            blobs_to_write[blob_hash] = source
 
-        file_path, file_id = data_controller.generate_unique_filepath(
-            orig_file_name=file.filename,
-            project_id=project_id
-        )
+    written = await asyncio.gather(*(
+        write_blob(file_hash=blob_hash, source=source)
+        for blob_hash, source in blobs_to_write.items()
+    ))
+    failed_hashes = {blob_hash for blob_hash, ok in zip(blobs_to_write, written) if not ok}
 
-        try:
-            async with aiofiles.open(file_path, "wb") as f:
-                while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
-                    await f.write(chunk)
-            
-            results.append({
-                "filename": file.filename,
-                "success": True,
-                "file_id": file_id
-            })
-            
-        except Exception as e:
-            logger.error(f"Error while uploading file {file.filename}: {e}")
-            results.append({
-                "filename": file.filename,
-                "success": False,
-                "error": ResponseSignal.FILE_UPLOAD_FAILED.value,
-                "file_id": None
-            })
-        
-        # store the file metadata in the database
-        # asset mean 1 file metadata
-        
-        asset_resource = Asset(
+    # the references of the files that end without an asset are given back
+    released_references = {}
+
+    pending = []
+    for source, result, blob_hash, blob_size in accepted:
+        # the streamed temp files that were not renamed into the blob store are duplicates (or failures)
+        if isinstance(source, str):
+            await remove_file(source)
+
+        if blob_hash in failed_hashes:
+            result.update({"success": False, "error": ResponseSignal.FILE_UPLOAD_FAILED.value, "file_id": None})
+            released_references[blob_hash] = released_references.get(blob_hash, 0) + 1
+            continue
+
+        # only the file that wrote the blob is not a duplicate, also inside the same batch
+        result["deduplicated"] = blobs_to_write.get(blob_hash) is not source
+
+        # the asset metadata is not inserted here: all assets of the batch go to mongo in one bulk write below
+        pending.append((result, Asset(
             asset_project_id=project.id,
             asset_type=AssetTypeEnum.FILE.value,
-            asset_name=file_id,
-            asset_size=os.path.getsize(file_path)
-        )
+            asset_name=result["file_id"],
+            asset_size=blob_size,
+            asset_hash=blob_hash,
+            asset_extraction_status=ExtractionStatusEnum.PENDING.value,
+        )))
+
+    # store the files metadata in the database
+    # asset mean 1 file metadata
+    inserted = await asset_model.insert_many_asset_documents(assets=[asset for _, asset in pending])
+
+    inserted_assets = []
+    for (result, asset), insert_result in zip(pending, inserted):
+        if insert_result["success"]:
+            inserted_assets.append(insert_result["asset"])
+        else:
+            result["db_error"] = insert_result["error"]
+            released_references[asset.asset_hash] = released_references.get(asset.asset_hash, 0) + 1
+
+    if released_references:
+        removed_hashes = await blob_model.release_blobs(blobs=released_references)
+        for blob_hash in removed_hashes:
+            await remove_file(await data_controller.get_blob_path(file_hash=blob_hash))
+        # the tombstones go only once the files are gone
+        await blob_model.delete_blobs(blob_hashes=removed_hashes)
 
-        asset_record = await asset_model.insert_asset_document(asset=asset_resource)
+    return inserted_assets
 
-        if asset_record:
-            inserted_assets.append(str(asset_record.id))
 
-        
-        
+def build_upload_response(results: list, inserted_assets: list):
 
     # Calculate counts
     uploaded_files = sum(1 for result in results if result['success'])
@@ -158,3 +193,168 @@ async def upload_data(request: Request, project_id: str, files: List[UploadFile]
     )
 
 
+@data_router.post("/upload_all/{project_id}")
+async def upload_data(request: Request, project_id: str, files: List[UploadFile],
+                      app_settings: Settings = Depends(get_settings),
+                      project_model: ProjectModel = Depends(get_project_model),
+                      asset_model: AssetModel = Depends(get_asset_model),
+                      blob_model: BlobModel = Depends(get_blob_model),
+                      extraction_controller: ExtractionController = Depends(get_extraction_controller)):
+    
+    # the models are shared instances created in the lifespan (indexes already ensured)
+
+    # here pydantic verfiy the project_id is alphanumeric
+    project = await project_model.get_or_insert_one_project_document(project_id=project_id)
+
+
+
+    # validate the file properties
+    data_controller = DataController()
+
+    # the files are stored once per content in the blob store (assets/blobs/<sha256>):
+    #   1. validate and hash every file, nothing is written yet
+    #   2. take one reference per file on its blob in a single bulk write, mongo tells which contents are new
+    #   3. write only the new contents, a duplicate upload skips the disk write entirely
+    #   4. insert the assets (pointing to their blob) in a single bulk write
+    # steps 2 to 4 are shared with /upload_stream in store_uploaded_files
+    # the steps on files run concurrently, the semaphore bounds how many files are in flight at the same time
+    semaphore = asyncio.Semaphore(max(1, app_settings.FILE_MAX_CONCURRENT_UPLOADS))
+
+    async def inspect_file(file: UploadFile):
+        async with semaphore:
+            # validate the file properties
+            is_valid, result_signal = data_controller.validate_uploaded_file(file=file)
+
+            if not is_valid:
+                return {
+                    "filename": file.filename,
+                    "success": False,
+                    "error": result_signal,
+                    "file_id": None
+                }, None
+
+            try:
+                file_hash, file_size = await data_controller.hash_uploaded_file(file=file)
+            except Exception as e:
+                logger.error(f"Error while reading file {file.filename}: {e}")
+                return {
+                    "filename": file.filename,
+                    "success": False,
+                    "error": ResponseSignal.FILE_UPLOAD_FAILED.value,
+                    "file_id": None
+                }, None
+
+            return {
+                "filename": file.filename,
+                "success": True,
+                "file_id": data_controller.generate_unique_file_id(orig_file_name=file.filename),
+                "file_hash": file_hash,
+            }, (file_hash, file_size)
+
+    # asyncio.gather keeps the results in the same order as the uploaded files
+    inspected = await asyncio.gather(*(inspect_file(file) for file in files))
+
+    results = [result for result, _ in inspected]
+    accepted = [
+        (file, result, *blob)
+        for file, (result, blob) in zip(files, inspected) if blob is not None
+    ]
+
+    inserted_assets = await store_uploaded_files(
+        project=project,
+        accepted=accepted,
+        data_controller=data_controller,
+        asset_model=asset_model,
+        blob_model=blob_model,
+        semaphore=semaphore,
+    )
+
+    # the text extraction runs after the response, in the extraction process pool (or the job workers)
+    # a bulk upload passes after the single files and the retries
+    await extraction_controller.submit(assets=inserted_assets, priority=JobPriorityEnum.LOW.value)
+
+    return build_upload_response(results=results, inserted_assets=inserted_assets)
+
+
+@data_router.post("/upload_stream/{project_id}")
+async def upload_data_stream(request: Request, project_id: str,
+                             project_model: ProjectModel = Depends(get_project_model),
+                             asset_model: AssetModel = Depends(get_asset_model),
+                             blob_model: BlobModel = Depends(get_blob_model),
+                             extraction_controller: ExtractionController = Depends(get_extraction_controller)):
+    """Same contract as /upload_all, but the multipart body is parsed while it arrives
+
+    each file part is hashed and written once, straight into the blob store, instead of being
+    spooled by python-multipart then copied. the type and size limits are checked during the stream:
+    a part of an unsupported type is never written, a part crossing the size limit aborts the
+    whole upload with a 413 without reading the rest of the body.
+    """
+
+    # here pydantic verfiy the project_id is alphanumeric
+    project = await project_model.get_or_insert_one_project_document(project_id=project_id)
+
+    stream_controller = StreamUploadController()
+
+    try:
+        parts = await stream_controller.receive_parts(request=request)
+    except UploadTooLargeError as e:
+        logger.warning(f"Multipart upload for project {project_id} aborted: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={
+                "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value,
+                "filename": e.filename,
+            }
+        )
+    except ValueError as e:
+        logger.error(f"Invalid multipart upload for project {project_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value
+            }
+        )
+
+    if not parts:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.NO_FILES_ERROR.value
+            }
+        )
+
+    results = []
+    accepted = []
+    for part in parts:
+        if part["error"]:
+            results.append({
+                "filename": part["filename"],
+                "success": False,
+                "error": part["error"],
+                "file_id": None
+            })
+            continue
+
+        result = {
+            "filename": part["filename"],
+            "success": True,
+            "file_id": stream_controller.generate_unique_file_id(orig_file_name=part["filename"]),
+            "file_hash": part["file_hash"],
+        }
+        results.append(result)
+        accepted.append((part["tmp_path"], result, part["file_hash"], part["file_size"]))
+
+    inserted_assets = await store_uploaded_files(
+        project=project,
+        accepted=accepted,
+        data_controller=stream_controller,
+        asset_model=asset_model,
+        blob_model=blob_model,
+        semaphore=asyncio.Semaphore(max(1, stream_controller.app_settings.FILE_MAX_CONCURRENT_UPLOADS)),
+    )
+
+    # the text extraction runs after the response, in the extraction process pool (or the job workers)
+    # a bulk upload passes after the single files and the retries
+    await extraction_controller.submit(assets=inserted_assets, priority=JobPriorityEnum.LOW.value)
+
+    return build_upload_response(results=results, inserted_assets=inserted_assets)
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from helpers.config import get_settings, Settings
+from helpers.dependencies import get_project_model, get_nlp_controller
+from controllers import NLPController
+from models.ProjectModel import ProjectModel
+from models import ResponseSignal
+from routes.schemes import MatchRequest
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+# shortlist the CVs of a project for a job description: one embedding and one vector search per request.
+# only the returned CVs are worth the (expensive) LLM analysis.
+match_router = APIRouter(
+    prefix="/api/v1/match",
+    tags=["api_v1", "match"],
+)
+
+
+@match_router.post("/{project_id}")
+async def match_project_cvs(project_id: str, match_request: MatchRequest,
+                            app_settings: Settings = Depends(get_settings),
+                            project_model: ProjectModel = Depends(get_project_model),
+                            nlp_controller: NLPController = Depends(get_nlp_controller)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    try:
+        matches = await nlp_controller.match_job_description(
+            project=project,
+            job_description=match_request.job_description,
+            top_k=min(match_request.top_k, app_settings.MATCH_MAX_TOP_K),
+        )
+    except Exception as e:
+        logger.error(f"Error while matching the CVs of project {project_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.MATCH_ERROR.value
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.MATCH_SUCCESS.value,
+            "matches": matches,
+        }
+    )
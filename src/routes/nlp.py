@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from helpers.dependencies import get_project_model, get_asset_model, get_asset_page_model, get_nlp_controller
+from controllers import NLPController
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.AssetPageModel import AssetPageModel
+from models import ResponseSignal
+from routes.schemes import PushRequest, AnswerRequest
+from helpers.config import get_settings, Settings
+from stores.llm import InferenceQueueFullError
+from utils.sse import sse_response
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+nlp_router = APIRouter(
+    prefix="/api/v1/nlp",
+    tags=["api_v1", "nlp"],
+)
+
+
+@nlp_router.post("/index/push/{project_id}")
+async def index_project(project_id: str, push_request: PushRequest,
+                        project_model: ProjectModel = Depends(get_project_model),
+                        asset_model: AssetModel = Depends(get_asset_model),
+                        asset_page_model: AssetPageModel = Depends(get_asset_page_model),
+                        nlp_controller: NLPController = Depends(get_nlp_controller)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    try:
+        indexed_assets, inserted_chunks = await nlp_controller.index_into_vector_db(
+            project=project,
+            asset_model=asset_model,
+            asset_page_model=asset_page_model,
+            do_reset=push_request.do_reset,
+        )
+    except Exception as e:
+        logger.error(f"Error while indexing project {project_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
+            "indexed_assets": indexed_assets,
+            "inserted_items_count": inserted_chunks,
+        }
+    )
+
+
+# RAG answer over the indexed CVs as Server-Sent Events: "token" events, then one "result" or "error" event
+@nlp_router.post("/index/answer/{project_id}")
+async def answer_rag(project_id: str, answer_request: AnswerRequest,
+                     app_settings: Settings = Depends(get_settings),
+                     project_model: ProjectModel = Depends(get_project_model),
+                     nlp_controller: NLPController = Depends(get_nlp_controller)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    async def events():
+        try:
+            async for event, data in nlp_controller.stream_rag_answer(
+                project=project,
+                query=answer_request.text,
+                limit=min(answer_request.limit, app_settings.RAG_MAX_LIMIT),
+            ):
+                if event == "result":
+                    data = {"signal": ResponseSignal.RAG_ANSWER_SUCCESS.value, **data}
+                yield event, data
+        except InferenceQueueFullError:
+            yield "error", {"signal": ResponseSignal.GENERATION_QUEUE_FULL.value}
+        except Exception as e:
+            logger.error(f"Error while answering over project {project_id}: {e}")
+            yield "error", {"signal": ResponseSignal.RAG_ANSWER_ERROR.value}
+
+    return sse_response(events(), heartbeat_interval=app_settings.SSE_HEARTBEAT_SECONDS)
@@ -0,0 +1,295 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from helpers.config import get_settings, Settings
+from helpers.dependencies import get_project_model, get_asset_model, get_asset_page_model, get_extraction_controller, get_skill_controller
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.AssetPageModel import AssetPageModel
+from models.enums.ExtractionStatusEnum import ExtractionStatusEnum
+from models.enums.JobPriorityEnum import JobPriorityEnum
+from controllers import ExtractionController, ProcessController, SkillController
+from models import ResponseSignal
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional, List
+import json
+
+projects_router = APIRouter(
+    prefix="/api/v1/projects",
+    tags=["api_v1", "projects"],
+)
+
+# the listings are paginated on _id (keyset): the cursor is the _id of the last document of the previous page,
+# so every page costs the same index seek whatever its position. the /stream variants send every document
+# as one NDJSON line straight from the mongo cursor, the memory stays constant whatever the size of the project.
+
+def to_json_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def serialize_document(document: BaseModel):
+    return json.dumps(document.dict(), default=to_json_value)
+
+def parse_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    return ObjectId(cursor)
+
+def invalid_cursor():
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={
+            "signal": ResponseSignal.INVALID_CURSOR_ERROR.value
+        }
+    )
+
+def project_not_found():
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+        }
+    )
+
+async def ndjson_lines(documents):
+    async for document in documents:
+        yield serialize_document(document) + "\n"
+
+
+@projects_router.get("")
+async def list_projects(page_size: int = Query(default=10, ge=1), cursor: Optional[str] = None, count: bool = False,
+                        app_settings: Settings = Depends(get_settings),
+                        project_model: ProjectModel = Depends(get_project_model)):
+
+    try:
+        after_id = parse_cursor(cursor)
+    except (InvalidId, TypeError):
+        return invalid_cursor()
+
+    projects, next_cursor, estimated_total = await project_model.get_all_project_documents(
+        page_size=min(page_size, app_settings.LISTING_MAX_PAGE_SIZE),
+        after_id=after_id,
+        with_count=count,
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "projects": [json.loads(serialize_document(project)) for project in projects],
+            "next_cursor": str(next_cursor) if next_cursor else None,
+            "estimated_total": estimated_total,
+        }
+    )
+
+
+@projects_router.get("/stream")
+async def stream_projects(cursor: Optional[str] = None,
+                          project_model: ProjectModel = Depends(get_project_model)):
+
+    try:
+        after_id = parse_cursor(cursor)
+    except (InvalidId, TypeError):
+        return invalid_cursor()
+
+    return StreamingResponse(
+        ndjson_lines(project_model.iterate_project_documents(after_id=after_id)),
+        media_type="application/x-ndjson"
+    )
+
+
+@projects_router.get("/{project_id}/assets")
+async def list_project_assets(project_id: str, page_size: int = Query(default=10, ge=1), cursor: Optional[str] = None,
+                              asset_type: Optional[str] = None, count: bool = False,
+                              skill: Optional[List[str]] = Query(default=None),
+                              app_settings: Settings = Depends(get_settings),
+                              project_model: ProjectModel = Depends(get_project_model),
+                              asset_model: AssetModel = Depends(get_asset_model),
+                              skill_controller: SkillController = Depends(get_skill_controller)):
+
+    try:
+        after_id = parse_cursor(cursor)
+    except (InvalidId, TypeError):
+        return invalid_cursor()
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    assets, next_cursor, total = await asset_model.get_assets_documents_page(
+        asset_project_id=project.id,
+        asset_type=asset_type,
+        page_size=min(page_size, app_settings.LISTING_MAX_PAGE_SIZE),
+        after_id=after_id,
+        with_count=count,
+        skills=skill_controller.normalize_skill_names(skill) if skill else None,
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "assets": [json.loads(serialize_document(asset)) for asset in assets],
+            "next_cursor": str(next_cursor) if next_cursor else None,
+            "total": total,
+        }
+    )
+
+
+@projects_router.get("/{project_id}/assets/stream")
+async def stream_project_assets(project_id: str, cursor: Optional[str] = None, asset_type: Optional[str] = None,
+                                skill: Optional[List[str]] = Query(default=None),
+                                project_model: ProjectModel = Depends(get_project_model),
+                                asset_model: AssetModel = Depends(get_asset_model),
+                                skill_controller: SkillController = Depends(get_skill_controller)):
+
+    try:
+        after_id = parse_cursor(cursor)
+    except (InvalidId, TypeError):
+        return invalid_cursor()
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    return StreamingResponse(
+        ndjson_lines(asset_model.iterate_assets_documents(
+            asset_project_id=project.id,
+            asset_type=asset_type,
+            after_id=after_id,
+            skills=skill_controller.normalize_skill_names(skill) if skill else None,
+        )),
+        media_type="application/x-ndjson"
+    )
+
+
+# skill facets of a project (number of CVs per skill). the asset listings above filter on the same skills:
+# ?skill=python&skill=docker keeps the CVs having all of them, aliases accepted ("powerbi" is "Power BI")
+@projects_router.get("/{project_id}/skills")
+async def get_project_skills(project_id: str, limit: int = Query(default=100, ge=1),
+                             project_model: ProjectModel = Depends(get_project_model),
+                             asset_model: AssetModel = Depends(get_asset_model)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    skills = await asset_model.get_skill_counts(asset_project_id=project.id, limit=limit)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "skills": skills,
+        }
+    )
+
+
+def asset_not_found():
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "signal": ResponseSignal.FILE_ID_ERROR.value
+        }
+    )
+
+def extraction_content(asset):
+    return {
+        "asset_id": str(asset.id),
+        "asset_name": asset.asset_name,
+        "extraction_status": asset.asset_extraction_status,
+        "page_count": asset.asset_page_count,
+        "extraction_error": asset.asset_extraction_error,
+        "skills": asset.asset_skills,
+    }
+
+
+@projects_router.get("/{project_id}/assets/{asset_id}/extraction")
+async def get_asset_extraction(project_id: str, asset_id: str, include_pages: bool = False,
+                               project_model: ProjectModel = Depends(get_project_model),
+                               asset_model: AssetModel = Depends(get_asset_model),
+                               asset_page_model: AssetPageModel = Depends(get_asset_page_model)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    asset = await asset_model.get_asset_document_by_id(asset_project_id=project.id, asset_id=asset_id)
+    if asset is None:
+        return asset_not_found()
+
+    content = extraction_content(asset)
+
+    if include_pages and asset.asset_extraction_status == ExtractionStatusEnum.DONE.value:
+        content["pages"] = [
+            {"page_number": page.page_number, "page_text": page.page_text}
+            async for page in asset_page_model.iterate_pages(blob_hash=asset.asset_hash)
+        ]
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=content
+    )
+
+
+@projects_router.post("/{project_id}/assets/{asset_id}/extraction")
+async def retry_asset_extraction(project_id: str, asset_id: str,
+                                 project_model: ProjectModel = Depends(get_project_model),
+                                 asset_model: AssetModel = Depends(get_asset_model),
+                                 extraction_controller: ExtractionController = Depends(get_extraction_controller)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    asset = await asset_model.get_asset_document_by_id(asset_project_id=project.id, asset_id=asset_id)
+    if asset is None:
+        return asset_not_found()
+
+    # an extraction in progress is not started twice
+    if asset.asset_extraction_status != ExtractionStatusEnum.PROCESSING.value:
+        await asset_model.update_extraction_status(
+            asset_ids=[asset.id],
+            status=ExtractionStatusEnum.PENDING.value
+        )
+        asset.asset_extraction_status = ExtractionStatusEnum.PENDING.value
+        await extraction_controller.submit(assets=[asset], priority=JobPriorityEnum.HIGH.value)
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=extraction_content(asset)
+    )
+
+
+@projects_router.get("/{project_id}/assets/{asset_id}/chunks")
+async def stream_asset_chunks(project_id: str, asset_id: str,
+                              project_model: ProjectModel = Depends(get_project_model),
+                              asset_model: AssetModel = Depends(get_asset_model),
+                              asset_page_model: AssetPageModel = Depends(get_asset_page_model)):
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    asset = await asset_model.get_asset_document_by_id(asset_project_id=project.id, asset_id=asset_id)
+    if asset is None:
+        return asset_not_found()
+
+    if asset.asset_extraction_status != ExtractionStatusEnum.DONE.value:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "signal": ResponseSignal.EXTRACTION_NOT_DONE.value,
+                **extraction_content(asset),
+            }
+        )
+
+    return StreamingResponse(
+        ndjson_lines(ProcessController().iterate_blob_chunks(
+            asset_page_model=asset_page_model,
+            blob_hash=asset.asset_hash,
+        )),
+        media_type="application/x-ndjson"
+    )
@@ -0,0 +1,2 @@
+from .uploads import UploadSessionRequest
+from .nlp import PushRequest, AnswerRequest, MatchRequest, SearchRequest, AnalysisRequest
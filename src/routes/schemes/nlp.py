@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class PushRequest(BaseModel):
+    do_reset: Optional[bool] = False
+
+class AnswerRequest(BaseModel):
+    text: str = Field(..., min_length=1)
+    limit: int = Field(default=5, ge=1, le=100)
+
+class MatchRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    top_k: Optional[int] = Field(default=10, ge=1)
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    top_k: Optional[int] = Field(default=10, ge=1)
+    mode: Optional[str] = "keyword"     # see SearchModeEnum
+
+class AnalysisRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    language: Optional[str] = "en"
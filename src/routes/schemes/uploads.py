@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+class UploadSessionRequest(BaseModel):
+    file_name: str = Field(..., min_length=1)
+    content_type: str = Field(..., min_length=1)
+    file_size: int = Field(..., ge=0)
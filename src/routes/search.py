@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from helpers.config import get_settings, Settings
+from helpers.dependencies import get_project_model, get_nlp_controller, get_keyword_index_controller
+from controllers import NLPController, KeywordIndexController
+from models.ProjectModel import ProjectModel
+from models.enums.SearchModeEnum import SearchModeEnum
+from models import ResponseSignal
+from routes.schemes import SearchRequest
+import asyncio
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+# keyword search over the extracted CVs: exact terms ("SQL", "Power BI", "PyTorch") ranked with BM25,
+# or hybrid: the BM25 ranking fused with the vector ranking of /api/v1/match
+search_router = APIRouter(
+    prefix="/api/v1/search",
+    tags=["api_v1", "search"],
+)
+
+
+@search_router.post("/{project_id}")
+async def search_project_cvs(project_id: str, search_request: SearchRequest,
+                             app_settings: Settings = Depends(get_settings),
+                             project_model: ProjectModel = Depends(get_project_model),
+                             keyword_index_controller: KeywordIndexController = Depends(get_keyword_index_controller),
+                             nlp_controller: NLPController = Depends(get_nlp_controller)):
+
+    if search_request.mode not in [mode.value for mode in SearchModeEnum]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.SEARCH_MODE_NOT_SUPPORTED.value
+            }
+        )
+
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    top_k = min(search_request.top_k, app_settings.MATCH_MAX_TOP_K)
+
+    try:
+        if search_request.mode == SearchModeEnum.KEYWORD.value:
+            results = await keyword_index_controller.search(project=project, query=search_request.query, top_k=top_k)
+        else:
+            candidates = max(top_k, app_settings.SEARCH_HYBRID_CANDIDATES)
+            keyword_results, vector_results = await asyncio.gather(
+                keyword_index_controller.search(project=project, query=search_request.query, top_k=candidates),
+                nlp_controller.match_job_description(project=project, job_description=search_request.query,
+                                                     top_k=candidates),
+            )
+            results = keyword_index_controller.fuse_rankings(
+                keyword_results=keyword_results,
+                vector_results=vector_results,
+                top_k=top_k,
+            )
+    except Exception as e:
+        logger.error(f"Error while searching the CVs of project {project_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.SEARCH_ERROR.value
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.SEARCH_SUCCESS.value,
+            "results": results,
+        }
+    )
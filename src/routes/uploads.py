@@ -0,0 +1,348 @@
+from fastapi import APIRouter, Depends, Header, status, Request
+from fastapi.responses import JSONResponse
+from helpers.config import get_settings, Settings
+from helpers.dependencies import get_project_model, get_asset_model, get_blob_model, get_upload_session_model, get_extraction_controller
+from controllers import UploadSessionController, ExtractionController
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.BlobModel import BlobModel
+from models.UploadSessionModel import UploadSessionModel
+from models.db_schemes import UploadSession
+from models.enums.UploadStatusEnum import UploadStatusEnum
+from models import ResponseSignal
+from routes.schemes import UploadSessionRequest
+from routes.data_multiple import store_uploaded_files
+import asyncio
+import logging
+import uuid
+import os
+
+logger = logging.getLogger('uvicorn.error')
+
+# resumable uploads: create a session, PATCH the bytes at the current offset (as many times as needed,
+# an interrupted PATCH keeps the bytes it received), GET the offset to resume, then finalize.
+# the finalization stores the file in the blob store and creates the same Asset as /upload_all.
+uploads_router = APIRouter(
+    prefix="/api/v1/uploads",
+    tags=["api_v1", "uploads"],
+)
+
+def session_content(upload_session: UploadSession):
+    return {
+        "upload_id": str(upload_session.id),
+        "upload_offset": upload_session.upload_offset,
+        "upload_size": upload_session.upload_size,
+        "upload_status": upload_session.upload_status,
+        "asset_id": str(upload_session.upload_asset_id) if upload_session.upload_asset_id else None,
+    }
+
+def session_headers(upload_session: UploadSession):
+    return {
+        "Upload-Offset": str(upload_session.upload_offset),
+        "Upload-Length": str(upload_session.upload_size),
+    }
+
+def project_not_found():
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+        }
+    )
+
+def session_not_found():
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value
+        }
+    )
+
+
+@uploads_router.post("/{project_id}")
+async def create_upload_session(project_id: str, upload_request: UploadSessionRequest,
+                                project_model: ProjectModel = Depends(get_project_model),
+                                upload_session_model: UploadSessionModel = Depends(get_upload_session_model)):
+
+    upload_controller = UploadSessionController()
+
+    # the type and the size are known before the first byte: reject the upload right away
+    if not upload_controller.validate_file_type(content_type=upload_request.content_type):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
+            }
+        )
+
+    if not upload_controller.validate_file_size(file_size=upload_request.file_size):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value
+            }
+        )
+
+    # here pydantic verfiy the project_id is alphanumeric
+    project = await project_model.get_or_insert_one_project_document(project_id=project_id)
+
+    upload_session = await upload_session_model.insert_upload_session(
+        upload_session=UploadSession(
+            upload_project_id=project.id,
+            upload_file_name=upload_request.file_name,
+            upload_content_type=upload_request.content_type,
+            upload_size=upload_request.file_size,
+            upload_status=UploadStatusEnum.UPLOADING.value,
+        )
+    )
+
+    await upload_controller.create_session_file(upload_id=upload_session.id)
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        headers=session_headers(upload_session),
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_CREATED.value,
+            **session_content(upload_session),
+        }
+    )
+
+
+@uploads_router.get("/{project_id}/{upload_id}")
+async def get_upload_session(project_id: str, upload_id: str,
+                             project_model: ProjectModel = Depends(get_project_model),
+                             upload_session_model: UploadSessionModel = Depends(get_upload_session_model)):
+
+    # a status probe or a chunk never creates a project
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    upload_session = await upload_session_model.get_upload_session(asset_project_id=project.id, upload_id=upload_id)
+
+    if upload_session is None:
+        return session_not_found()
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        headers=session_headers(upload_session),
+        content=session_content(upload_session)
+    )
+
+
+@uploads_router.patch("/{project_id}/{upload_id}")
+async def upload_chunk(request: Request, project_id: str, upload_id: str,
+                       upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+                       app_settings: Settings = Depends(get_settings),
+                       project_model: ProjectModel = Depends(get_project_model),
+                       upload_session_model: UploadSessionModel = Depends(get_upload_session_model)):
+
+    # a status probe or a chunk never creates a project
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    upload_session = await upload_session_model.get_upload_session(asset_project_id=project.id, upload_id=upload_id)
+
+    if upload_session is None:
+        return session_not_found()
+
+    # the client must send the bytes that follow the committed offset, otherwise it has to ask for the offset again
+    if upload_session.upload_status != UploadStatusEnum.UPLOADING.value or upload_offset != upload_session.upload_offset:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            headers=session_headers(upload_session),
+            content={
+                "signal": ResponseSignal.UPLOAD_OFFSET_MISMATCH.value,
+                **session_content(upload_session),
+            }
+        )
+
+    # the body is received into a private chunk file, and only copied into the session file by the PATCH
+    # that claimed the session at this offset: a concurrent PATCH can not overwrite committed bytes
+    upload_controller = UploadSessionController()
+    chunk_path = await upload_controller.get_chunk_path(upload_id=upload_session.id)
+    try:
+        written, too_large = await upload_controller.receive_chunk(
+            chunk_path=chunk_path,
+            stream=request.stream(),
+            max_bytes=upload_session.upload_size - upload_offset,
+        )
+
+        writer_id = uuid.uuid4().hex
+        updated_session = await upload_session_model.claim_upload_writer(
+            upload_id=upload_session.id,
+            expected_offset=upload_offset,
+            writer_id=writer_id,
+            lease_seconds=app_settings.UPLOAD_WRITER_LEASE_SECONDS,
+        )
+
+        if updated_session is not None:
+            try:
+                await upload_controller.apply_chunk(
+                    chunk_path=chunk_path,
+                    session_path=await upload_controller.get_session_path(upload_id=upload_session.id),
+                    offset=upload_offset,
+                )
+            except BaseException:
+                await upload_session_model.release_upload_writer(upload_id=upload_session.id, writer_id=writer_id)
+                raise
+
+            # compare-and-set by the writer: the chunk is committed once
+            updated_session = await upload_session_model.advance_upload_offset(
+                upload_id=upload_session.id,
+                expected_offset=upload_offset,
+                new_offset=upload_offset + written,
+                writer_id=writer_id,
+            )
+    finally:
+        await upload_controller.remove_chunk(chunk_path=chunk_path)
+
+    if updated_session is None:
+        current_session = await upload_session_model.get_upload_session(asset_project_id=project.id, upload_id=upload_id)
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            headers=session_headers(current_session),
+            content={
+                "signal": ResponseSignal.UPLOAD_OFFSET_MISMATCH.value,
+                **session_content(current_session),
+            }
+        )
+
+    if too_large:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            headers=session_headers(updated_session),
+            content={
+                "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value,
+                **session_content(updated_session),
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        headers=session_headers(updated_session),
+        content={
+            "signal": ResponseSignal.UPLOAD_CHUNK_SUCCESS.value,
+            **session_content(updated_session),
+        }
+    )
+
+
+@uploads_router.post("/{project_id}/{upload_id}/finalize")
+async def finalize_upload_session(project_id: str, upload_id: str,
+                                  app_settings: Settings = Depends(get_settings),
+                                  project_model: ProjectModel = Depends(get_project_model),
+                                  asset_model: AssetModel = Depends(get_asset_model),
+                                  blob_model: BlobModel = Depends(get_blob_model),
+                                  upload_session_model: UploadSessionModel = Depends(get_upload_session_model),
+                                  extraction_controller: ExtractionController = Depends(get_extraction_controller)):
+
+    # a status probe or a chunk never creates a project
+    project = await project_model.get_project_document(project_id=project_id)
+    if project is None:
+        return project_not_found()
+
+    upload_session = await upload_session_model.get_upload_session(asset_project_id=project.id, upload_id=upload_id)
+
+    if upload_session is None:
+        return session_not_found()
+
+    # finalizing twice returns the same asset
+    if upload_session.upload_status == UploadStatusEnum.COMPLETED.value:
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_COMPLETED.value,
+                **session_content(upload_session),
+            }
+        )
+
+    claimed_session = await upload_session_model.claim_upload_session(
+        upload_id=upload_session.id,
+        upload_size=upload_session.upload_size,
+        stale_seconds=app_settings.UPLOAD_FINALIZE_TIMEOUT_SECONDS,
+    )
+
+    if claimed_session is None:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            headers=session_headers(upload_session),
+            content={
+                "signal": ResponseSignal.UPLOAD_INCOMPLETE.value,
+                **session_content(upload_session),
+            }
+        )
+
+    upload_controller = UploadSessionController()
+    session_path = await upload_controller.get_session_path(upload_id=claimed_session.id)
+
+    try:
+        file_hash = await upload_controller.get_file_hash(file_path=session_path)
+    except Exception as e:
+        logger.error(f"Error while reading the upload session {upload_id}: {e}")
+        await upload_session_model.fail_upload_session(upload_id=claimed_session.id)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value
+            }
+        )
+
+    result = {
+        "filename": claimed_session.upload_file_name,
+        "success": True,
+        "file_id": upload_controller.generate_unique_file_id(orig_file_name=claimed_session.upload_file_name),
+        "file_hash": file_hash,
+    }
+
+    # the session file is renamed into the blob store (or dropped if the content is already stored)
+    try:
+        inserted_assets = await store_uploaded_files(
+            project=project,
+            accepted=[(session_path, result, file_hash, claimed_session.upload_size)],
+            data_controller=upload_controller,
+            asset_model=asset_model,
+            blob_model=blob_model,
+            semaphore=asyncio.Semaphore(1),
+        )
+    except Exception as e:
+        logger.error(f"Error while finalizing the upload session {upload_id}: {e}")
+        # the session is not left in finalizing: finalized again while its file is still there, failed otherwise
+        if await asyncio.to_thread(os.path.exists, session_path):
+            await upload_session_model.release_upload_session(upload_id=claimed_session.id)
+        else:
+            await upload_session_model.fail_upload_session(upload_id=claimed_session.id)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value
+            }
+        )
+
+    if not inserted_assets:
+        await upload_session_model.fail_upload_session(upload_id=claimed_session.id)
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value,
+                "details": [result],
+            }
+        )
+
+    await extraction_controller.submit(assets=inserted_assets)
+
+    await upload_session_model.complete_upload_session(
+        upload_id=claimed_session.id,
+        asset_id=inserted_assets[0].id,
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_COMPLETED.value,
+            "upload_id": upload_id,
+            "asset_id": str(inserted_assets[0].id),
+            "details": [result],
+        }
+    )
@@ -0,0 +1,62 @@
+from array import array
+from typing import Dict, List
+import threading
+import sqlite3
+import os
+
+class EmbeddingCache:
+    """Persistent embedding cache: sqlite file, one row per (model key, text hash)
+
+    shared by the uvicorn workers of the host (WAL mode: readers do not block the writer)
+    and kept across restarts, so a chunk already embedded once is never sent to the backend again.
+    the methods are blocking: the EmbeddingClient calls them through asyncio.to_thread.
+    """
+
+    # sqlite limits the number of bound parameters of one statement
+    MAX_QUERY_PARAMETERS = 500
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model_key TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model_key, text_hash)"
+            ") WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def get_many(self, model_key: str, text_hashes: List[str]) -> Dict[str, List[float]]:
+        vectors = {}
+        with self.lock:
+            for start in range(0, len(text_hashes), self.MAX_QUERY_PARAMETERS):
+                batch = text_hashes[start:start + self.MAX_QUERY_PARAMETERS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model_key = ? AND text_hash IN ({placeholders})",
+                    [model_key, *batch],
+                )
+                for text_hash, blob in rows:
+                    vectors[text_hash] = array("f", blob).tolist()
+        return vectors
+
+    def put_many(self, model_key: str, vectors: Dict[str, List[float]]):
+        if not vectors:
+            return
+        with self.lock:
+            # float32 is the precision of the embedding APIs
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_key, text_hash, vector) VALUES (?, ?, ?)",
+                [(model_key, text_hash, array("f", vector).tobytes()) for text_hash, vector in vectors.items()],
+            )
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,163 @@
+from .LLMInterface import LLMInterface
+from .LLMEnums import DocumentTypeEnum
+from .EmbeddingCache import EmbeddingCache
+from utils.lru_cache import TTLLRUCache
+from collections import defaultdict
+from typing import List, Optional
+import hashlib
+import asyncio
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+class EmbeddingClient:
+    """Cached, micro-batched access to an embedding provider
+
+    a text is looked up in the in-memory LRU, then in the disk cache, keyed by (model, text hash):
+    an unchanged chunk is never embedded twice. the misses of concurrent callers are gathered in
+    one backend request of up to `batch_size` texts, sent at the latest `max_wait` seconds after
+    the first one arrived, and a text already in flight is awaited instead of being sent again.
+    """
+
+    def __init__(self, provider: LLMInterface, backend: str, model_id: str, embedding_size: int,
+                 batch_size: int = 96, max_wait: float = 0.02, max_concurrent_requests: int = 4,
+                 memory_cache_size: int = 10000, disk_cache: Optional[EmbeddingCache] = None):
+        self.provider = provider
+        self.provider.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+        self.model_id = model_id
+        self.embedding_size = embedding_size
+        self.model_key = f"{backend}:{model_id}:{embedding_size}"
+
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+        # the vectors do not change for a given model: no expiry, only the LRU bound
+        self.memory_cache = TTLLRUCache(max_size=memory_cache_size, ttl=float("inf"))
+        self.disk_cache = disk_cache
+
+        self.pending = defaultdict(list)    # document_type -> [(cache_key, text_hash, text)]
+        self.timers = {}                    # document_type -> flush timer of the pending batch
+        self.in_flight = {}                 # cache_key -> future of the vector
+        self.tasks = set()
+
+    def get_text_hash(self, text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_disk_model_key(self, document_type: str) -> str:
+        # some backends embed queries and documents differently
+        return f"{self.model_key}:{document_type}"
+
+    async def embed_text(self, text: str, document_type: str = DocumentTypeEnum.DOCUMENT.value) -> List[float]:
+        vectors = await self.embed_texts(texts=[text], document_type=document_type)
+        return vectors[0]
+
+    async def embed_texts(self, texts: List[str],
+                          document_type: str = DocumentTypeEnum.DOCUMENT.value) -> List[List[float]]:
+        text_hashes = [self.get_text_hash(text) for text in texts]
+        cache_keys = [f"{document_type}:{text_hash}" for text_hash in text_hashes]
+
+        vectors = {}
+        misses = {}
+        for cache_key, text_hash, text in zip(cache_keys, text_hashes, texts):
+            vector = self.memory_cache.get(cache_key)
+            if vector is not None:
+                vectors[cache_key] = vector
+            else:
+                misses[cache_key] = (text_hash, text)
+
+        if misses and self.disk_cache is not None:
+            stored = await asyncio.to_thread(
+                self.disk_cache.get_many,
+                self.get_disk_model_key(document_type),
+                list({text_hash for text_hash, _ in misses.values()}),
+            )
+            for cache_key, (text_hash, _) in list(misses.items()):
+                if text_hash in stored:
+                    vectors[cache_key] = stored[text_hash]
+                    self.memory_cache.set(cache_key, stored[text_hash])
+                    del misses[cache_key]
+
+        if misses:
+            futures = {
+                cache_key: self.enqueue(cache_key, text_hash, text, document_type)
+                for cache_key, (text_hash, text) in misses.items()
+            }
+            # the futures are shared with the other callers of the same texts:
+            # a cancelled caller (client disconnect) must not cancel them for everybody
+            results = await asyncio.gather(*[asyncio.shield(future) for future in futures.values()])
+            vectors.update(zip(futures.keys(), results))
+
+        return [vectors[cache_key] for cache_key in cache_keys]
+
+    def enqueue(self, cache_key: str, text_hash: str, text: str, document_type: str) -> asyncio.Future:
+        future = self.in_flight.get(cache_key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[cache_key] = future
+
+        batch = self.pending[document_type]
+        batch.append((cache_key, text_hash, text))
+
+        if len(batch) >= self.batch_size:
+            self.flush(document_type)
+        elif document_type not in self.timers:
+            self.timers[document_type] = loop.call_later(self.max_wait, self.flush, document_type)
+
+        return future
+
+    def flush(self, document_type: str):
+        timer = self.timers.pop(document_type, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self.pending.pop(document_type, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self.run_batch(batch=batch, document_type=document_type))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run_batch(self, batch: list, document_type: str):
+        try:
+            async with self.request_semaphore:
+                vectors = await self.provider.embed_texts(
+                    texts=[text for _, _, text in batch],
+                    document_type=document_type,
+                )
+            if len(vectors) != len(batch):
+                raise ValueError("The embedding backend returned a wrong number of vectors")
+
+            if self.disk_cache is not None:
+                await asyncio.to_thread(
+                    self.disk_cache.put_many,
+                    self.get_disk_model_key(document_type),
+                    {text_hash: vector for (_, text_hash, _), vector in zip(batch, vectors)},
+                )
+
+        except Exception as e:
+            logger.error(f"Error while embedding a batch of {len(batch)} texts: {e}")
+            for cache_key, _, _ in batch:
+                future = self.in_flight.pop(cache_key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for (cache_key, _, _), vector in zip(batch, vectors):
+            self.memory_cache.set(cache_key, vector)
+            future = self.in_flight.pop(cache_key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+    async def close(self):
+        for document_type in list(self.pending.keys()):
+            self.flush(document_type)
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.disk_cache is not None:
+            self.disk_cache.close()
@@ -0,0 +1,236 @@
+from .LLMInterface import LLMInterface
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+class InferenceQueueFullError(Exception):
+    pass
+
+@dataclass
+class InferenceRequest:
+    prompt: List[dict]
+    batch_key: tuple
+    future: asyncio.Future
+    enqueued_at: float = field(default=0.0)
+    # streamed requests: deltas not read yet by the caller, set on every new delta
+    chunks: List[str] = field(default_factory=list)
+    updated: asyncio.Event = field(default_factory=asyncio.Event)
+
+class InferenceScheduler:
+    """Micro-batching in front of the generation backend
+
+    concurrent `generate` calls are queued and a dispatcher sends them to the backend together:
+    a batch leaves as soon as it holds `batch_size` prompts, or `max_wait` seconds after its oldest
+    prompt arrived. the dispatcher only forms a batch when one of the `max_concurrent_batches` slots
+    is free, so while the model is busy the queue fills up and the next batch goes out full.
+    only the prompts sharing the same generation parameters are batched together.
+
+    `stream` goes through the same batches and yields the deltas as the backend produces them.
+    the model never waits for a slow reader: the deltas it did not read yet are joined in one piece.
+    a caller that stops reading cancels its request, a batch whose callers are all gone is stopped.
+    """
+
+    def __init__(self, provider: LLMInterface, backend: str, model_id: str, batch_size: int = 8,
+                 max_wait: float = 0.05, max_concurrent_batches: int = 1, max_queue_size: int = 256):
+        self.provider = provider
+        self.provider.set_generation_model(model_id=model_id)
+        self.model_id = model_id
+        self.model_key = f"{backend}:{model_id}"
+
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_queue_size = max_queue_size
+        self.batch_slots = asyncio.Semaphore(max_concurrent_batches)
+
+        self.pending: List[InferenceRequest] = []
+        self.arrived = asyncio.Event()
+        self.schemas = {}                   # batch key -> json schema of the batch
+        self.dispatcher = None
+        self.tasks = set()
+
+    def enqueue(self, prompt: List[dict], max_output_tokens: int, temperature: float,
+                json_schema: Optional[dict], stream: bool) -> InferenceRequest:
+        if len(self.pending) >= self.max_queue_size:
+            raise InferenceQueueFullError(f"{len(self.pending)} prompts are already waiting for the model")
+
+        schema_key = json.dumps(json_schema, sort_keys=True) if json_schema else None
+        batch_key = (max_output_tokens, temperature, schema_key, stream)
+        self.schemas[batch_key] = json_schema
+
+        loop = asyncio.get_running_loop()
+        request = InferenceRequest(prompt=prompt, batch_key=batch_key,
+                                   future=loop.create_future(), enqueued_at=loop.time())
+        self.pending.append(request)
+        self.arrived.set()
+
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self.dispatch())
+
+        return request
+
+    async def generate(self, prompt: List[dict], max_output_tokens: int, temperature: float,
+                       json_schema: Optional[dict] = None) -> str:
+        request = self.enqueue(prompt=prompt, max_output_tokens=max_output_tokens, temperature=temperature,
+                               json_schema=json_schema, stream=False)
+
+        # a cancelled caller leaves its future cancelled, the dispatcher skips it
+        return await request.future
+
+    async def stream(self, prompt: List[dict], max_output_tokens: int, temperature: float,
+                     json_schema: Optional[dict] = None) -> AsyncIterator[str]:
+        request = self.enqueue(prompt=prompt, max_output_tokens=max_output_tokens, temperature=temperature,
+                               json_schema=json_schema, stream=True)
+        try:
+            while True:
+                if request.chunks:
+                    chunks, request.chunks = request.chunks, []
+                    yield "".join(chunks)
+                    continue
+
+                if request.future.done():
+                    request.future.result()     # raises the error of the batch
+                    return
+
+                request.updated.clear()
+                await request.updated.wait()
+        finally:
+            if not request.future.done():
+                request.future.cancel()
+
+    async def dispatch(self):
+        while True:
+            await self.batch_slots.acquire()
+            try:
+                batch = await self.collect_batch()
+            except BaseException:
+                self.batch_slots.release()
+                raise
+
+            if not batch:
+                self.batch_slots.release()
+                continue
+
+            task = asyncio.create_task(self.run_batch(batch=batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            task.add_done_callback(lambda _: self.batch_slots.release())
+
+    def get_batch(self, batch_key: tuple):
+        return [request for request in self.pending if request.batch_key == batch_key][:self.batch_size]
+
+    async def collect_batch(self) -> List[InferenceRequest]:
+        while not self.pending:
+            self.arrived.clear()
+            await self.arrived.wait()
+
+        loop = asyncio.get_running_loop()
+        oldest = self.pending[0]
+        deadline = oldest.enqueued_at + self.max_wait
+
+        batch = self.get_batch(oldest.batch_key)
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            self.arrived.clear()
+            try:
+                await asyncio.wait_for(self.arrived.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            batch = self.get_batch(oldest.batch_key)
+
+        taken = set(map(id, batch))
+        self.pending = [request for request in self.pending if id(request) not in taken]
+
+        return [request for request in batch if not request.future.done()]
+
+    async def run_batch(self, batch: List[InferenceRequest]):
+        max_output_tokens, temperature, _, stream = batch[0].batch_key
+        if stream:
+            return await self.run_stream_batch(batch=batch)
+
+        try:
+            answers = await self.provider.generate_texts(
+                prompts=[request.prompt for request in batch],
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+                json_schema=self.schemas.get(batch[0].batch_key),
+            )
+            if len(answers) != len(batch):
+                raise ValueError("The generation backend returned a wrong number of answers")
+
+        except Exception as e:
+            logger.error(f"Error while generating a batch of {len(batch)} prompts: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, answer in zip(batch, answers):
+            if request.future.done():
+                continue
+            if isinstance(answer, BaseException):
+                logger.error(f"Error while generating a prompt of a batch of {len(batch)}: {answer}")
+                request.future.set_exception(answer)
+            else:
+                request.future.set_result(answer)
+
+    async def run_stream_batch(self, batch: List[InferenceRequest]):
+        max_output_tokens, temperature, _, _ = batch[0].batch_key
+        answers = [[] for _ in batch]
+
+        stream = self.provider.stream_texts(
+            prompts=[request.prompt for request in batch],
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            json_schema=self.schemas.get(batch[0].batch_key),
+        )
+        try:
+            async for index, delta in stream:
+                request = batch[index]
+                if request.future.done():
+                    if all(request.future.done() for request in batch):
+                        break
+                    continue
+                if isinstance(delta, BaseException):
+                    logger.error(f"Error while streaming a prompt of a batch of {len(batch)}: {delta}")
+                    request.future.set_exception(delta)
+                    request.updated.set()
+                    continue
+                answers[index].append(delta)
+                request.chunks.append(delta)
+                request.updated.set()
+
+        except Exception as e:
+            logger.error(f"Error while streaming a batch of {len(batch)} prompts: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+                    request.updated.set()
+            return
+
+        finally:
+            await stream.aclose()
+
+        for request, answer in zip(batch, answers):
+            if not request.future.done():
+                request.future.set_result("".join(answer))
+                request.updated.set()
+
+    async def close(self):
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+            await asyncio.gather(self.dispatcher, return_exceptions=True)
+
+        for request in self.pending:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("The inference scheduler was closed"))
+                request.updated.set()
+        self.pending = []
+
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
@@ -0,0 +1,17 @@
+from enum import Enum
+
+class LLMEnums(Enum):
+
+    OPENAI = "OPENAI"
+    COHERE = "COHERE"
+    LOCAL = "LOCAL"
+
+class DocumentTypeEnum(Enum):
+
+    DOCUMENT = "document"
+    QUERY = "query"
+
+class CoHereEnums(Enum):
+
+    DOCUMENT = "search_document"
+    QUERY = "search_query"
@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+
+class LLMInterface(ABC):
+
+    @abstractmethod
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        pass
+
+    @abstractmethod
+    async def embed_texts(self, texts: List[str], document_type: str) -> List[List[float]]:
+        """Embed one batch of texts in a single backend request"""
+        pass
+
+    @abstractmethod
+    def set_generation_model(self, model_id: str):
+        pass
+
+    @abstractmethod
+    async def generate_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                             json_schema: Optional[dict] = None) -> List[str]:
+        """Answer one batch of chat prompts (lists of {"role", "content"} messages), same order as `prompts`
+
+        `json_schema` asks for a JSON answer following the schema, when the backend supports it.
+        the apis answering one prompt per request put the exception of a failed prompt in its place,
+        the other prompts of the batch keep their answers
+        """
+        pass
+
+    @abstractmethod
+    def stream_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                     json_schema: Optional[dict] = None) -> AsyncIterator[Tuple[int, str]]:
+        """Same as generate_texts, yields (index of the prompt, text delta) as the tokens are produced
+
+        a prompt whose stream failed yields (index, exception) once, the others go on.
+        closing the iterator stops the generation of the whole batch
+        """
+        pass
+
+    def estimate_tokens(self, texts: List[str]) -> int:
+        # rough count for the rate limits (~4 characters per token), no tokenizer download needed
+        return sum(len(text) for text in texts) // 4 + 1
+
+    async def close(self):
+        """Release the connections of the backend client, at shutdown"""
+        pass
+
+    async def merge_text_streams(self, streams: List[AsyncIterator[str]]) -> AsyncIterator[Tuple[int, str]]:
+        # the apis stream one conversation per request: their deltas are interleaved in arrival order
+        queue = asyncio.Queue()
+
+        async def pump(index: int, stream: AsyncIterator[str]):
+            try:
+                async for delta in stream:
+                    await queue.put((index, delta))
+            except Exception as e:
+                await queue.put((index, e))
+            finally:
+                await queue.put((index, None))
+
+        tasks = [asyncio.create_task(pump(index, stream)) for index, stream in enumerate(streams)]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                index, item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                else:
+                    # an exception only ends the stream of its own prompt
+                    yield index, item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,103 @@
+from .LLMEnums import LLMEnums
+from .providers import OpenAIProvider, CoHereProvider, LocalProvider
+from .EmbeddingClient import EmbeddingClient
+from .EmbeddingCache import EmbeddingCache
+from .InferenceScheduler import InferenceScheduler
+from .RateLimiter import RateLimiter
+from helpers.config import get_secret
+
+class LLMProviderFactory:
+
+    def __init__(self, config: object):
+        self.config = config
+        # one client per backend and worker: the embeddings and the generations share its pool and its limits
+        self.providers = {}
+
+    def create_rate_limiter(self, requests_per_minute: int, tokens_per_minute: int, max_concurrent_requests: int):
+        return RateLimiter(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_concurrent_requests=max_concurrent_requests,
+            max_retries=self.config.LLM_MAX_RETRIES,
+            base_delay=self.config.LLM_RETRY_BASE_DELAY_MS / 1000,
+            max_delay=self.config.LLM_RETRY_MAX_DELAY_MS / 1000,
+        )
+
+    def create(self, provider: str):
+        if provider in self.providers:
+            return self.providers[provider]
+
+        client = None
+        if provider == LLMEnums.OPENAI.value:
+            client = OpenAIProvider(
+                api_key=get_secret(self.config.OPENAI_API_KEY),
+                api_url=self.config.OPENAI_API_URL,
+                limiter=self.create_rate_limiter(
+                    requests_per_minute=self.config.OPENAI_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=self.config.OPENAI_TOKENS_PER_MINUTE,
+                    max_concurrent_requests=self.config.OPENAI_MAX_CONCURRENT_REQUESTS,
+                ),
+                max_connections=self.config.LLM_MAX_CONNECTIONS,
+                timeout=self.config.LLM_REQUEST_TIMEOUT,
+            )
+
+        if provider == LLMEnums.COHERE.value:
+            client = CoHereProvider(
+                api_key=get_secret(self.config.COHERE_API_KEY),
+                limiter=self.create_rate_limiter(
+                    requests_per_minute=self.config.COHERE_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=self.config.COHERE_TOKENS_PER_MINUTE,
+                    max_concurrent_requests=self.config.COHERE_MAX_CONCURRENT_REQUESTS,
+                ),
+                max_connections=self.config.LLM_MAX_CONNECTIONS,
+                timeout=self.config.LLM_REQUEST_TIMEOUT,
+            )
+
+        if provider == LLMEnums.LOCAL.value:
+            client = LocalProvider()
+
+        if client is not None:
+            self.providers[provider] = client
+
+        return client
+
+    async def close(self):
+        for provider in self.providers.values():
+            await provider.close()
+        self.providers = {}
+
+    def create_embedding_client(self):
+        provider = self.create(provider=self.config.EMBEDDING_BACKEND)
+        if provider is None:
+            raise ValueError(f"Unknown embedding backend: {self.config.EMBEDDING_BACKEND}")
+
+        disk_cache = None
+        if self.config.EMBEDDING_CACHE_PATH:
+            disk_cache = EmbeddingCache(path=self.config.EMBEDDING_CACHE_PATH)
+
+        return EmbeddingClient(
+            provider=provider,
+            backend=self.config.EMBEDDING_BACKEND,
+            model_id=self.config.EMBEDDING_MODEL_ID,
+            embedding_size=self.config.EMBEDDING_MODEL_SIZE,
+            batch_size=self.config.EMBEDDING_BATCH_SIZE,
+            max_wait=self.config.EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+            max_concurrent_requests=self.config.EMBEDDING_MAX_CONCURRENT_REQUESTS,
+            memory_cache_size=self.config.EMBEDDING_MEMORY_CACHE_SIZE,
+            disk_cache=disk_cache,
+        )
+
+    def create_inference_scheduler(self):
+        provider = self.create(provider=self.config.GENERATION_BACKEND)
+        if provider is None:
+            raise ValueError(f"Unknown generation backend: {self.config.GENERATION_BACKEND}")
+
+        return InferenceScheduler(
+            provider=provider,
+            backend=self.config.GENERATION_BACKEND,
+            model_id=self.config.GENERATION_MODEL_ID,
+            batch_size=self.config.GENERATION_BATCH_SIZE,
+            max_wait=self.config.GENERATION_BATCH_MAX_WAIT_MS / 1000,
+            max_concurrent_batches=self.config.GENERATION_MAX_CONCURRENT_BATCHES,
+            max_queue_size=self.config.GENERATION_QUEUE_SIZE,
+        )
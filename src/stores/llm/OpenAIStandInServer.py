@@ -0,0 +1,170 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from .providers import LocalProvider
+from collections import deque
+import argparse
+import asyncio
+import base64
+import json
+import random
+import struct
+import time
+import uuid
+
+# OpenAI-compatible stand-in for the tests and the load runs, without keys nor costs:
+#   python -m stores.llm.OpenAIStandInServer --port 8001 --latency-ms 200 --error-rate 0.05 --requests-per-minute 600
+# and OPENAI_API_URL="http://localhost:8001/v1" in the .env (GENERATION_BACKEND / EMBEDDING_BACKEND = "OPENAI").
+# the answers are the ones of the LOCAL backend (hashed embeddings, smallest JSON valid for the schema),
+# the server answers 429 with a Retry-After past its rate limit, and injects 429 / 500 at `error_rate`.
+
+def create_app(latency: float = 0.0, token_latency: float = 0.0, error_rate: float = 0.0,
+               requests_per_minute: int = 0, embedding_size: int = 1536) -> FastAPI:
+    app = FastAPI(title="OpenAI stand-in")
+    provider = LocalProvider()
+    recent_requests = deque()
+
+    def error_response(status_code: int, message: str, retry_after: float = None):
+        headers = {"retry-after": f"{retry_after:.3f}"} if retry_after is not None else None
+        return JSONResponse(
+            status_code=status_code,
+            content={"error": {"message": message, "type": "stand_in_error", "code": str(status_code)}},
+            headers=headers,
+        )
+
+    def get_error():
+        # the rate limit of the "account": at most `requests_per_minute` in the last 60 seconds
+        now = time.monotonic()
+        while recent_requests and recent_requests[0] <= now - 60:
+            recent_requests.popleft()
+        if requests_per_minute and len(recent_requests) >= requests_per_minute:
+            return error_response(429, "Rate limit reached", retry_after=recent_requests[0] + 60 - now)
+        recent_requests.append(now)
+
+        if error_rate and random.random() < error_rate:
+            if random.random() < 0.5:
+                return error_response(429, "Injected rate limit", retry_after=0.1)
+            return error_response(500, "Injected server error")
+        return None
+
+    def get_usage(prompt_tokens: int, completion_tokens: int = 0):
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        error = get_error()
+        if error is not None:
+            return error
+
+        body = await request.json()
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        provider.set_embedding_model(model_id=body["model"], embedding_size=body.get("dimensions") or embedding_size)
+
+        if latency:
+            await asyncio.sleep(latency)
+
+        vectors = await provider.embed_texts(texts=texts, document_type=None)
+        if body.get("encoding_format") == "base64":
+            # the sdk asks for base64 float32 by default
+            vectors = [base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode() for vector in vectors]
+
+        return {
+            "object": "list",
+            "model": body["model"],
+            "data": [{"object": "embedding", "index": index, "embedding": vector} for index, vector in enumerate(vectors)],
+            "usage": get_usage(prompt_tokens=provider.estimate_tokens(texts)),
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        error = get_error()
+        if error is not None:
+            return error
+
+        body = await request.json()
+        messages = body["messages"]
+        max_output_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 1024
+
+        json_schema = None
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            json_schema = response_format["json_schema"]["schema"]
+
+        tokens = provider.get_answers(prompts=[messages], max_output_tokens=max_output_tokens,
+                                      json_schema=json_schema)[0]
+        usage = get_usage(prompt_tokens=provider.estimate_tokens([str(message.get("content")) for message in messages]),
+                          completion_tokens=len(tokens))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        finish_reason = "length" if len(tokens) >= max_output_tokens else "stop"
+
+        if latency:
+            await asyncio.sleep(latency)
+
+        if not body.get("stream"):
+            if token_latency:
+                await asyncio.sleep(token_latency * len(tokens))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            }
+
+        def format_chunk(delta: dict, finish_reason: str = None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        async def chunks():
+            yield format_chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                if token_latency:
+                    await asyncio.sleep(token_latency)
+                yield format_chunk({"content": token})
+            yield format_chunk({}, finish_reason=finish_reason)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every request")
+    parser.add_argument("--token-latency-ms", type=float, default=0, help="added per generated token")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of the requests failing with 429 / 500")
+    parser.add_argument("--requests-per-minute", type=int, default=0, help="429 past this rate (0 = no limit)")
+    parser.add_argument("--embedding-size", type=int, default=1536)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(
+        create_app(
+            latency=args.latency_ms / 1000,
+            token_latency=args.token_latency_ms / 1000,
+            error_rate=args.error_rate,
+            requests_per_minute=args.requests_per_minute,
+            embedding_size=args.embedding_size,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
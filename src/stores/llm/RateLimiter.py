@@ -0,0 +1,159 @@
+from typing import AsyncIterator, Awaitable, Callable, Optional
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+class TokenBucket:
+    """`rate` units per second, bursts up to `capacity`; the waiters are served in arrival order"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.available = capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float):
+        # a request bigger than the whole bucket would wait forever: it takes the full bucket instead
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self.refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+
+async def start_stream(stream: AsyncIterator) -> AsyncIterator:
+    """Wait for the first item of a lazy stream: its http errors are raised here, where they can be retried"""
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = None
+        stream_ended = True
+    else:
+        stream_ended = False
+
+    async def chained():
+        try:
+            if stream_ended:
+                return
+            yield first
+            async for item in stream:
+                yield item
+        finally:
+            await stream.aclose()
+
+    return chained()
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    # only the delay in seconds form, the http date form falls back to the backoff
+    try:
+        return float(headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Limits of one backend account, shared by every call of the worker to that backend
+
+    a call waits for a request and for its estimated tokens in the per-minute buckets, then for one of
+    the `max_concurrent_requests` slots. a 429, a 5xx or a connection error is retried up to
+    `max_retries` times with an exponential backoff and full jitter (the Retry-After of a 429 wins,
+    and holds back all the calls of the backend, not only the one that got it).
+    0 disables a limit.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0, max_concurrent_requests: int = 0,
+                 max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30):
+        self.request_bucket = TokenBucket(requests_per_minute / 60, requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests) if max_concurrent_requests else None
+
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.resume_at = 0.0
+
+    async def wait_for_capacity(self, tokens: int):
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket is not None and tokens:
+            await self.token_bucket.acquire(tokens)
+
+    def get_retry_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            self.resume_at = max(self.resume_at, time.monotonic() + retry_after)
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(self, func: Callable[[], Awaitable], tokens: int,
+                   get_retry: Callable[[Exception], tuple]):
+        """Run `func` within the limits; `get_retry(error)` -> (retryable, retry after in seconds or None)"""
+        attempt = 0
+        while True:
+            await self.wait_for_capacity(tokens)
+            try:
+                if self.semaphore is None:
+                    return await func()
+                async with self.semaphore:
+                    return await func()
+            except Exception as e:
+                retryable, retry_after = get_retry(e)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = self.get_retry_delay(attempt, retry_after)
+            logger.warning(f"LLM backend call failed ({error.__class__.__name__}), retry {attempt + 1} in {delay:.2f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def stream(self, open_stream: Callable[[], Awaitable[AsyncIterator]], tokens: int,
+                     get_retry: Callable[[Exception], tuple]) -> AsyncIterator:
+        """Same as `call` for a streamed answer: the slot is held until the stream ends,
+        only the opening of the stream is retried (the caller may already have the first tokens after)"""
+        attempt = 0
+        while True:
+            await self.wait_for_capacity(tokens)
+            if self.semaphore is not None:
+                await self.semaphore.acquire()
+            try:
+                try:
+                    iterator = await open_stream()
+                except Exception as e:
+                    retryable, retry_after = get_retry(e)
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+                    error = e
+                else:
+                    try:
+                        async for item in iterator:
+                            yield item
+                        return
+                    finally:
+                        # the http response goes back to the pool as soon as the caller stops reading
+                        close = getattr(iterator, "aclose", None) or getattr(iterator, "close", None)
+                        if close is not None:
+                            await close()
+            finally:
+                if self.semaphore is not None:
+                    self.semaphore.release()
+
+            delay = self.get_retry_delay(attempt, retry_after)
+            logger.warning(f"LLM backend stream failed ({error.__class__.__name__}), retry {attempt + 1} in {delay:.2f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,4 @@
+from .LLMEnums import LLMEnums, DocumentTypeEnum
+from .LLMProviderFactory import LLMProviderFactory
+from .EmbeddingClient import EmbeddingClient
+from .InferenceScheduler import InferenceScheduler, InferenceQueueFullError
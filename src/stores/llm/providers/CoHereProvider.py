@@ -0,0 +1,151 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import CoHereEnums, DocumentTypeEnum
+from ..RateLimiter import RateLimiter, start_stream
+import cohere
+from cohere.core.api_error import ApiError
+from cohere.types import Message_User, Message_Chatbot
+from typing import List, Optional
+import asyncio
+import logging
+import httpx
+
+class CoHereProvider(LLMInterface):
+    """CoHere through one long-lived pooled client per worker, the calls go through the RateLimiter"""
+
+    def __init__(self, api_key: str, limiter: RateLimiter = None, max_connections: int = 100, timeout: float = 60):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+        self.client = cohere.AsyncClient(api_key=api_key, timeout=timeout, httpx_client=self.http_client)
+        self.limiter = limiter or RateLimiter()
+
+        self.embedding_model_id = None
+        self.embedding_size = None
+        self.generation_model_id = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def get_retry(self, error: Exception):
+        if isinstance(error, httpx.TransportError):
+            return True, None
+        # the sdk errors do not carry the response headers: no Retry-After, the backoff applies
+        if isinstance(error, ApiError) and error.status_code is not None and \
+                (error.status_code == 429 or error.status_code >= 500):
+            return True, None
+        return False, None
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+
+    async def embed_texts(self, texts: List[str], document_type: str) -> List[List[float]]:
+        if not self.embedding_model_id:
+            raise ValueError("Embedding model for CoHere was not set")
+
+        input_type = CoHereEnums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = CoHereEnums.QUERY.value
+
+        response = await self.limiter.call(
+            lambda: self.client.embed(
+                model=self.embedding_model_id,
+                texts=texts,
+                input_type=input_type,
+                embedding_types=["float"],
+            ),
+            tokens=self.estimate_tokens(texts),
+            get_retry=self.get_retry,
+        )
+
+        if not response or not response.embeddings or not response.embeddings.float:
+            raise ValueError("Error while embedding texts with CoHere")
+
+        return response.embeddings.float
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def get_chat_arguments(self, prompt: List[dict]) -> dict:
+        # cohere chat: system messages -> preamble, the last user message -> message, the rest -> history
+        preamble = "\n\n".join(message["content"] for message in prompt if message["role"] == "system")
+        messages = [message for message in prompt if message["role"] != "system"]
+        if not messages:
+            raise ValueError("The prompt has no user message")
+
+        chat_history = [
+            Message_User(message=message["content"]) if message["role"] == "user"
+            else Message_Chatbot(message=message["content"])
+            for message in messages[:-1]
+        ]
+
+        return {
+            "model": self.generation_model_id,
+            "message": messages[-1]["content"],
+            "preamble": preamble or None,
+            "chat_history": chat_history or None,
+        }
+
+    async def generate_text(self, prompt: List[dict], max_output_tokens: int, temperature: float) -> str:
+        response = await self.limiter.call(
+            lambda: self.client.chat(
+                **self.get_chat_arguments(prompt=prompt),
+                max_tokens=max_output_tokens,
+                temperature=temperature,
+            ),
+            tokens=self.estimate_tokens([message["content"] for message in prompt]) + max_output_tokens,
+            get_retry=self.get_retry,
+        )
+
+        if not response or response.text is None:
+            raise ValueError("Error while generating text with CoHere")
+
+        return response.text
+
+    async def generate_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                             json_schema: Optional[dict] = None) -> List[str]:
+        if not self.generation_model_id:
+            raise ValueError("Generation model for CoHere was not set")
+
+        # no json mode on this api version: the schema is only enforced through the prompt
+        # one request per prompt: a failed prompt only fails its own caller
+        return await asyncio.gather(*[
+            self.generate_text(prompt=prompt, max_output_tokens=max_output_tokens, temperature=temperature)
+            for prompt in prompts
+        ], return_exceptions=True)
+
+    async def stream_text(self, prompt: List[dict], max_output_tokens: int, temperature: float):
+        stream = self.limiter.stream(
+            # chat_stream only sends the request on its first item
+            lambda: start_stream(self.client.chat_stream(
+                **self.get_chat_arguments(prompt=prompt),
+                max_tokens=max_output_tokens,
+                temperature=temperature,
+            )),
+            tokens=self.estimate_tokens([message["content"] for message in prompt]) + max_output_tokens,
+            get_retry=self.get_retry,
+        )
+        try:
+            async for event in stream:
+                if event.event_type == "text-generation" and event.text:
+                    yield event.text
+        finally:
+            await stream.aclose()
+
+    async def stream_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                           json_schema: Optional[dict] = None):
+        if not self.generation_model_id:
+            raise ValueError("Generation model for CoHere was not set")
+
+        merged = self.merge_text_streams([
+            self.stream_text(prompt=prompt, max_output_tokens=max_output_tokens, temperature=temperature)
+            for prompt in prompts
+        ])
+        try:
+            async for index, delta in merged:
+                yield index, delta
+        finally:
+            await merged.aclose()
+
+    async def close(self):
+        await self.http_client.aclose()
@@ -0,0 +1,144 @@
+from ..LLMInterface import LLMInterface
+from typing import List, Optional
+import numpy as np
+import hashlib
+import asyncio
+import json
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+class LocalProvider(LLMInterface):
+    """Deterministic offline stand-in for the embedding and generation APIs (tests, local runs without keys)
+
+    embeddings: every word is hashed to a signed dimension (feature hashing) and the vector is L2-normalized:
+    the same text always gets the same vector and texts sharing words get close vectors.
+
+    generation: a fake CPU model with the cost profile of a batched decoder. every decoding step multiplies
+    the hidden states of the whole batch by one weight matrix, so a step costs about the same for 1 or 16
+    prompts (the weights are read once) and batching pays off like on a GPU. the answer is the smallest
+    JSON document valid for `json_schema`, or an echo of the last message.
+    """
+
+    HIDDEN_SIZE = 1024
+    CHARACTERS_PER_TOKEN = 4
+
+    def __init__(self):
+        self.embedding_model_id = None
+        self.embedding_size = None
+        self.generation_model_id = None
+        self.weights = None
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+
+    def embed_text(self, text: str) -> List[float]:
+        vector = [0.0] * self.embedding_size
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.embedding_size] += 1.0 if (value >> 63) else -1.0
+
+        norm = math.sqrt(sum(component * component for component in vector))
+        if norm == 0:
+            return vector
+        return [component / norm for component in vector]
+
+    async def embed_texts(self, texts: List[str], document_type: str) -> List[List[float]]:
+        if not self.embedding_size:
+            raise ValueError("Embedding size for the local provider was not set")
+
+        return [self.embed_text(text) for text in texts]
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def get_weights(self):
+        if self.weights is None:
+            rng = np.random.default_rng(0)
+            self.weights = rng.standard_normal((self.HIDDEN_SIZE, self.HIDDEN_SIZE), dtype=np.float32)
+            self.weights /= math.sqrt(self.HIDDEN_SIZE)
+        return self.weights
+
+    def decode_step(self, hidden: np.ndarray, active: np.ndarray):
+        hidden[active] = np.tanh(hidden[active] @ self.get_weights())
+
+    def decode(self, output_tokens: List[int]):
+        # one step per generated token, the finished sequences leave the batch
+        hidden = np.ones((len(output_tokens), self.HIDDEN_SIZE), dtype=np.float32)
+        remaining = np.array(output_tokens)
+        for _ in range(max(output_tokens, default=0)):
+            self.decode_step(hidden, remaining > 0)
+            remaining -= 1
+
+    def get_schema_instance(self, schema: dict, definitions: dict):
+        if "$ref" in schema:
+            return self.get_schema_instance(definitions[schema["$ref"].split("/")[-1]], definitions)
+        if "anyOf" in schema:
+            return self.get_schema_instance(schema["anyOf"][0], definitions)
+        if "enum" in schema:
+            return schema["enum"][0]
+        if "const" in schema:
+            return schema["const"]
+
+        schema_type = schema.get("type")
+        if schema_type == "object":
+            return {
+                name: self.get_schema_instance(property_schema, definitions)
+                for name, property_schema in schema.get("properties", {}).items()
+                if name in schema.get("required", [])
+            }
+        if schema_type == "array":
+            return []
+        if schema_type in ("integer", "number"):
+            return schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        if schema_type == "boolean":
+            return False
+        if schema_type == "null":
+            return None
+        return ""
+
+    def get_answer(self, prompt: List[dict], max_output_tokens: int, json_schema: Optional[dict]) -> str:
+        if json_schema:
+            return json.dumps(self.get_schema_instance(json_schema, json_schema.get("$defs", {})))
+
+        content = prompt[-1]["content"] if prompt else ""
+        if not isinstance(content, str):
+            return ""
+        return content[:max_output_tokens * self.CHARACTERS_PER_TOKEN]
+
+    async def generate_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                             json_schema: Optional[dict] = None) -> List[str]:
+        answers = self.get_answers(prompts=prompts, max_output_tokens=max_output_tokens, json_schema=json_schema)
+
+        # numpy releases the GIL: the event loop keeps serving while the batch "runs"
+        await asyncio.to_thread(self.decode, [len(tokens) for tokens in answers])
+
+        return ["".join(tokens) for tokens in answers]
+
+    def get_answers(self, prompts: List[List[dict]], max_output_tokens: int,
+                    json_schema: Optional[dict]) -> List[List[str]]:
+        # the answers cut in fake tokens of CHARACTERS_PER_TOKEN characters, within the token budget
+        answers = []
+        for prompt in prompts:
+            answer = self.get_answer(prompt=prompt, max_output_tokens=max_output_tokens, json_schema=json_schema)
+            answers.append([
+                answer[start:start + self.CHARACTERS_PER_TOKEN]
+                for start in range(0, len(answer), self.CHARACTERS_PER_TOKEN)
+            ][:max_output_tokens])
+        return answers
+
+    async def stream_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                           json_schema: Optional[dict] = None):
+        answers = self.get_answers(prompts=prompts, max_output_tokens=max_output_tokens, json_schema=json_schema)
+
+        hidden = np.ones((len(answers), self.HIDDEN_SIZE), dtype=np.float32)
+        remaining = np.array([len(tokens) for tokens in answers])
+        for step in range(max(remaining, default=0)):
+            active = remaining > 0
+            await asyncio.to_thread(self.decode_step, hidden, active)
+            remaining -= 1
+            for index in np.flatnonzero(active):
+                yield int(index), answers[index][step]
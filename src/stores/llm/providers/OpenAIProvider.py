@@ -0,0 +1,145 @@
+from ..LLMInterface import LLMInterface
+from ..RateLimiter import RateLimiter, parse_retry_after
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from typing import List, Optional
+import asyncio
+import logging
+import httpx
+
+class OpenAIProvider(LLMInterface):
+    """OpenAI (or any OpenAI-compatible server at `api_url`) through one long-lived client per worker
+
+    the httpx pool keeps its connections alive between the requests, the RateLimiter holds the
+    calls within the account limits and retries them: the SDK retries are disabled.
+    """
+
+    def __init__(self, api_key: str, api_url: str = None, limiter: RateLimiter = None,
+                 max_connections: int = 100, timeout: float = 60):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+        self.client = AsyncOpenAI(api_key=api_key, base_url=api_url or None,
+                                  http_client=self.http_client, max_retries=0)
+        self.limiter = limiter or RateLimiter()
+
+        self.embedding_model_id = None
+        self.embedding_size = None
+        self.generation_model_id = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def get_retry(self, error: Exception):
+        if isinstance(error, APIConnectionError):        # timeouts included
+            return True, None
+        if isinstance(error, APIStatusError) and (error.status_code == 429 or error.status_code >= 500):
+            return True, parse_retry_after(error.response.headers)
+        return False, None
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+
+    async def embed_texts(self, texts: List[str], document_type: str) -> List[List[float]]:
+        if not self.embedding_model_id:
+            raise ValueError("Embedding model for OpenAI was not set")
+
+        response = await self.limiter.call(
+            lambda: self.client.embeddings.create(
+                model=self.embedding_model_id,
+                input=texts,
+            ),
+            tokens=self.estimate_tokens(texts),
+            get_retry=self.get_retry,
+        )
+
+        if not response or not response.data or len(response.data) != len(texts):
+            raise ValueError("Error while embedding texts with OpenAI")
+
+        # the api keeps the input order, `index` makes it explicit
+        return [record.embedding for record in sorted(response.data, key=lambda record: record.index)]
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def get_response_format(self, json_schema: Optional[dict]):
+        if not json_schema:
+            return None
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": json_schema.get("title", "response"), "schema": json_schema},
+        }
+
+    async def generate_text(self, prompt: List[dict], max_output_tokens: int, temperature: float,
+                            json_schema: Optional[dict] = None) -> str:
+        response = await self.limiter.call(
+            lambda: self.client.chat.completions.create(
+                model=self.generation_model_id,
+                messages=prompt,
+                max_tokens=max_output_tokens,
+                temperature=temperature,
+                response_format=self.get_response_format(json_schema),
+            ),
+            # the providers count max_tokens against the per-minute budget, not the tokens really produced
+            tokens=self.estimate_tokens([message["content"] for message in prompt]) + max_output_tokens,
+            get_retry=self.get_retry,
+        )
+
+        if not response or not response.choices or response.choices[0].message.content is None:
+            raise ValueError("Error while generating text with OpenAI")
+
+        return response.choices[0].message.content
+
+    async def generate_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                             json_schema: Optional[dict] = None) -> List[str]:
+        if not self.generation_model_id:
+            raise ValueError("Generation model for OpenAI was not set")
+
+        # the chat api takes one conversation per request: the batch is sent as concurrent requests,
+        # a failed prompt (context length, refusal) only fails its own caller
+        return await asyncio.gather(*[
+            self.generate_text(prompt=prompt, max_output_tokens=max_output_tokens,
+                               temperature=temperature, json_schema=json_schema)
+            for prompt in prompts
+        ], return_exceptions=True)
+
+    async def stream_text(self, prompt: List[dict], max_output_tokens: int, temperature: float,
+                          json_schema: Optional[dict] = None):
+        stream = self.limiter.stream(
+            lambda: self.client.chat.completions.create(
+                model=self.generation_model_id,
+                messages=prompt,
+                max_tokens=max_output_tokens,
+                temperature=temperature,
+                response_format=self.get_response_format(json_schema),
+                stream=True,
+            ),
+            tokens=self.estimate_tokens([message["content"] for message in prompt]) + max_output_tokens,
+            get_retry=self.get_retry,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # leaving the loop does not close the limiter stream: its connection and its slot are freed here
+            await stream.aclose()
+
+    async def stream_texts(self, prompts: List[List[dict]], max_output_tokens: int, temperature: float,
+                           json_schema: Optional[dict] = None):
+        if not self.generation_model_id:
+            raise ValueError("Generation model for OpenAI was not set")
+
+        merged = self.merge_text_streams([
+            self.stream_text(prompt=prompt, max_output_tokens=max_output_tokens,
+                             temperature=temperature, json_schema=json_schema)
+            for prompt in prompts
+        ])
+        try:
+            async for index, delta in merged:
+                yield index, delta
+        finally:
+            await merged.aclose()
+
+    async def close(self):
+        await self.client.close()
@@ -0,0 +1,3 @@
+from .OpenAIProvider import OpenAIProvider
+from .CoHereProvider import CoHereProvider
+from .LocalProvider import LocalProvider
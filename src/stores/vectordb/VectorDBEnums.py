@@ -0,0 +1,27 @@
+from enum import Enum
+
+class VectorDBEnums(Enum):
+
+    QDRANT = "QDRANT"
+    PGVECTOR = "PGVECTOR"
+    NUMPY = "NUMPY"
+
+class DistanceMethodEnums(Enum):
+
+    COSINE = "cosine"
+    DOT = "dot"
+
+class PgVectorDistanceMethodEnums(Enum):
+
+    COSINE = "vector_cosine_ops"
+    DOT = "vector_ip_ops"
+
+class PgVectorOperatorEnums(Enum):
+
+    COSINE = "<=>"      # cosine distance
+    DOT = "<#>"         # negative inner product
+
+class NumpyDTypeEnums(Enum):
+
+    FLOAT32 = "float32"
+    INT8 = "int8"
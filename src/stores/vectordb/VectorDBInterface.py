@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from models.db_schemes import VectorRecord, RetrievedDocument
+from typing import List
+
+class VectorDBInterface(ABC):
+
+    @abstractmethod
+    async def connect(self):
+        pass
+
+    @abstractmethod
+    async def disconnect(self):
+        pass
+
+    @abstractmethod
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
+        pass
+
+    @abstractmethod
+    async def delete_collection(self, collection_name: str):
+        pass
+
+    @abstractmethod
+    async def insert_many(self, collection_name: str, records: List[VectorRecord]):
+        """Upsert the records in batches (a record with an existing id replaces it)"""
+        pass
+
+    @abstractmethod
+    async def delete_by_metadata(self, collection_name: str, field: str, values: List[str]):
+        """Delete the records whose metadata[field] is one of `values`"""
+        pass
+
+    @abstractmethod
+    async def search_by_vector(self, collection_name: str, vector: List[float], limit: int) -> List[RetrievedDocument]:
+        pass
+
+    @abstractmethod
+    async def search_by_vector_per_group(self, collection_name: str, vector: List[float], group_field: str,
+                                         group_size: int) -> List[RetrievedDocument]:
+        """The best `group_size` records of every distinct metadata[group_field], best first
+
+        exact: every record of the collection is scored, no group is missed by an approximate index
+        """
+        pass
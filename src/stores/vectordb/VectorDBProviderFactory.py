@@ -0,0 +1,40 @@
+from .VectorDBEnums import VectorDBEnums
+from .providers import QdrantDBProvider, PGVectorProvider, NumpyDBProvider
+from helpers.config import get_secret
+from urllib.parse import quote
+
+class VectorDBProviderFactory:
+
+    def __init__(self, config: object):
+        self.config = config
+
+    def create(self, provider: str):
+        if provider == VectorDBEnums.QDRANT.value:
+            return QdrantDBProvider(
+                db_path=self.config.VECTOR_DB_PATH,
+                db_url=self.config.VECTOR_DB_URL,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                batch_size=self.config.VECTOR_DB_BATCH_SIZE,
+            )
+
+        if provider == VectorDBEnums.PGVECTOR.value:
+            dsn = (
+                f"postgresql://{quote(self.config.POSTGRES_USERNAME)}:{quote(get_secret(self.config.POSTGRES_PASSWORD))}"
+                f"@{self.config.POSTGRES_HOST}:{self.config.POSTGRES_PORT}/{self.config.POSTGRES_MAIN_DATABASE}"
+            )
+            return PGVectorProvider(
+                dsn=dsn,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                batch_size=self.config.VECTOR_DB_BATCH_SIZE,
+                pool_size=self.config.VECTOR_DB_POOL_SIZE,
+            )
+
+        if provider == VectorDBEnums.NUMPY.value:
+            return NumpyDBProvider(
+                db_path=self.config.VECTOR_DB_PATH,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                dtype=self.config.VECTOR_DB_NUMPY_DTYPE,
+            )
+
+        return None
@@ -0,0 +1,3 @@
+from .VectorDBEnums import VectorDBEnums, DistanceMethodEnums
+from .VectorDBProviderFactory import VectorDBProviderFactory
+from .VectorDBInterface import VectorDBInterface
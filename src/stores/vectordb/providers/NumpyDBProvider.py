@@ -0,0 +1,423 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums, NumpyDTypeEnums
+from models.db_schemes import VectorRecord, RetrievedDocument
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+import threading
+import asyncio
+import logging
+import shutil
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:     # windows: a single worker, the thread lock is enough
+    fcntl = None
+
+# rows scored per matrix product: bounds the temporaries of a search over millions of rows.
+# the int8 blocks are converted to float32 before the product: small blocks keep that copy in the cpu cache
+SEARCH_BLOCK_ROWS = 262144
+INT8_SEARCH_BLOCK_ROWS = 8192
+
+
+@dataclass(frozen=True)
+class NumpySnapshot:
+    """The memory maps of the first `rows` committed rows, never modified once built
+
+    a search takes the current snapshot once and reads only from it: a refresh by a concurrent
+    search swaps in a new snapshot without touching the arrays the others are reading.
+    """
+    rows: int = 0
+    vectors: Optional[np.ndarray] = None
+    scales: Optional[np.ndarray] = None
+    deleted: Optional[np.ndarray] = None
+    offsets: Optional[np.ndarray] = None
+
+
+class NumpyCollection:
+    """One collection = one folder of append-only files, memory-mapped by every worker
+
+    vectors.bin   float32 (or int8) rows, normalized at write time for the cosine distance
+    scales.bin    float32 scale of every int8 row
+    deleted.bin   one byte per row, set when a newer version of the same id is appended
+    records.jsonl id / text / metadata of every row
+    offsets.bin   int64 start of every row in records.jsonl, written last: its size is the committed row count
+
+    the files are shared through the page cache: the four uvicorn workers map the same pages,
+    and a search only re-maps the files when another worker appended rows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+        with open(self.get_file("meta.json"), "r") as f:
+            meta = json.load(f)
+
+        self.embedding_size = meta["embedding_size"]
+        self.dtype = meta["dtype"]
+        self.normalize = meta["distance_method"] == DistanceMethodEnums.COSINE.value
+        self.meta_inode = os.stat(self.get_file("meta.json")).st_ino
+
+        self.snapshot = NumpySnapshot()
+        self.snapshot_lock = threading.Lock()
+
+        # id -> row, only built by the workers that write
+        self.id_rows = None
+        self.scanned_rows = 0
+
+        # metadata field -> (group code of every scanned row, group value -> code), built by the searches per group
+        self.group_codes = {}
+        self.groups_lock = threading.Lock()
+
+    def get_file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def is_stale(self) -> bool:
+        # the collection was deleted or re-created by another worker
+        try:
+            return os.stat(self.get_file("meta.json")).st_ino != self.meta_inode
+        except FileNotFoundError:
+            return True
+
+    def get_committed_rows(self) -> int:
+        try:
+            return os.path.getsize(self.get_file("offsets.bin")) // 8
+        except FileNotFoundError:
+            return 0
+
+    def refresh(self) -> NumpySnapshot:
+        with self.snapshot_lock:
+            rows = self.get_committed_rows()
+            if rows == self.snapshot.rows:
+                return self.snapshot
+
+            if rows == 0:
+                self.snapshot = NumpySnapshot()
+                return self.snapshot
+
+            scales = None
+            if self.dtype == NumpyDTypeEnums.INT8.value:
+                scales = np.memmap(self.get_file("scales.bin"), dtype=np.float32, mode="r", shape=(rows,))
+
+            self.snapshot = NumpySnapshot(
+                rows=rows,
+                vectors=np.memmap(self.get_file("vectors.bin"), dtype=self.dtype, mode="r",
+                                  shape=(rows, self.embedding_size)),
+                scales=scales,
+                deleted=np.memmap(self.get_file("deleted.bin"), dtype=np.uint8, mode="r", shape=(rows,)),
+                offsets=np.memmap(self.get_file("offsets.bin"), dtype=np.int64, mode="r", shape=(rows,)),
+            )
+            return self.snapshot
+
+    # --------------writes ---------------------------------:
+    def encode(self, vectors: np.ndarray):
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+        if self.dtype == NumpyDTypeEnums.INT8.value:
+            # symmetric per-row quantization: 4x smaller, the scores keep their order almost everywhere
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales = np.where(scales == 0, 1, scales).astype(np.float32)
+            codes = np.round(vectors / scales[:, None]).astype(np.int8)
+            return codes, scales
+
+        return vectors.astype(np.float32), None
+
+    def scan_ids(self, rows: int):
+        # rows appended since the last scan, by this worker or another one
+        if self.id_rows is None:
+            self.id_rows = {}
+            self.scanned_rows = 0
+        if self.scanned_rows >= rows:
+            return
+
+        offsets = np.fromfile(self.get_file("offsets.bin"), dtype=np.int64,
+                              count=rows - self.scanned_rows, offset=self.scanned_rows * 8)
+        with open(self.get_file("records.jsonl"), "rb") as f:
+            for row, offset in enumerate(offsets, start=self.scanned_rows):
+                f.seek(int(offset))
+                self.id_rows[json.loads(f.readline())["id"]] = row
+        self.scanned_rows = rows
+
+    def append(self, records: List[VectorRecord]):
+        # the last version of an id inside the batch wins
+        records = list({record.id: record for record in records}.values())
+        if not records:
+            return 0
+
+        vectors, scales = self.encode(np.asarray([record.vector for record in records], dtype=np.float32))
+        row_bytes = self.embedding_size * np.dtype(self.dtype).itemsize
+
+        with self.lock, open(self.get_file(".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            rows = self.get_committed_rows()
+            self.scan_ids(rows)
+
+            # a writer that died between two files left extra bytes: cut them to the committed rows
+            sizes = {"vectors.bin": rows * row_bytes, "deleted.bin": rows}
+            if scales is not None:
+                sizes["scales.bin"] = rows * 4
+            for name, size in sizes.items():
+                with open(self.get_file(name), "ab") as f:
+                    if f.tell() != size:
+                        f.truncate(size)
+
+            superseded = [self.id_rows[record.id] for record in records if record.id in self.id_rows]
+            if superseded:
+                fd = os.open(self.get_file("deleted.bin"), os.O_WRONLY)
+                try:
+                    for row in superseded:
+                        os.pwrite(fd, b"\x01", row)
+                finally:
+                    os.close(fd)
+
+            with open(self.get_file("vectors.bin"), "ab") as f:
+                f.write(vectors.tobytes())
+            if scales is not None:
+                with open(self.get_file("scales.bin"), "ab") as f:
+                    f.write(scales.tobytes())
+            with open(self.get_file("deleted.bin"), "ab") as f:
+                f.write(bytes(len(records)))
+
+            offsets = []
+            with open(self.get_file("records.jsonl"), "ab") as f:
+                position = f.tell()
+                for record in records:
+                    line = json.dumps({"id": record.id, "text": record.text, "metadata": record.metadata}).encode("utf-8")
+                    offsets.append(position)
+                    f.write(line + b"\n")
+                    position += len(line) + 1
+
+            # commit point: the rows become visible to the searches of every worker
+            with open(self.get_file("offsets.bin"), "ab") as f:
+                f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+
+            for row, record in enumerate(records, start=rows):
+                self.id_rows[record.id] = row
+            self.scanned_rows = rows + len(records)
+
+        return len(records)
+
+    def delete_groups(self, field: str, values: List[str]):
+        # the rows are only flagged in deleted.bin, like the superseded ones
+        with self.lock, open(self.get_file(".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            snapshot = self.refresh()
+            if snapshot.rows == 0:
+                return 0
+
+            codes = self.scan_groups(snapshot, field)
+            with self.groups_lock:
+                keys = self.group_codes[field][1]
+                wanted = [keys[value] for value in values if value in keys]
+
+            rows = np.flatnonzero(np.isin(codes, wanted) & (snapshot.deleted == 0))
+            if len(rows):
+                fd = os.open(self.get_file("deleted.bin"), os.O_WRONLY)
+                try:
+                    for row in rows:
+                        os.pwrite(fd, b"\x01", int(row))
+                finally:
+                    os.close(fd)
+
+        return len(rows)
+
+    # --------------search ---------------------------------:
+    def get_query(self, vector: List[float]) -> np.ndarray:
+        query = np.asarray(vector, dtype=np.float32)
+        if self.normalize:
+            norm = np.linalg.norm(query)
+            query = query / (norm if norm else 1)
+        return query
+
+    def get_block_rows(self, snapshot: NumpySnapshot) -> int:
+        return SEARCH_BLOCK_ROWS if snapshot.scales is None else INT8_SEARCH_BLOCK_ROWS
+
+    def score_block(self, snapshot: NumpySnapshot, query: np.ndarray, start: int, end: int) -> np.ndarray:
+        block = snapshot.vectors[start:end]
+        if snapshot.scales is not None:
+            scores = (block.astype(np.float32) @ query) * snapshot.scales[start:end]
+        else:
+            scores = block @ query
+        scores[snapshot.deleted[start:end] == 1] = -np.inf
+        return scores
+
+    def search(self, snapshot: NumpySnapshot, vector: List[float], limit: int):
+        if snapshot.rows == 0 or limit <= 0:
+            return []
+
+        query = self.get_query(vector)
+        block_rows = self.get_block_rows(snapshot)
+
+        candidate_scores = []
+        candidate_rows = []
+        for start in range(0, snapshot.rows, block_rows):
+            end = min(start + block_rows, snapshot.rows)
+            scores = self.score_block(snapshot, query, start, end)
+
+            # top-k of the block without sorting it: argpartition is linear
+            k = min(limit, end - start)
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidate_scores.append(scores[top])
+            candidate_rows.append(top + start)
+
+        scores = np.concatenate(candidate_scores)
+        rows = np.concatenate(candidate_rows)
+        order = np.argsort(-scores)[:limit]
+
+        return [(int(rows[i]), float(scores[i])) for i in order if np.isfinite(scores[i])]
+
+    def scan_groups(self, snapshot: NumpySnapshot, field: str) -> np.ndarray:
+        # only the rows appended since the last search per group are read from records.jsonl
+        rows = snapshot.rows
+        with self.groups_lock:
+            codes, keys = self.group_codes.setdefault(field, ([], {}))
+            if len(codes) < rows:
+                with open(self.get_file("records.jsonl"), "rb") as f:
+                    for offset in snapshot.offsets[len(codes):rows]:
+                        f.seek(int(offset))
+                        key = json.loads(f.readline())["metadata"].get(field)
+                        codes.append(keys.setdefault(key, len(keys)))
+            return np.asarray(codes[:rows], dtype=np.int64)
+
+    def search_groups(self, snapshot: NumpySnapshot, vector: List[float], field: str, group_size: int):
+        if snapshot.rows == 0 or group_size <= 0:
+            return []
+
+        query = self.get_query(vector)
+        block_rows = self.get_block_rows(snapshot)
+        scores = np.concatenate([
+            self.score_block(snapshot, query, start, min(start + block_rows, snapshot.rows))
+            for start in range(0, snapshot.rows, block_rows)
+        ])
+        codes = self.scan_groups(snapshot, field)
+
+        # rows sorted by group then best first: the rank of a row in its group is its distance to the group start
+        order = np.lexsort((-scores, codes))
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        ranks = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+        kept = order[(ranks < group_size) & np.isfinite(scores[order])]
+        kept = kept[np.argsort(-scores[kept], kind="stable")]
+        return [(int(row), float(scores[row])) for row in kept]
+
+    def read_records(self, snapshot: NumpySnapshot, rows: List[int]) -> List[dict]:
+        records = []
+        with open(self.get_file("records.jsonl"), "rb") as f:
+            for row in rows:
+                f.seek(int(snapshot.offsets[row]))
+                records.append(json.loads(f.readline()))
+        return records
+
+    def get_documents(self, snapshot: NumpySnapshot, results: list) -> List[RetrievedDocument]:
+        if not results:
+            return []   # records.jsonl does not exist before the first insert
+
+        records = self.read_records(snapshot, [row for row, _ in results])
+        return [
+            RetrievedDocument(id=record["id"], text=record["text"], score=score, metadata=record["metadata"])
+            for record, (_, score) in zip(records, results)
+        ]
+
+    def search_documents(self, vector: List[float], limit: int) -> List[RetrievedDocument]:
+        snapshot = self.refresh()
+        return self.get_documents(snapshot, self.search(snapshot, vector=vector, limit=limit))
+
+    def search_group_documents(self, vector: List[float], field: str, group_size: int) -> List[RetrievedDocument]:
+        snapshot = self.refresh()
+        return self.get_documents(snapshot, self.search_groups(snapshot, vector=vector, field=field,
+                                                               group_size=group_size))
+
+
+class NumpyDBProvider(VectorDBInterface):
+    """In-process vector index: no external service, one memory-mapped matrix per collection"""
+
+    def __init__(self, db_path: str, distance_method: str, dtype: str = NumpyDTypeEnums.FLOAT32.value):
+        self.db_path = db_path
+        self.distance_method = distance_method or DistanceMethodEnums.COSINE.value
+        self.dtype = dtype
+        self.collections = {}
+
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self):
+        os.makedirs(self.db_path, exist_ok=True)
+
+    async def disconnect(self):
+        self.collections.clear()
+
+    def get_collection_path(self, collection_name: str) -> str:
+        return os.path.join(self.db_path, collection_name)
+
+    def get_collection(self, collection_name: str) -> NumpyCollection:
+        collection = self.collections.get(collection_name)
+        if collection is None or collection.is_stale():
+            collection = NumpyCollection(path=self.get_collection_path(collection_name))
+            self.collections[collection_name] = collection
+        return collection
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self.get_collection_path(collection_name), "meta.json"))
+
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
+        if do_reset:
+            await self.delete_collection(collection_name=collection_name)
+
+        if await self.is_collection_existed(collection_name):
+            return False
+
+        self.logger.info(f"Creating new Numpy collection: {collection_name}")
+        path = self.get_collection_path(collection_name)
+        os.makedirs(path, exist_ok=True)
+
+        # written to a temporary name then renamed: the other workers never read a half written meta.json
+        meta_path = os.path.join(path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({
+                "embedding_size": embedding_size,
+                "dtype": self.dtype,
+                "distance_method": self.distance_method,
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+        return True
+
+    async def delete_collection(self, collection_name: str):
+        self.collections.pop(collection_name, None)
+        path = self.get_collection_path(collection_name)
+        if os.path.exists(path):
+            self.logger.info(f"Deleting Numpy collection: {collection_name}")
+            await asyncio.to_thread(shutil.rmtree, path, True)
+
+    async def insert_many(self, collection_name: str, records: List[VectorRecord]):
+        collection = self.get_collection(collection_name)
+        return await asyncio.to_thread(collection.append, records)
+
+    async def delete_by_metadata(self, collection_name: str, field: str, values: List[str]):
+        if not values or not await self.is_collection_existed(collection_name):
+            return 0
+        collection = self.get_collection(collection_name)
+        return await asyncio.to_thread(collection.delete_groups, field, values)
+
+    async def search_by_vector(self, collection_name: str, vector: List[float], limit: int) -> List[RetrievedDocument]:
+        if not await self.is_collection_existed(collection_name):
+            return []
+        collection = self.get_collection(collection_name)
+        # numpy releases the GIL in the matrix product: the event loop keeps serving requests
+        return await asyncio.to_thread(collection.search_documents, vector, limit)
+
+    async def search_by_vector_per_group(self, collection_name: str, vector: List[float], group_field: str,
+                                         group_size: int) -> List[RetrievedDocument]:
+        if not await self.is_collection_existed(collection_name):
+            return []
+        collection = self.get_collection(collection_name)
+        return await asyncio.to_thread(collection.search_group_documents, vector, group_field, group_size)
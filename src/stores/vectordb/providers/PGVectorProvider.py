@@ -0,0 +1,247 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums, PgVectorDistanceMethodEnums, PgVectorOperatorEnums
+from models.db_schemes import VectorRecord, RetrievedDocument
+from pgvector.asyncpg import register_vector
+from typing import List
+import asyncpg
+import asyncio
+import logging
+import json
+
+class PGVectorProvider(VectorDBInterface):
+    """One table per collection, written with COPY and searched with pgvector
+
+    the records of a batch are COPYed into a temporary table and merged with one INSERT ... ON CONFLICT.
+    a collection is created without vector index: an exact scan is cheaper to write and fast enough
+    for a small project. once the table passes `index_threshold` rows, an HNSW index is built
+    (CONCURRENTLY, in the background) and the searches become sublinear.
+    """
+
+    def __init__(self, dsn: str, distance_method: str, index_threshold: int = 100,
+                 batch_size: int = 500, pool_size: int = 10):
+        self.dsn = dsn
+        self.pool = None
+        self.index_threshold = index_threshold
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+
+        self.distance_ops = PgVectorDistanceMethodEnums.COSINE.value
+        self.distance_operator = PgVectorOperatorEnums.COSINE.value
+        if distance_method == DistanceMethodEnums.DOT.value:
+            self.distance_ops = PgVectorDistanceMethodEnums.DOT.value
+            self.distance_operator = PgVectorOperatorEnums.DOT.value
+
+        self.indexed_collections = set()
+        self.index_tasks = {}
+        self.metadata_indexes = set()
+
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self):
+        # min_size=0: the connections are opened on first use, the API starts even if postgres is not up yet
+        self.pool = await asyncpg.create_pool(
+            dsn=self.dsn,
+            min_size=0,
+            max_size=self.pool_size,
+            init=self.init_connection,
+        )
+
+    async def init_connection(self, connection):
+        await connection.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        await register_vector(connection)
+
+    async def disconnect(self):
+        for task in list(self.index_tasks.values()):
+            task.cancel()
+        if self.pool is not None:
+            await self.pool.close()
+        self.pool = None
+
+    def quote(self, name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def quote_literal(self, value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
+    def get_index_name(self, collection_name: str) -> str:
+        # postgres cuts the identifiers at 63 bytes
+        return f"{collection_name[:50]}_hnsw_idx"
+
+    def get_metadata_index_name(self, collection_name: str, field: str) -> str:
+        return f"{collection_name[:40]}_{field[:12]}_idx"
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        async with self.pool.acquire() as connection:
+            return await connection.fetchval("SELECT to_regclass($1) IS NOT NULL", self.quote(collection_name))
+
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
+        if do_reset:
+            await self.delete_collection(collection_name=collection_name)
+
+        if await self.is_collection_existed(collection_name):
+            return False
+
+        self.logger.info(f"Creating new PGVector collection: {collection_name}")
+        async with self.pool.acquire() as connection:
+            await connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.quote(collection_name)} ("
+                f" id TEXT PRIMARY KEY,"
+                f" text TEXT NOT NULL,"
+                f" vector vector({int(embedding_size)}) NOT NULL,"
+                f" metadata JSONB NOT NULL DEFAULT '{{}}'::jsonb,"
+                f" created_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+                f")"
+            )
+        return True
+
+    async def delete_collection(self, collection_name: str):
+        self.logger.info(f"Deleting PGVector collection: {collection_name}")
+        async with self.pool.acquire() as connection:
+            await connection.execute(f"DROP TABLE IF EXISTS {self.quote(collection_name)}")
+        self.indexed_collections.discard(collection_name)
+        self.metadata_indexes = {key for key in self.metadata_indexes if key[0] != collection_name}
+
+    async def insert_many(self, collection_name: str, records: List[VectorRecord]):
+        table = self.quote(collection_name)
+
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+
+            async with self.pool.acquire() as connection:
+                async with connection.transaction():
+                    await connection.execute(
+                        f"CREATE TEMP TABLE vector_staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    await connection.copy_records_to_table(
+                        "vector_staging",
+                        records=[
+                            (record.id, record.text, record.vector, json.dumps(record.metadata))
+                            for record in batch
+                        ],
+                        columns=["id", "text", "vector", "metadata"],
+                    )
+                    await connection.execute(
+                        f"INSERT INTO {table} (id, text, vector, metadata) "
+                        f"SELECT DISTINCT ON (id) id, text, vector, metadata FROM vector_staging "
+                        f"ON CONFLICT (id) DO UPDATE SET "
+                        f"text = EXCLUDED.text, vector = EXCLUDED.vector, metadata = EXCLUDED.metadata"
+                    )
+
+        self.schedule_index_check(collection_name)
+
+        return len(records)
+
+    async def delete_by_metadata(self, collection_name: str, field: str, values: List[str]):
+        if not values:
+            return 0
+
+        table = self.quote(collection_name)
+        # the field is inlined: a query on metadata->>'field' can use the expression index, a parameter can not
+        expression = f"(metadata->>{self.quote_literal(field)})"
+
+        async with self.pool.acquire() as connection:
+            if (collection_name, field) not in self.metadata_indexes:
+                await connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.quote(self.get_metadata_index_name(collection_name, field))} "
+                    f"ON {table} ({expression})"
+                )
+                self.metadata_indexes.add((collection_name, field))
+
+            result = await connection.execute(f"DELETE FROM {table} WHERE {expression} = ANY($1::text[])", values)
+
+        # "DELETE <count>"
+        return int(result.split()[-1])
+
+    def schedule_index_check(self, collection_name: str):
+        if collection_name in self.indexed_collections or collection_name in self.index_tasks:
+            return
+
+        task = asyncio.create_task(self.create_index_if_needed(collection_name))
+        self.index_tasks[collection_name] = task
+        task.add_done_callback(lambda _: self.index_tasks.pop(collection_name, None))
+
+    async def create_index_if_needed(self, collection_name: str):
+        index_name = self.get_index_name(collection_name)
+
+        try:
+            async with self.pool.acquire() as connection:
+                is_valid = await connection.fetchval(
+                    "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = $1",
+                    index_name,
+                )
+                if is_valid:
+                    self.indexed_collections.add(collection_name)
+                    return
+
+                # counting is only done while the table is small, i.e. cheap
+                row_count = await connection.fetchval(f"SELECT count(*) FROM {self.quote(collection_name)}")
+                if row_count <= self.index_threshold:
+                    return
+
+                # one builder per collection across all the workers of all the hosts
+                locked = await connection.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", collection_name)
+                if not locked:
+                    return
+
+                try:
+                    if is_valid is False:
+                        # left behind by an interrupted CREATE INDEX CONCURRENTLY
+                        await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.quote(index_name)}")
+
+                    self.logger.info(f"Creating HNSW index on {collection_name} ({row_count} rows)")
+                    await connection.execute(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.quote(index_name)} "
+                        f"ON {self.quote(collection_name)} USING hnsw (vector {self.distance_ops})"
+                    )
+                    self.indexed_collections.add(collection_name)
+                finally:
+                    await connection.execute("SELECT pg_advisory_unlock(hashtext($1))", collection_name)
+
+        except Exception as e:
+            self.logger.error(f"Error while creating the vector index of {collection_name}: {e}")
+
+    async def search_by_vector(self, collection_name: str, vector: List[float], limit: int) -> List[RetrievedDocument]:
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"SELECT id, text, metadata, vector {self.distance_operator} $1 AS distance "
+                f"FROM {self.quote(collection_name)} ORDER BY vector {self.distance_operator} $1 LIMIT $2",
+                vector,
+                limit,
+            )
+
+        return self.get_documents(rows)
+
+    async def search_by_vector_per_group(self, collection_name: str, vector: List[float], group_field: str,
+                                         group_size: int) -> List[RetrievedDocument]:
+        # the window over the whole table is an exact scan: the HNSW index is not used
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"SELECT id, text, metadata, distance FROM ("
+                f" SELECT id, text, metadata, vector {self.distance_operator} $1 AS distance,"
+                f" row_number() OVER (PARTITION BY metadata->>($2::text)"
+                f" ORDER BY vector {self.distance_operator} $1) AS rank"
+                f" FROM {self.quote(collection_name)}"
+                f") ranked WHERE rank <= $3 ORDER BY distance",
+                vector,
+                group_field,
+                group_size,
+            )
+
+        return self.get_documents(rows)
+
+    def get_documents(self, rows: list) -> List[RetrievedDocument]:
+        # a higher score is a better match for both distances
+        if self.distance_operator == PgVectorOperatorEnums.COSINE.value:
+            to_score = lambda distance: 1 - distance
+        else:
+            to_score = lambda distance: -distance
+
+        return [
+            RetrievedDocument(
+                id=row["id"],
+                text=row["text"],
+                score=to_score(row["distance"]),
+                metadata=json.loads(row["metadata"]),
+            )
+            for row in rows
+        ]
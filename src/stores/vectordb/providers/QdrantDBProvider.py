@@ -0,0 +1,153 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums
+from models.db_schemes import VectorRecord, RetrievedDocument
+from qdrant_client import AsyncQdrantClient, models
+from collections import defaultdict
+from typing import List
+import numpy as np
+import logging
+import heapq
+import uuid
+
+class QdrantDBProvider(VectorDBInterface):
+
+    def __init__(self, db_path: str, distance_method: str, batch_size: int = 500, db_url: str = None):
+        self.client = None
+        self.db_path = db_path
+        self.db_url = db_url
+        self.batch_size = batch_size
+
+        self.distance_method = models.Distance.COSINE
+        if distance_method == DistanceMethodEnums.DOT.value:
+            self.distance_method = models.Distance.DOT
+
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self):
+        # a qdrant server is needed as soon as several uvicorn workers write: the local mode locks its folder
+        if self.db_url:
+            self.client = AsyncQdrantClient(url=self.db_url)
+        else:
+            self.client = AsyncQdrantClient(path=self.db_path)
+
+    async def disconnect(self):
+        if self.client is not None:
+            await self.client.close()
+        self.client = None
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        return await self.client.collection_exists(collection_name=collection_name)
+
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
+        if do_reset:
+            await self.delete_collection(collection_name=collection_name)
+
+        if not await self.is_collection_existed(collection_name):
+            self.logger.info(f"Creating new Qdrant collection: {collection_name}")
+            await self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(size=embedding_size, distance=self.distance_method),
+            )
+            return True
+
+        return False
+
+    async def delete_collection(self, collection_name: str):
+        if await self.is_collection_existed(collection_name):
+            self.logger.info(f"Deleting Qdrant collection: {collection_name}")
+            await self.client.delete_collection(collection_name=collection_name)
+
+    def get_point_id(self, record_id: str) -> str:
+        # qdrant only takes integers and uuids as point ids: a stable uuid derived from the record id
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, record_id))
+
+    async def insert_many(self, collection_name: str, records: List[VectorRecord]):
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+            await self.client.upsert(
+                collection_name=collection_name,
+                points=models.Batch(
+                    ids=[self.get_point_id(record.id) for record in batch],
+                    vectors=[record.vector for record in batch],
+                    payloads=[
+                        {"record_id": record.id, "text": record.text, "metadata": record.metadata}
+                        for record in batch
+                    ],
+                ),
+                wait=True,
+            )
+
+        return len(records)
+
+    async def delete_by_metadata(self, collection_name: str, field: str, values: List[str]):
+        if not values:
+            return
+        await self.client.delete(
+            collection_name=collection_name,
+            points_selector=models.FilterSelector(filter=models.Filter(must=[
+                models.FieldCondition(key=f"metadata.{field}", match=models.MatchAny(any=values)),
+            ])),
+            wait=True,
+        )
+
+    async def search_by_vector(self, collection_name: str, vector: List[float], limit: int) -> List[RetrievedDocument]:
+        results = await self.client.search(
+            collection_name=collection_name,
+            query_vector=vector,
+            limit=limit,
+        )
+
+        return [
+            RetrievedDocument(
+                id=result.payload["record_id"],
+                text=result.payload["text"],
+                score=result.score,
+                metadata=result.payload.get("metadata") or {},
+            )
+            for result in results
+        ]
+
+    async def search_by_vector_per_group(self, collection_name: str, vector: List[float], group_field: str,
+                                         group_size: int) -> List[RetrievedDocument]:
+        if group_size <= 0:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        if self.distance_method == models.Distance.COSINE:
+            # qdrant stores the cosine vectors normalized: the dot product with a normalized query is the score
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        # the points are scrolled with their vectors and scored here: exact, no group is missed by the HNSW search.
+        # each group keeps a min-heap of its best points: the memory is bounded by groups * group_size
+        best = defaultdict(list)
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                scores = np.asarray([point.vector for point in points], dtype=np.float32) @ query
+                for point, score in zip(points, scores):
+                    heap = best[(point.payload.get("metadata") or {}).get(group_field)]
+                    item = (float(score), point.payload["record_id"], point.payload)
+                    if len(heap) < group_size:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+            if offset is None:
+                break
+
+        items = sorted((item for heap in best.values() for item in heap), reverse=True)
+        return [
+            RetrievedDocument(
+                id=record_id,
+                text=payload["text"],
+                score=score,
+                metadata=payload.get("metadata") or {},
+            )
+            for score, record_id, payload in items
+        ]
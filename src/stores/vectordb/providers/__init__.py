@@ -0,0 +1,3 @@
+from .QdrantDBProvider import QdrantDBProvider
+from .PGVectorProvider import PGVectorProvider
+from .NumpyDBProvider import NumpyDBProvider
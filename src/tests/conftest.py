@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules import each other from src/ (`from stores.llm import ...`), like in main.py and worker.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
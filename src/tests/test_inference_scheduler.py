@@ -0,0 +1,141 @@
+from stores.llm import InferenceScheduler, InferenceQueueFullError
+from stores.llm.providers import LocalProvider
+import asyncio
+import pytest
+import time
+
+
+class RecordingProvider(LocalProvider):
+    """LocalProvider that keeps the size of every batch it received, and fails the prompts saying "fail" """
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def generate_texts(self, prompts, max_output_tokens, temperature, json_schema=None):
+        self.batches.append(len(prompts))
+        answers = await super().generate_texts(prompts=prompts, max_output_tokens=max_output_tokens,
+                                               temperature=temperature, json_schema=json_schema)
+        return [
+            ValueError("refused") if prompt[-1]["content"] == "fail" else answer
+            for prompt, answer in zip(prompts, answers)
+        ]
+
+
+def get_prompt(content: str):
+    return [{"role": "user", "content": content}]
+
+
+def get_scheduler(**kwargs):
+    provider = RecordingProvider()
+    return provider, InferenceScheduler(provider=provider, backend="LOCAL", model_id="local", **kwargs)
+
+
+def test_full_batch_leaves_without_waiting_for_the_deadline():
+    async def run():
+        provider, scheduler = get_scheduler(batch_size=4, max_wait=10)
+        started = time.monotonic()
+        answers = await asyncio.gather(*[
+            scheduler.generate(prompt=get_prompt(f"prompt {index}"), max_output_tokens=16, temperature=0)
+            for index in range(8)
+        ])
+        elapsed = time.monotonic() - started
+        await scheduler.close()
+        return provider, answers, elapsed
+
+    provider, answers, elapsed = asyncio.run(run())
+
+    assert provider.batches == [4, 4]
+    assert elapsed < 5
+    # every caller gets the answer of its own prompt (the local model echoes it)
+    assert answers == [f"prompt {index}" for index in range(8)]
+
+
+def test_partial_batch_leaves_at_the_deadline():
+    async def run():
+        provider, scheduler = get_scheduler(batch_size=8, max_wait=0.2)
+        started = time.monotonic()
+        answers = await asyncio.gather(*[
+            scheduler.generate(prompt=get_prompt(f"prompt {index}"), max_output_tokens=16, temperature=0)
+            for index in range(3)
+        ])
+        elapsed = time.monotonic() - started
+        await scheduler.close()
+        return provider, answers, elapsed
+
+    provider, answers, elapsed = asyncio.run(run())
+
+    assert provider.batches == [3]
+    assert elapsed >= 0.2
+    assert answers == ["prompt 0", "prompt 1", "prompt 2"]
+
+
+def test_prompts_with_other_parameters_are_not_batched_together():
+    async def run():
+        provider, scheduler = get_scheduler(batch_size=8, max_wait=0.05)
+        answers = await asyncio.gather(
+            scheduler.generate(prompt=get_prompt("cold"), max_output_tokens=16, temperature=0),
+            scheduler.generate(prompt=get_prompt("warm"), max_output_tokens=16, temperature=0.7),
+            scheduler.generate(prompt=get_prompt("cold again"), max_output_tokens=16, temperature=0),
+        )
+        await scheduler.close()
+        return provider, answers
+
+    provider, answers = asyncio.run(run())
+
+    assert sorted(provider.batches) == [1, 2]
+    assert answers == ["cold", "warm", "cold again"]
+
+
+def test_failed_prompt_only_fails_its_own_caller():
+    async def run():
+        provider, scheduler = get_scheduler(batch_size=3, max_wait=1)
+        results = await asyncio.gather(*[
+            scheduler.generate(prompt=get_prompt(content), max_output_tokens=16, temperature=0)
+            for content in ["first", "fail", "third"]
+        ], return_exceptions=True)
+        await scheduler.close()
+        return provider, results
+
+    provider, results = asyncio.run(run())
+
+    assert provider.batches == [3]
+    assert results[0] == "first"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "third"
+
+
+def test_streamed_prompts_get_their_own_deltas():
+    async def read(scheduler, content):
+        deltas = []
+        async for delta in scheduler.stream(prompt=get_prompt(content), max_output_tokens=64, temperature=0):
+            deltas.append(delta)
+        return "".join(deltas)
+
+    async def run():
+        _, scheduler = get_scheduler(batch_size=2, max_wait=1)
+        answers = await asyncio.gather(read(scheduler, "a short answer"), read(scheduler, "a much longer answer than the other"))
+        await scheduler.close()
+        return answers
+
+    assert asyncio.run(run()) == ["a short answer", "a much longer answer than the other"]
+
+
+def test_full_queue_is_refused():
+    async def run():
+        _, scheduler = get_scheduler(batch_size=8, max_wait=10, max_queue_size=2)
+        waiting = [
+            asyncio.create_task(scheduler.generate(prompt=get_prompt("queued"), max_output_tokens=16, temperature=0))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(InferenceQueueFullError):
+                await scheduler.generate(prompt=get_prompt("one too many"), max_output_tokens=16, temperature=0)
+        finally:
+            for task in waiting:
+                task.cancel()
+            await asyncio.gather(*waiting, return_exceptions=True)
+            await scheduler.close()
+
+    asyncio.run(run())
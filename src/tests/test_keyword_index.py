@@ -0,0 +1,20 @@
+from utils.keyword_index import tokenize, count_terms
+
+
+def test_slash_separated_skills_are_split():
+    tokens = tokenize("Python/SQL, SQL/NoSQL, docker/kubernetes")
+
+    for skill in ["python", "sql", "nosql", "docker", "kubernetes"]:
+        assert skill in tokens
+    assert count_terms(["Python/SQL, SQL/NoSQL"])["sql"] == 2
+
+
+def test_slash_terms_are_also_kept_whole():
+    tokens = tokenize("CI/CD pipelines")
+
+    assert "ci/cd" in tokens
+    assert "ci" in tokens and "cd" in tokens
+
+
+def test_symbols_and_accents():
+    assert tokenize("C++, C#, Node.js et Compétences") == ["c++", "c#", "node.js", "et", "competences"]
@@ -0,0 +1,156 @@
+from stores.llm.OpenAIStandInServer import create_app
+from stores.llm.RateLimiter import RateLimiter
+from stores.llm.providers import OpenAIProvider
+from fastapi.responses import JSONResponse
+from openai import AsyncOpenAI, BadRequestError, InternalServerError, RateLimitError
+import asyncio
+import httpx
+import pytest
+import time
+
+
+class FlakyApp:
+    """The stand-in server behind a list of errors answered first: (status code, Retry-After or None)"""
+
+    def __init__(self, errors: list, **kwargs):
+        self.app = create_app(**kwargs)
+        self.errors = list(errors)
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        self.requests += 1
+        if self.errors:
+            status_code, retry_after = self.errors.pop(0)
+            headers = {"retry-after": str(retry_after)} if retry_after is not None else None
+            response = JSONResponse(status_code=status_code, headers=headers,
+                                    content={"error": {"message": "injected", "type": "test", "code": str(status_code)}})
+            return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
+
+
+def get_provider(app, limiter: RateLimiter) -> OpenAIProvider:
+    provider = OpenAIProvider(api_key="test", limiter=limiter)
+    # the requests go straight to the ASGI app, no socket
+    provider.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    provider.client = AsyncOpenAI(api_key="test", base_url="http://stand-in/v1",
+                                  http_client=provider.http_client, max_retries=0)
+    provider.set_generation_model(model_id="stand-in")
+    provider.set_embedding_model(model_id="stand-in", embedding_size=8)
+    return provider
+
+
+def generate(provider: OpenAIProvider, content: str = "hello"):
+    async def run():
+        try:
+            return await provider.generate_text(prompt=[{"role": "user", "content": content}],
+                                                max_output_tokens=16, temperature=0)
+        finally:
+            await provider.close()
+
+    return asyncio.run(run())
+
+
+def test_rate_limited_call_waits_for_retry_after():
+    app = FlakyApp(errors=[(429, 0.3)])
+    limiter = RateLimiter(max_retries=3, base_delay=10)
+    provider = get_provider(app, limiter)
+
+    started = time.monotonic()
+    assert generate(provider) == "hello"
+
+    # the Retry-After wins over the (long) backoff
+    assert 0.3 <= time.monotonic() - started < 5
+    assert app.requests == 2
+
+
+def test_server_errors_are_retried_with_backoff():
+    app = FlakyApp(errors=[(500, None), (503, None)])
+    provider = get_provider(app, RateLimiter(max_retries=3, base_delay=0.01))
+
+    assert generate(provider) == "hello"
+    assert app.requests == 3
+
+
+def test_client_errors_are_not_retried():
+    app = FlakyApp(errors=[(400, None)])
+    provider = get_provider(app, RateLimiter(max_retries=3, base_delay=0.01))
+
+    with pytest.raises(BadRequestError):
+        generate(provider)
+    assert app.requests == 1
+
+
+def test_retries_stop_after_max_retries():
+    app = FlakyApp(errors=[(500, None)] * 3)
+    provider = get_provider(app, RateLimiter(max_retries=2, base_delay=0.01))
+
+    with pytest.raises(InternalServerError):
+        generate(provider)
+    assert app.requests == 3
+
+
+def test_retry_after_holds_back_the_other_calls():
+    app = FlakyApp(errors=[(429, 0.3)])
+    limiter = RateLimiter(max_retries=3, base_delay=0.01)
+    provider = get_provider(app, limiter)
+
+    async def run():
+        try:
+            first = asyncio.create_task(provider.generate_text(prompt=[{"role": "user", "content": "first"}],
+                                                               max_output_tokens=16, temperature=0))
+            while not limiter.resume_at:
+                await asyncio.sleep(0.01)
+
+            # the 429 was for the account: a call made after it waits for the end of the Retry-After too
+            started = time.monotonic()
+            second = await provider.generate_text(prompt=[{"role": "user", "content": "second"}],
+                                                  max_output_tokens=16, temperature=0)
+            return await first, second, time.monotonic() - started
+        finally:
+            await provider.close()
+
+    first, second, elapsed = asyncio.run(run())
+    assert (first, second) == ("first", "second")
+    assert elapsed >= 0.2
+    assert app.requests == 3
+
+
+def test_rate_limit_of_the_stand_in_sends_retry_after():
+    # one request per minute: the second one gets a 429 with the time left in the window
+    app = create_app(requests_per_minute=1)
+    provider = get_provider(app, RateLimiter(max_retries=0))
+
+    async def run():
+        try:
+            await provider.embed_texts(texts=["first"], document_type="document")
+            with pytest.raises(RateLimitError) as error:
+                await provider.embed_texts(texts=["second"], document_type="document")
+            return provider.get_retry(error.value)
+        finally:
+            await provider.close()
+
+    retryable, retry_after = asyncio.run(run())
+    assert retryable
+    assert 55 < retry_after <= 60
+
+
+def test_stream_opening_is_retried():
+    app = FlakyApp(errors=[(429, 0.05), (500, None)])
+    provider = get_provider(app, RateLimiter(max_retries=3, base_delay=0.01))
+
+    async def run():
+        deltas = []
+        try:
+            async for delta in provider.stream_text(prompt=[{"role": "user", "content": "streamed answer"}],
+                                                    max_output_tokens=16, temperature=0):
+                deltas.append(delta)
+        finally:
+            await provider.close()
+        return "".join(deltas)
+
+    assert asyncio.run(run()) == "streamed answer"
+    assert app.requests == 3
@@ -0,0 +1,21 @@
+from utils.text_chunking import iter_text_chunks
+
+
+TEXT = ("  Built data pipelines with Airflow and Spark for the finance team.   "
+        "Migrated the warehouse to BigQuery and cut the costs by half.\n  Led a team of four engineers.  ")
+
+
+def test_offsets_point_at_the_stripped_text():
+    chunks = list(iter_text_chunks([(1, TEXT)], max_characters=70, max_tokens=100, overlap_characters=30))
+
+    for chunk in chunks:
+        assert TEXT[chunk.chunk_start] == chunk.chunk_text[0]
+        assert TEXT[chunk.chunk_end - 1] == chunk.chunk_text[-1]
+
+
+def test_single_sentence_chunks_still_overlap():
+    chunks = list(iter_text_chunks([(1, TEXT)], max_characters=70, max_tokens=100, overlap_characters=30))
+
+    assert len(chunks) == 3
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.chunk_start < previous.chunk_end
@@ -0,0 +1,76 @@
+from collections import deque
+from typing import Any, Iterator, List, Tuple
+
+class AhoCorasick:
+    """Multi-pattern matcher: every pattern found in one left to right pass over the text
+
+    the cost of a search depends on the length of the text and the number of matches,
+    not on the number of patterns: thousands of skills and aliases cost the same as ten.
+    """
+
+    def __init__(self):
+        self.transitions = [{}]     # state -> {char: next state}
+        self.fail = [0]
+        self.outputs = [[]]         # state -> [(pattern length, value)] ending at this state
+        self.built = False
+
+    def add(self, pattern: str, value: Any):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(pattern), value))
+        self.built = False
+
+    def build(self):
+        # breadth first: the failure link of a state is the longest proper suffix that is also a prefix
+        queue = deque(self.transitions[0].values())
+        for state in queue:
+            self.fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+
+                fail_state = self.fail[state]
+                while fail_state and char not in self.transitions[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.transitions[fail_state].get(char, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+
+                # the matches of the suffix are matches too: merged once here, not followed at search time
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+        self.built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, value) of every pattern occurrence, overlapping ones included"""
+        if not self.built:
+            self.build()
+
+        transitions = self.transitions
+        fail = self.fail
+        outputs = self.outputs
+
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+
+            if outputs[state]:
+                for length, value in outputs[state]:
+                    yield index + 1 - length, index + 1, value
+
+    def __len__(self):
+        return len(self.transitions)
@@ -0,0 +1,83 @@
+from typing import Dict, Iterable, List
+from collections import Counter
+import numpy as np
+import unicodedata
+import re
+
+# keeps the skills written with symbols in one token: c++, c#, node.js, asp.net
+TOKEN_PATTERN = re.compile(r"[a-z0-9](?:[a-z0-9+#.]*[a-z0-9+#])?")
+# "a/b" terms: "python/sql" is two skills, "ci/cd" is one. both the whole term and its parts are tokens
+SLASH_TERM_PATTERN = re.compile(r"[a-z0-9+#.]+(?:/[a-z0-9+#.]+)+")
+
+# one posting = doc number, term frequency, document length: 8 bytes, decoded by numpy without a python loop
+POSTING_DTYPE = np.dtype([("doc", "<u4"), ("tf", "<u2"), ("dl", "<u2")])
+
+MAX_UINT16 = 65535
+
+
+def fold_text(text: str) -> str:
+    """Lowercase and accent free: "Compétences" and "competences" are the same text"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+def tokenize(text: str) -> List[str]:
+    text = fold_text(text)
+    tokens = TOKEN_PATTERN.findall(text)
+    for match in SLASH_TERM_PATTERN.finditer(text):
+        whole = "/".join(TOKEN_PATTERN.findall(match.group()))
+        if "/" in whole:
+            tokens.append(whole)
+    return tokens
+
+def count_terms(texts: Iterable[str]) -> Counter:
+    term_counts = Counter()
+    for text in texts:
+        term_counts.update(tokenize(text))
+    return term_counts
+
+# the postings appended by a write are single int64 values ($push), the compaction turns them into bytes
+def pack_posting(doc_no: int, tf: int, dl: int) -> int:
+    return (doc_no << 32) | (min(tf, MAX_UINT16) << 16) | min(dl, MAX_UINT16)
+
+def unpack_postings(values: List[int]) -> np.ndarray:
+    packed = np.asarray(values, dtype=np.int64)
+    postings = np.empty(len(packed), dtype=POSTING_DTYPE)
+    postings["doc"] = packed >> 32
+    postings["tf"] = (packed >> 16) & MAX_UINT16
+    postings["dl"] = packed & MAX_UINT16
+    return postings
+
+def decode_postings(data: bytes, tail: List[int]) -> np.ndarray:
+    postings = np.frombuffer(data or b"", dtype=POSTING_DTYPE)
+    if tail:
+        postings = np.concatenate([postings, unpack_postings(tail)])
+    return postings
+
+def encode_postings(postings: np.ndarray) -> bytes:
+    # sorted by doc number, one entry per doc (a document indexed twice keeps its last posting)
+    postings = postings[::-1]
+    _, first = np.unique(postings["doc"], return_index=True)
+    return np.sort(postings[first], order="doc").tobytes()
+
+def score_bm25(term_postings: Dict[str, np.ndarray], doc_count: int, average_length: float,
+               k1: float = 1.2, b: float = 0.75):
+    """Okapi BM25 over the postings of the query terms, returns (doc numbers, scores), unsorted"""
+    all_docs = []
+    all_scores = []
+    for postings in term_postings.values():
+        if len(postings) == 0:
+            continue
+        document_frequency = len(postings)
+        idf = np.log(1 + (doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        tf = postings["tf"].astype(np.float32)
+        dl = postings["dl"].astype(np.float32)
+        all_scores.append(idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / max(average_length, 1))))
+        all_docs.append(postings["doc"])
+
+    if not all_docs:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32)
+
+    docs, inverse = np.unique(np.concatenate(all_docs), return_inverse=True)
+    scores = np.bincount(inverse, weights=np.concatenate(all_scores))
+    return docs, scores
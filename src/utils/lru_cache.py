@@ -0,0 +1,46 @@
+from collections import OrderedDict
+import time
+
+class TTLLRUCache:
+    """Small in-process LRU cache with a time to live per entry
+
+    not thread safe: it is meant to be used from the event loop of one worker.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()     # key -> (expires_at, value), the oldest used entry first
+
+    def get(self, key, default=None):
+        item = self._items.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            return default
+
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._items.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,53 @@
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Tuple
+import asyncio
+import json
+
+# Server-Sent Events: the generation endpoints send every delta as soon as the model produces it.
+# the client disconnection cancels the response generator, the generation of the request stops with it.
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def sse_lines(events: AsyncIterator[Tuple[str, dict]], heartbeat_interval: float) -> AsyncIterator[str]:
+    """(event, data) -> SSE text, with a comment line every `heartbeat_interval` seconds of silence
+
+    the comment is sent at once too: the client gets its first byte before the request reaches the model,
+    and the proxies do not close a connection waiting in the inference queue
+    """
+    yield ": connected\n\n"
+
+    iterator = events.__aiter__()
+    next_event = None
+    try:
+        while True:
+            if next_event is None:
+                next_event = asyncio.ensure_future(iterator.__anext__())
+
+            done, _ = await asyncio.wait({next_event}, timeout=heartbeat_interval)
+            if not done:
+                yield ": heartbeat\n\n"
+                continue
+
+            task, next_event = next_event, None
+            try:
+                event, data = task.result()
+            except StopAsyncIteration:
+                return
+
+            yield format_sse(event=event, data=data)
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+            await asyncio.gather(next_event, return_exceptions=True)
+        await iterator.aclose()
+
+def sse_response(events: AsyncIterator[Tuple[str, dict]], heartbeat_interval: float = 15) -> StreamingResponse:
+    return StreamingResponse(
+        sse_lines(events=events, heartbeat_interval=heartbeat_interval),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",      # nginx: no proxy buffering of this response
+        }
+    )
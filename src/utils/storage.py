@@ -0,0 +1,32 @@
+import aiofiles.os
+import os
+
+# every filesystem call of the upload path goes through aiofiles (run in a thread), never on the event loop.
+# the directories already created by this worker are remembered: making sure a directory exists
+# costs one syscall the first time and none afterwards.
+_known_dirs = set()
+
+def get_sharded_dir(root_dir: str, key: str, levels: int = 2, width: int = 2):
+    """Fan out on the key prefix (ab/cd/...) so no directory holds more than a few thousand entries"""
+    return os.path.join(root_dir, *[key[i * width:(i + 1) * width] for i in range(levels)])
+
+async def ensure_dir(dir_path: str):
+    if dir_path not in _known_dirs:
+        await aiofiles.os.makedirs(dir_path, exist_ok=True)
+        _known_dirs.add(dir_path)
+    return dir_path
+
+async def path_exists(path: str):
+    return await aiofiles.os.path.exists(path)
+
+async def get_file_size(path: str):
+    return await aiofiles.os.path.getsize(path)
+
+async def replace_file(src_path: str, dst_path: str):
+    await aiofiles.os.replace(src_path, dst_path)
+
+async def remove_file(path: str):
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
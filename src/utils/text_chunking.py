@@ -0,0 +1,267 @@
+from models.enums.CvSectionEnum import CvSectionEnum
+from pydantic import BaseModel
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+import unicodedata
+import re
+
+# the chunker is fed page by page and yields every chunk as soon as it is full:
+# a batch of CVs goes through it one page at a time, the chunks are never all in memory.
+
+LINE_PATTERN = re.compile(r"[^\n]+")
+SENTENCE_PATTERN = re.compile(r"[^.!?;]+(?:[.!?;]+(?=\s|$)|$)|[.!?;]+")
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+BULLET_PATTERN = re.compile(r"^[\s\-–•▪●·*>\uf0b7\uf0a7]+")    # \uf0b7: the symbol font bullet of word exports
+
+# headings of english and french CVs, compared without accents, case and punctuation
+SECTION_HEADINGS = {
+    CvSectionEnum.SUMMARY: [
+        "summary", "profile", "professional summary", "about me", "objective", "career objective",
+        "profil", "resume", "a propos", "objectif", "objectif professionnel",
+    ],
+    CvSectionEnum.EXPERIENCE: [
+        "experience", "experiences", "work experience", "professional experience", "work history",
+        "employment", "employment history", "career history",
+        "experience professionnelle", "experiences professionnelles", "parcours professionnel",
+    ],
+    CvSectionEnum.EDUCATION: [
+        "education", "academic background", "qualifications", "studies",
+        "formation", "formations", "diplomes", "etudes", "cursus", "parcours academique",
+    ],
+    CvSectionEnum.SKILLS: [
+        "skills", "technical skills", "key skills", "core competencies", "competencies", "tools",
+        "competences", "competences techniques", "savoir faire", "outils", "informatique",
+    ],
+    CvSectionEnum.LANGUAGES: ["languages", "langues"],
+    CvSectionEnum.PROJECTS: ["projects", "personal projects", "projets", "projets personnels"],
+    CvSectionEnum.CERTIFICATIONS: ["certifications", "certificates", "certificats"],
+}
+
+HEADING_TO_SECTION = {
+    heading: section.value
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+MAX_HEADING_WORDS = 4
+
+
+class TextChunk(BaseModel):
+    chunk_text: str
+    chunk_order: int                    # 1-based position of the chunk in the document
+    chunk_section: str
+    chunk_page_start: int
+    chunk_page_end: int
+    chunk_start: int                    # offsets in the concatenated text of the pages
+    chunk_end: int
+    chunk_token_count: int
+
+
+def approximate_token_count(text: str) -> int:
+    # words and punctuation marks: close enough to a subword tokenizer for a budget
+    return len(TOKEN_PATTERN.findall(text))
+
+def normalize_heading(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+def detect_section(line: str) -> Tuple[Optional[str], int]:
+    """Return (section, offset of the content after the heading) when the line starts a CV section
+
+    "Skills: Python, SQL" is a heading followed by content, "Python developer" is not a heading.
+    """
+    head, separator, _ = line.partition(":")
+    normalized = normalize_heading(head)
+    if not normalized or len(normalized.split()) > MAX_HEADING_WORDS:
+        return None, 0
+
+    section = HEADING_TO_SECTION.get(normalized)
+    if section is None:
+        return None, 0
+
+    return section, len(head) + len(separator)
+
+_sentence_tokenizer = None
+
+def get_sentence_spans(text: str) -> Iterable[Tuple[int, int]]:
+    """Sentence boundaries of one line: nltk punkt when its data is installed, a regex otherwise"""
+    global _sentence_tokenizer
+    if _sentence_tokenizer is None:
+        try:
+            from nltk.tokenize.punkt import PunktTokenizer
+            _sentence_tokenizer = PunktTokenizer("english")
+        except (ImportError, LookupError):
+            _sentence_tokenizer = False
+
+    if _sentence_tokenizer:
+        return _sentence_tokenizer.span_tokenize(text)
+
+    return (match.span() for match in SENTENCE_PATTERN.finditer(text))
+
+
+class TextChunker:
+    """Overlapping, sentence-aware chunks under a character and a token budget
+
+    a chunk never mixes two sections: a heading closes the current chunk.
+    the last sentences of a chunk (up to `overlap_characters`) are repeated at the start of the next one,
+    or the last words of its last sentence when that sentence alone is longer (or is the whole chunk).
+    """
+
+    def __init__(self, max_characters: int, max_tokens: int, overlap_characters: int = 0,
+                 count_tokens: Callable[[str], int] = approximate_token_count):
+        self.max_characters = max_characters
+        self.max_tokens = max_tokens
+        self.overlap_characters = overlap_characters
+        self.count_tokens = count_tokens
+
+        self.section = CvSectionEnum.OTHER.value
+        self.offset = 0
+        self.order = 0
+
+        self.sentences = []             # (text, start, end, page_number, token_count)
+        self.characters = 0
+        self.tokens = 0
+        self.has_new_sentences = False  # False when the buffer only holds the overlap of the previous chunk
+
+    def feed(self, text: str, page_number: int) -> Iterator[TextChunk]:
+        for line_match in LINE_PATTERN.finditer(text):
+            line = line_match.group()
+            line_start = self.offset + line_match.start()
+
+            unbulleted = BULLET_PATTERN.sub("", line)
+            section, content_offset = detect_section(unbulleted)
+            if section is not None:
+                yield from self.flush()
+                self.section = section
+                content_offset += len(line) - len(unbulleted)
+                line = line[content_offset:]
+                line_start += content_offset
+
+            for start, end in get_sentence_spans(line):
+                span = line[start:end]
+                sentence = span.strip()
+                if sentence:
+                    # the offsets of the stripped text: chunk_start / chunk_end point at its first and last character
+                    sentence_start = line_start + start + len(span) - len(span.lstrip())
+                    yield from self.add_sentence(sentence, sentence_start, sentence_start + len(sentence), page_number)
+
+        self.offset += len(text)
+
+    def flush(self) -> Iterator[TextChunk]:
+        if self.has_new_sentences:
+            yield self.build_chunk()
+        self.reset([])
+
+    def add_sentence(self, sentence: str, start: int, end: int, page_number: int) -> Iterator[TextChunk]:
+        for piece, piece_start, piece_end in self.split_oversized(sentence, start, end):
+            token_count = self.count_tokens(piece)
+
+            if self.sentences and (
+                self.characters + 1 + len(piece) > self.max_characters
+                or self.tokens + token_count > self.max_tokens
+            ):
+                if self.has_new_sentences:
+                    yield self.build_chunk()
+                self.reset(self.get_overlap(extra_characters=len(piece), extra_tokens=token_count))
+
+            self.sentences.append((piece, piece_start, piece_end, page_number, token_count))
+            self.characters += len(piece) + (1 if len(self.sentences) > 1 else 0)
+            self.tokens += token_count
+            self.has_new_sentences = True
+
+    def split_oversized(self, sentence: str, start: int, end: int):
+        """A sentence above the budgets (a long skills list) is cut on word boundaries"""
+        if len(sentence) <= self.max_characters and self.count_tokens(sentence) <= self.max_tokens:
+            yield sentence, start, end
+            return
+
+        words = list(re.finditer(r"\S+", sentence))
+        piece_start = 0
+        piece_words = []
+        for word in words:
+            candidate = sentence[piece_start:word.end()] if piece_words else word.group()
+            if piece_words and (
+                len(candidate) > self.max_characters or self.count_tokens(candidate) > self.max_tokens
+            ):
+                last_end = piece_words[-1].end()
+                yield sentence[piece_start:last_end], start + piece_start, start + last_end
+                piece_words = []
+
+            if not piece_words:
+                piece_start = word.start()
+            piece_words.append(word)
+
+        if piece_words:
+            last_end = piece_words[-1].end()
+            yield sentence[piece_start:last_end], start + piece_start, start + last_end
+
+    def get_overlap(self, extra_characters: int, extra_tokens: int) -> List[tuple]:
+        # the overlap must leave room for the sentence that did not fit, and never be the whole chunk
+        overlap = []
+        characters = 0
+        tokens = 0
+        for sentence in reversed(self.sentences[1:]):
+            characters += len(sentence[0]) + 1
+            tokens += sentence[4]
+            if (
+                characters > self.overlap_characters
+                or characters + extra_characters > self.max_characters
+                or tokens + extra_tokens > self.max_tokens
+            ):
+                break
+            overlap.insert(0, sentence)
+
+        if not overlap and self.overlap_characters and self.sentences:
+            tail = self.get_tail(self.sentences[-1], extra_characters=extra_characters, extra_tokens=extra_tokens)
+            if tail is not None:
+                overlap = [tail]
+        return overlap
+
+    def get_tail(self, sentence: tuple, extra_characters: int, extra_tokens: int) -> Optional[tuple]:
+        """The last words of a sentence within the overlap budget, with their own offsets"""
+        text, start, end, page_number, _ = sentence
+        budget = min(self.overlap_characters, self.max_characters - extra_characters - 1)
+
+        tail = None
+        for word in reversed(list(re.finditer(r"\S+", text))):
+            candidate = text[word.start():]
+            if len(candidate) > budget:
+                break
+            token_count = self.count_tokens(candidate)
+            if token_count + extra_tokens > self.max_tokens:
+                break
+            tail = (candidate, start + word.start(), end, page_number, token_count)
+        return tail
+
+    def reset(self, sentences: List[tuple]):
+        self.sentences = sentences
+        self.characters = sum(len(sentence[0]) for sentence in sentences) + max(len(sentences) - 1, 0)
+        self.tokens = sum(sentence[4] for sentence in sentences)
+        self.has_new_sentences = False
+
+    def build_chunk(self) -> TextChunk:
+        self.order += 1
+        return TextChunk(
+            chunk_text=" ".join(sentence[0] for sentence in self.sentences),
+            chunk_order=self.order,
+            chunk_section=self.section,
+            chunk_page_start=self.sentences[0][3],
+            chunk_page_end=self.sentences[-1][3],
+            chunk_start=self.sentences[0][1],
+            chunk_end=self.sentences[-1][2],
+            chunk_token_count=self.tokens,
+        )
+
+
+def iter_text_chunks(pages: Iterable[Tuple[int, str]], max_characters: int, max_tokens: int,
+                     overlap_characters: int = 0) -> Iterator[TextChunk]:
+    """Chunk a stream of (page_number, page_text), yielding the chunks one by one"""
+    chunker = TextChunker(
+        max_characters=max_characters,
+        max_tokens=max_tokens,
+        overlap_characters=overlap_characters,
+    )
+    for page_number, page_text in pages:
+        yield from chunker.feed(page_text, page_number)
+    yield from chunker.flush()
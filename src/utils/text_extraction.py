@@ -0,0 +1,66 @@
+from typing import List
+import hashlib
+
+# this module is imported by the extraction worker processes (spawn): keep its imports light
+
+PDF_MAGIC = b"%PDF-"
+# docx is a zip container, doc an OLE compound file
+WORD_MAGICS = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")
+
+def is_word_document(file_path: str) -> bool:
+    with open(file_path, "rb") as f:
+        header = f.read(4)
+    return header in WORD_MAGICS
+
+def get_page_hash(document, page) -> str:
+    """Hash of what is drawn on a page: its content streams and the raw streams of its images
+
+    two scans of the same CV (or the same page inside two different files) get the same hash,
+    without having to rasterize the page first.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(page.read_contents())
+    for image in page.get_images(full=True):
+        hasher.update(document.xref_stream_raw(image[0]) or b"")
+    return hasher.hexdigest()
+
+def extract_text_pages(file_path: str, min_text_chars: int = 0) -> List[dict]:
+    """Return the text layer of every page of a stored file (runs in a worker process)
+
+    the files are stored under their hash without extension, the type is read from the content:
+    PDFs go through PyMuPDF page by page, plain text files are a single page.
+    a PDF page with less than `min_text_chars` characters of text is flagged for OCR, with its hash.
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(len(PDF_MAGIC))
+
+    if header == PDF_MAGIC:
+        import fitz  # PyMuPDF
+
+        pages = []
+        with fitz.open(file_path) as document:
+            for page in document:
+                text = page.get_text("text")
+                needs_ocr = len(text.strip()) < min_text_chars
+                pages.append({
+                    "text": text,
+                    "needs_ocr": needs_ocr,
+                    "page_hash": get_page_hash(document, page) if needs_ocr else None,
+                })
+        return pages
+
+    with open(file_path, "rb") as f:
+        return [{"text": f.read().decode("utf-8", errors="replace"), "needs_ocr": False, "page_hash": None}]
+
+def ocr_pdf_page(file_path: str, page_index: int, dpi: int, lang: str) -> str:
+    """Rasterize one page and OCR it (runs in a worker process, one page per task)"""
+    import fitz  # PyMuPDF
+    import pytesseract
+    from PIL import Image
+
+    with fitz.open(file_path) as document:
+        # grayscale: a third of the pixels of RGB, and tesseract binarizes anyway
+        pixmap = document[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+
+    image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    return pytesseract.image_to_string(image, lang=lang)
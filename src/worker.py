@@ -0,0 +1,93 @@
+from helpers.config import get_settings
+from motor.motor_asyncio import AsyncIOMotorClient
+from models.AssetModel import AssetModel
+from models.BlobModel import BlobModel
+from models.AssetPageModel import AssetPageModel
+from models.OcrPageModel import OcrPageModel
+from models.KeywordTermModel import KeywordTermModel
+from models.KeywordDocumentModel import KeywordDocumentModel
+from models.JobModel import JobModel
+from models.enums.JobTypeEnum import JobTypeEnum
+from controllers import ExtractionController, ConversionController, KeywordIndexController, SkillController, JobWorkerController
+import asyncio
+import logging
+import signal
+
+# job queue consumer, scaled apart from the API: `python worker.py` (from src/, same .env as the API).
+# the API enqueues the jobs when JOB_QUEUE_ENABLED, each worker process runs JOB_WORKER_CONCURRENCY
+# of them at once; SIGTERM / SIGINT stop the claims and give back the jobs still running after
+# JOB_SHUTDOWN_TIMEOUT_SECONDS.
+
+logger = logging.getLogger('uvicorn.error')
+
+
+async def main():
+    settings = get_settings()
+
+    mongo_conn = AsyncIOMotorClient(settings.MONGODB_URL)
+    db_client = mongo_conn[settings.MONGODB_DB]
+
+    asset_model = AssetModel(db_client=db_client)
+    blob_model = BlobModel(db_client=db_client)
+    asset_page_model = AssetPageModel(db_client=db_client)
+    ocr_page_model = OcrPageModel(db_client=db_client)
+    keyword_term_model = KeywordTermModel(db_client=db_client)
+    keyword_document_model = KeywordDocumentModel(db_client=db_client)
+    job_model = JobModel(db_client=db_client)
+
+    for model in [asset_model, blob_model, asset_page_model, ocr_page_model,
+                  keyword_term_model, keyword_document_model, job_model]:
+        await model.ensure_indexes()
+
+    conversion_controller = ConversionController()
+
+    # no job model here: the worker runs the extractions itself
+    extraction_controller = ExtractionController(
+        asset_model=asset_model,
+        blob_model=blob_model,
+        asset_page_model=asset_page_model,
+        ocr_page_model=ocr_page_model,
+        conversion_controller=conversion_controller,
+        keyword_index_controller=KeywordIndexController(
+            keyword_term_model=keyword_term_model,
+            keyword_document_model=keyword_document_model,
+        ),
+        skill_controller=SkillController(),
+    )
+
+    job_worker_controller = JobWorkerController(
+        job_model=job_model,
+        handlers={
+            JobTypeEnum.EXTRACTION.value: extraction_controller,
+        },
+    )
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signal_number, stop.set)
+        except (NotImplementedError, AttributeError, RuntimeError, ValueError):
+            pass  # windows: Ctrl+C still raises KeyboardInterrupt
+
+    consumer = asyncio.create_task(job_worker_controller.run())
+    stopped = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait({consumer, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        if consumer.done():
+            consumer.result()       # the loop only ends on an error
+    finally:
+        logger.info(f"Job worker {job_worker_controller.worker_id} stopping")
+        stopped.cancel()
+        await job_worker_controller.shutdown(timeout=settings.JOB_SHUTDOWN_TIMEOUT_SECONDS)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+        await extraction_controller.shutdown()
+        await conversion_controller.shutdown()
+        mongo_conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main())